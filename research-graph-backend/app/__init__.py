@@ -26,6 +26,45 @@ def create_app(config_name='development'):
     db.init_app(app)
     migrate.init_app(app, db)
     
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.http_client import OpenAlexClient, AsyncOpenAlexClient
+    from app.services.rate_limiter import TokenBucketLimiter
+    from app.services.single_flight import SingleFlight
+    from app.services.search_cache import SearchResultCache
+    from app.services.suggestion_index import SuggestionIndex
+    from app.services.local_search import LocalSearch
+    from app.services.graph_layout import GraphLayoutCache
+    from app.services.graph_index import CitationGraphIndex
+    app.extensions['openalex_client'] = OpenAlexClient.from_config(app.config)
+    app.extensions['openalex_async_client'] = AsyncOpenAlexClient.from_config(app.config)
+    app.extensions['openalex_rate_limiter'] = TokenBucketLimiter.from_config(
+        app.config,
+        default_path=os.path.join(app.instance_path, 'openalex_rate_limit.sqlite3')
+    )
+    app.extensions['openalex_single_flight'] = SingleFlight.from_config(
+        app.config,
+        default_dir=os.path.join(app.instance_path, 'single_flight')
+    )
+    app.extensions['openalex_executor'] = ThreadPoolExecutor(
+        max_workers=app.config['OPENALEX_FANOUT_WORKERS'],
+        thread_name_prefix='openalex'
+    )
+    app.extensions['background_executor'] = ThreadPoolExecutor(
+        max_workers=app.config['BACKGROUND_WORKERS'],
+        thread_name_prefix='background'
+    )
+    app.extensions['search_cache'] = SearchResultCache.from_config(app.config)
+    app.extensions['suggestion_index'] = SuggestionIndex(executor=app.extensions['background_executor'])
+    app.extensions['local_search'] = LocalSearch()
+    app.extensions['graph_layout_cache'] = GraphLayoutCache.from_config(app.config)
+    app.extensions['graph_index'] = CitationGraphIndex.from_config(
+        app.config,
+        default_dir=os.path.join(app.instance_path, 'graph_index')
+    )
+    if app.extensions['graph_index'].enabled:
+        # Only maps an existing snapshot; the first build from the database waits for a request.
+        app.extensions['graph_index'].load()
+    
     
     CORS(app, resources={r"/*": {"origins": "*"}}, allow_headers="*", expose_headers="*")
     
@@ -37,6 +76,14 @@ def create_app(config_name='development'):
         app.register_blueprint(papers_bp, url_prefix='/api/papers')
         app.register_blueprint(library_bp, url_prefix='/api/library')
     
+    @app.after_request
+    def add_fetch_plan_header(response):
+        from flask import g
+        plan = g.get('openalex_fetch_plan')
+        if plan is not None and app.config.get('OPENALEX_DEBUG_HEADERS'):
+            response.headers['X-OpenAlex-Fetch-Plan'] = plan.header_value()
+        return response
+    
     @app.route('/health')
     def health_check():
         return {
@@ -46,6 +93,30 @@ def create_app(config_name='development'):
             'timestamp': datetime.utcnow().isoformat()
         }, 200
     
+    @app.route('/stats')
+    def stats():
+        from app.services.metrics import paper_cache_stats, fetch_plan_stats, hit_ratio
+
+        paper_cache = paper_cache_stats.snapshot()
+        paper_cache['hit_ratio'] = hit_ratio(
+            paper_cache.get('hits', 0),
+            paper_cache.get('misses', 0) + paper_cache.get('stale', 0)
+        )
+        return {
+            'paper_cache': paper_cache,
+            'fetch_plan': fetch_plan_stats.snapshot(),
+            'single_flight': app.extensions['openalex_single_flight'].stats(),
+            'openalex_pool': app.extensions['openalex_client'].stats(),
+            'openalex_async_pool': app.extensions['openalex_async_client'].stats(),
+            'rate_limiter': app.extensions['openalex_rate_limiter'].stats(),
+            'search_cache': app.extensions['search_cache'].stats(),
+            'suggestion_index': app.extensions['suggestion_index'].stats(),
+            'local_search': app.extensions['local_search'].stats(),
+            'graph_layout_cache': app.extensions['graph_layout_cache'].stats(),
+            'graph_index': app.extensions['graph_index'].stats(),
+            'timestamp': datetime.utcnow().isoformat()
+        }, 200
+    
     @app.route('/ping')
     def ping():
         return {
@@ -59,9 +130,11 @@ def create_app(config_name='development'):
             'version': '1.0.0',
             'endpoints': {
                 'health': '/health',
-                'search': '/api/search?q=<query>&year_min=<year>&year_max=<year>',
+                'stats': '/stats',
+                'search': '/api/search?q=<query>&year_min=<year>&year_max=<year>&source=<remote|local|hybrid>&sort=<key>&scores=true',
                 'paper_details': '/api/papers/<paper_id>',
                 'citation_graph': '/api/papers/<paper_id>/citations',
+                'related_papers': '/api/papers/<paper_id>/related?method=<combined|co_citation|coupling>&order=<score|reading>&limit=<n>',
             },
             'documentation': 'https://github.com/yourusername/research-graph-backend'
         }, 200
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs, unquote
+from asgiref.wsgi import WsgiToAsgi
+from app.services.async_openalex_service import AsyncOpenAlexService
+from app.services.projection import PAPER_FIELDS, NODE_FIELDS, GRAPH_NODE_FIELDS, parse_fields, project
+from app.services.scoring import SORT_KEYS, score_graph_nodes
+from app.services.graph_layout import annotate_nodes, layout_graph, parse_layout_args
+
+PAPER_ROUTE = re.compile(r'^/api/papers/(?P<paper_id>[^/]+)/(?P<view>graph|citations)$')
+
+CORS_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+    (b'access-control-expose-headers', b'*'),
+]
+
+
+def create_asgi_app(flask_app):
+    """Wrap the Flask app for an ASGI server.
+
+    The graph and citation endpoints, which spend nearly all their time
+    waiting on OpenAlex, are served natively on the event loop with
+    AsyncOpenAlexService, so one process can hold hundreds of expansions in
+    flight. Every other request goes to the Flask app through ``WsgiToAsgi``.
+    """
+    wsgi_app = WsgiToAsgi(flask_app)
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await _lifespan(flask_app, receive, send)
+            return
+
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            match = PAPER_ROUTE.match(scope['path'])
+            if match:
+                args = {
+                    name: values[-1]
+                    for name, values in parse_qs(scope['query_string'].decode('latin-1')).items()
+                }
+                paper_id = unquote(match.group('paper_id'))
+                view = _graph if match.group('view') == 'graph' else _citations
+                status, body = await view(flask_app, paper_id, args)
+                await _send_json(send, status, body)
+                return
+
+        await wsgi_app(scope, receive, send)
+
+    return application
+
+
+async def _lifespan(flask_app, receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await flask_app.extensions['openalex_async_client'].aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def _send_json(send, status, body):
+    payload = json.dumps(body).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode('ascii')),
+        ] + CORS_HEADERS,
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+def _flag(args, name, default='false'):
+    return args.get(name, default).lower() == 'true'
+
+
+async def _citations(flask_app, paper_id, args):
+    try:
+        fields = parse_fields(args.get('fields'))
+    except ValueError as e:
+        return 400, {'error': str(e), 'allowed_fields': list(PAPER_FIELDS)}
+
+    try:
+        service = AsyncOpenAlexService(flask_app)
+        citation_data = await service.get_paper_citations(
+            paper_id,
+            fetch_cited_papers=_flag(args, 'include_references', 'true'),
+            force_refresh=_flag(args, 'force_refresh'),
+            partial_timeout=flask_app.config['OPENALEX_PARTIAL_TIMEOUT'] if _flag(args, 'partial') else None,
+            fields=fields
+        )
+
+        if not citation_data:
+            return 404, {'error': 'Paper not found', 'paper_id': paper_id}
+        return 200, {'success': True, 'data': citation_data}
+
+    except Exception as e:
+        return 500, {'error': 'Failed to fetch citations', 'message': str(e)}
+
+
+async def _graph(flask_app, paper_id, args):
+    try:
+        depth = min(max(int(args.get('depth', 1)), 1), 3)
+    except ValueError:
+        depth = 1
+
+    try:
+        node_fields = parse_fields(args.get('fields'), allowed=GRAPH_NODE_FIELDS, required=('id', 'type'))
+    except ValueError as e:
+        return 400, {'error': str(e), 'allowed_fields': list(GRAPH_NODE_FIELDS)}
+
+    sort = args.get('sort')
+    if sort is not None and sort not in SORT_KEYS:
+        return 400, {'error': 'Invalid sort', 'allowed_sorts': list(SORT_KEYS)}
+    include_scores = _flag(args, 'scores')
+
+    try:
+        layout, metrics, width, height = parse_layout_args(args)
+    except ValueError as e:
+        return 400, {'error': str(e)}
+
+    # Layout, metrics and scoring are CPU or database work, so they run off the event loop.
+    def decorate(graph_data):
+        annotations = None
+        if layout is not None or metrics:
+            computed = layout_graph(
+                graph_data, depth, layout=layout, metrics=metrics, width=width, height=height,
+                cache=flask_app.extensions['graph_layout_cache']
+            )
+            annotations = computed['nodes']
+            if layout is not None:
+                graph_data['layout'] = computed['layout']
+            if metrics:
+                graph_data['metrics'] = computed['metrics']
+
+        nodes = annotate_nodes(project(graph_data['nodes'], node_fields), annotations)
+        if sort is not None or include_scores:
+            with flask_app.app_context():
+                nodes = score_graph_nodes(nodes, sort=sort, include_scores=include_scores)
+        graph_data['nodes'] = nodes
+
+    async def finish(graph_data):
+        if layout is None and not metrics and sort is None and not include_scores:
+            graph_data['nodes'] = project(graph_data['nodes'], node_fields)
+            return
+        await asyncio.to_thread(decorate, graph_data)
+
+    try:
+        service = AsyncOpenAlexService(flask_app)
+
+        if depth > 1:
+            graph_data = await service.get_citation_network(paper_id, depth=depth)
+            if not graph_data:
+                return 404, {'error': 'Paper not found', 'paper_id': paper_id}
+            await finish(graph_data)
+            return 200, {
+                'success': True,
+                'graph': graph_data,
+                'partial': graph_data['truncated'],
+                'missing': []
+            }
+
+        citation_data = await service.get_paper_citations(
+            paper_id,
+            fetch_cited_papers=True,
+            force_refresh=_flag(args, 'force_refresh'),
+            partial_timeout=flask_app.config['OPENALEX_PARTIAL_TIMEOUT'] if _flag(args, 'partial') else None,
+            fields=NODE_FIELDS
+        )
+        if not citation_data:
+            return 404, {'error': 'Paper not found', 'paper_id': paper_id}
+        graph_data = citation_data.get('citation_graph')
+        await finish(graph_data)
+        return 200, {
+            'success': True,
+            'graph': graph_data,
+            'partial': citation_data['partial'],
+            'missing': citation_data['missing']
+        }
+
+    except Exception as e:
+        return 500, {'error': 'Failed to fetch citation graph', 'message': str(e)}
@@ -1,10 +1,14 @@
 from app.models.paper import Paper, paper_authors
 from app.models.author import Author
 from app.models.citation import Citation
+from app.models.related_paper import RelatedPaper
+from app.models.bulk import upsert_rows
 
 __all__ = [
   'Paper',
   'Author',
   'Citation',
-  'paper_authors'
+  'RelatedPaper',
+  'paper_authors',
+  'upsert_rows'
 ]
\ No newline at end of file
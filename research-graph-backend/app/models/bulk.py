@@ -0,0 +1,64 @@
+from app import db
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def upsert_rows(table, rows, index_elements, update_columns=None):
+    """Insert ``rows`` into ``table`` in one statement, resolving key conflicts.
+
+    With ``update_columns`` the conflicting rows are updated in place,
+    otherwise they are left untouched (``ON CONFLICT DO NOTHING``). All rows
+    must share the same keys so the insert runs as a single executemany.
+    """
+    if not rows:
+        return 0
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(table)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        db.session.execute(stmt, rows)
+        return len(rows)
+
+    return _upsert_rows_generic(table, rows, index_elements, update_columns)
+
+
+def _upsert_rows_generic(table, rows, index_elements, update_columns):
+    key_columns = [table.c[name] for name in index_elements]
+    keys = [tuple(row[name] for name in index_elements) for row in rows]
+
+    existing = set()
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        existing.update(
+            tuple(found) for found in db.session.execute(
+                db.select(*key_columns).where(tuple_(*key_columns).in_(chunk))
+            )
+        )
+
+    new_rows = [row for row, key in zip(rows, keys) if key not in existing]
+    if new_rows:
+        db.session.execute(table.insert(), new_rows)
+
+    if update_columns:
+        # Match ON CONFLICT DO UPDATE, which doesn't apply onupdate defaults either.
+        pinned = {
+            column.name: column for column in table.c
+            if column.onupdate is not None and column.name not in update_columns
+        }
+        for row, key in zip(rows, keys):
+            if key in existing:
+                db.session.execute(
+                    table.update()
+                    .where(*[column == value for column, value in zip(key_columns, key)])
+                    .values({**pinned, **{column: row[column] for column in update_columns}})
+                )
+
+    return len(rows)
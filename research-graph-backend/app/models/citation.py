@@ -56,64 +56,141 @@ class Citation(db.Model):
             return None
     
     @staticmethod
-    def get_citation_network(paper_id, max_depth=2):
+    def bulk_insert(edges):
+        """Insert ``(citing_id, cited_id)`` pairs in one statement, skipping ones already stored."""
+        from app.models.bulk import upsert_rows
+
+        now = datetime.utcnow()
+        rows = [
+            {'citing_paper_id': citing_id, 'cited_paper_id': cited_id, 'cached_at': now}
+            for citing_id, cited_id in dict.fromkeys(edges)
+            if citing_id != cited_id
+        ]
+        return upsert_rows(Citation.__table__, rows, ['citing_paper_id', 'cited_paper_id'])
+
+    @staticmethod
+    def get_citation_network(paper_id, max_depth=2, use_cte=None):
+        """Undirected neighbourhood of ``paper_id`` from the local citations table.
+
+        Papers within ``max_depth`` hops are expanded and every edge touching
+        them is returned. The traversal is level-synchronous: one ``IN`` query
+        per direction per frontier, then node rows and their authors are loaded
+        in bulk. On Postgres (or with ``use_cte=True``) the reachable set is
+        computed by a single recursive CTE instead. When the in-process graph
+        index is enabled (and ``use_cte`` is left to default) the traversal
+        runs over its CSR arrays and only the node rows come from SQL.
+        """
+        from flask import current_app
         from app.models.paper import Paper
-        
-        visited_papers = set()
-        edges = []
-        nodes_dict = {}
-        
-        def traverse(current_id, depth):
-            if depth > max_depth or current_id in visited_papers:
-                return
-            
-            visited_papers.add(current_id)
-            
-            paper = Paper.query.get(current_id)
-            if not paper:
-                return
-            
-            if current_id not in nodes_dict:
-                nodes_dict[current_id] = paper.to_dict(include_authors=True, include_abstract=False)
-            
-            for citation in Citation.query.filter_by(citing_paper_id=current_id).all():
-                edges.append({
-                    'source': current_id,
-                    'target': citation.cited_paper_id,
-                    'type': 'cites'
-                })
-                
-                if citation.cited_paper_id not in nodes_dict and citation.cited_paper:
-                    nodes_dict[citation.cited_paper_id] = citation.cited_paper.to_dict(
-                        include_authors=True, 
-                        include_abstract=False
-                    )
-                
-                if depth < max_depth:
-                    traverse(citation.cited_paper_id, depth + 1)
-            
-            for citation in Citation.query.filter_by(cited_paper_id=current_id).all():
-                edges.append({
-                    'source': citation.citing_paper_id,
-                    'target': current_id,
-                    'type': 'cites'
-                })
-                
-                if citation.citing_paper_id not in nodes_dict and citation.citing_paper:
-                    nodes_dict[citation.citing_paper_id] = citation.citing_paper.to_dict(
-                        include_authors=True, 
-                        include_abstract=False
-                    )
-                
-                if depth < max_depth:
-                    traverse(citation.citing_paper_id, depth + 1)
-        
-        traverse(paper_id, 0)
-        
+
+        if db.session.get(Paper, paper_id) is None:
+            return {
+                'nodes': [],
+                'edges': [],
+                'center_node': paper_id,
+                'total_nodes': 0,
+                'total_edges': 0
+            }
+
+        graph_index = current_app.extensions['graph_index']
+        if use_cte is None and graph_index.enabled:
+            graph_index.ensure_loaded()
+            edges = graph_index.network_edges(paper_id, max_depth)
+        elif use_cte or (use_cte is None and db.session.get_bind().dialect.name == 'postgresql'):
+            edges = Citation._network_edges_cte(paper_id, max_depth)
+        else:
+            edges = Citation._network_edges_bfs(paper_id, max_depth)
+
+        node_ids = {paper_id}
+        for citing_id, cited_id in edges:
+            node_ids.add(citing_id)
+            node_ids.add(cited_id)
+
+        papers = []
+        node_id_list = list(node_ids)
+        for start in range(0, len(node_id_list), 500):
+            papers.extend(
+                Paper.query.options(db.defer(Paper.abstract)).filter(
+                    Paper.id.in_(node_id_list[start:start + 500])
+                ).all()
+            )
+        papers.sort(key=lambda paper: (paper.id != paper_id, -(paper.citation_count or 0), paper.id))
+
+        nodes = Paper.serialize_many(papers, include_authors=True, include_abstract=False)
+        present = {paper.id for paper in papers}
+        edge_list = [
+            {'source': citing_id, 'target': cited_id, 'type': 'cites'}
+            for citing_id, cited_id in sorted(edges)
+            if citing_id in present and cited_id in present
+        ]
+
         return {
-            'nodes': list(nodes_dict.values()),
-            'edges': edges,
+            'nodes': nodes,
+            'edges': edge_list,
             'center_node': paper_id,
-            'total_nodes': len(nodes_dict),
-            'total_edges': len(edges)
-        }
\ No newline at end of file
+            'total_nodes': len(nodes),
+            'total_edges': len(edge_list)
+        }
+
+    @staticmethod
+    def _network_edges_bfs(paper_id, max_depth):
+        visited = {paper_id}
+        frontier = [paper_id]
+        edges = set()
+
+        for _ in range(max_depth + 1):
+            if not frontier:
+                break
+            next_frontier = []
+            for start in range(0, len(frontier), 500):
+                chunk = frontier[start:start + 500]
+                rows = db.session.query(Citation.citing_paper_id, Citation.cited_paper_id).filter(
+                    Citation.citing_paper_id.in_(chunk)
+                ).all()
+                rows += db.session.query(Citation.citing_paper_id, Citation.cited_paper_id).filter(
+                    Citation.cited_paper_id.in_(chunk)
+                ).all()
+
+                for citing_id, cited_id in rows:
+                    edges.add((citing_id, cited_id))
+                    for neighbour in (citing_id, cited_id):
+                        if neighbour not in visited:
+                            visited.add(neighbour)
+                            next_frontier.append(neighbour)
+            frontier = next_frontier
+
+        return edges
+
+    @staticmethod
+    def _network_edges_cte(paper_id, max_depth):
+        links = db.union_all(
+            db.select(
+                Citation.citing_paper_id.label('source'),
+                Citation.cited_paper_id.label('target')
+            ),
+            db.select(
+                Citation.cited_paper_id.label('source'),
+                Citation.citing_paper_id.label('target')
+            )
+        ).subquery('links')
+
+        reach = db.select(
+            db.literal(paper_id, db.String).label('paper_id'),
+            db.literal(0, db.Integer).label('depth')
+        ).cte('reach', recursive=True)
+        reach = reach.union(
+            db.select(links.c.target, reach.c.depth + 1).join(
+                links, links.c.source == reach.c.paper_id
+            ).where(reach.c.depth < max_depth)
+        )
+
+        expanded = db.select(reach.c.paper_id)
+        rows = db.session.execute(
+            db.select(Citation.citing_paper_id, Citation.cited_paper_id).where(
+                db.or_(
+                    Citation.citing_paper_id.in_(expanded),
+                    Citation.cited_paper_id.in_(expanded)
+                )
+            )
+        ).all()
+        return {(citing_id, cited_id) for citing_id, cited_id in rows}
@@ -1,5 +1,28 @@
 from app import db
+from app.models.citation import Citation
+from array import array
 from datetime import datetime
+import sys
+
+SERIALIZED_COLUMNS = (
+  'id',
+  'title',
+  'doi',
+  'publication_year',
+  'publication_date',
+  'venue',
+  'citation_count',
+  'referenced_works_count',
+  'openalex_url',
+  'pdf_url',
+)
+
+# counts_by_year is stored as little-endian int32 citation counts, one per
+# calendar year starting at counts_start_year; this caps the span kept.
+COUNTS_MAX_YEARS = 64
+
+# Columns the cache and graph code read on every paper, whatever the projection.
+BOOKKEEPING_COLUMNS = ('id', 'title', 'publication_year', 'citation_count', 'openalex_url', 'last_updated', 'edges_complete_at')
 
 class Paper(db.Model):
 
@@ -19,12 +42,16 @@ class Paper(db.Model):
 
   citation_count = db.Column(db.Integer, default=0, index=True)
   referenced_works_count = db.Column(db.Integer, default=0)
+  counts_start_year = db.Column(db.Integer, nullable=True)
+  counts_by_year = db.Column(db.LargeBinary, nullable=True)
 
   openalex_url = db.Column(db.String(200), nullable=True)
   pdf_url = db.Column(db.String(300), nullable=True)
 
   cached_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
   last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+  edges_complete_at = db.Column(db.DateTime, nullable=True)
+  related_computed_at = db.Column(db.DateTime, nullable=True)
 
 
   authors = db.relationship('Author', secondary='paper_authors', back_populates='papers', lazy='dynamic')
@@ -48,50 +75,151 @@ class Paper(db.Model):
   def __repr__(self):
     return f'<Paper {self.id}: {self.title[:50]}...>'
 
-  def to_dict(self, include_authors=True, include_abstract=False):
-
+  def to_dict(self, include_authors=True, include_abstract=False, authors=None, fields=None):
+    # An explicit field projection overrides the include_* flags.
+    if fields is not None:
+      include_authors = 'authors' in fields
+      include_abstract = 'abstract' in fields
 
     data = {
-      'id': self.id,
-      'title': self.title,
-      'doi': self.doi,
-      'publication_year': self.publication_year,
-      'publication_date': self.publication_date,
-      'venue': self.venue,
-      'citation_count': self.citation_count,
-      'referenced_works_count': self.referenced_works_count,
-      'openalex_url': self.openalex_url,
-      'pdf_url': self.pdf_url,
+      column: getattr(self, column)
+      for column in SERIALIZED_COLUMNS
+      if fields is None or column in fields
     }
 
     if include_abstract:
       data['abstract'] = self.abstract
 
+    if fields is None or 'counts_by_year' in fields:
+      data['counts_by_year'] = self.yearly_counts()
+
     if include_authors:
-      data['authors'] = [author.to_dict() for author in self.authors.all()]
+      if authors is None:
+        authors = [author.to_dict() for author in self.authors.all()]
+      data['authors'] = authors
 
     return data
+
+  def yearly_counts(self):
+    """counts_by_year in OpenAlex's shape: newest year first, zero years included."""
+    counts = Paper.unpack_counts(self.counts_by_year)
+    return [
+      {'year': self.counts_start_year + offset, 'cited_by_count': count}
+      for offset, count in reversed(list(enumerate(counts)))
+    ]
+
+  @staticmethod
+  def pack_counts(counts_by_year):
+    """Pack OpenAlex counts_by_year entries into ``(start_year, bytes)``; (None, None) if empty."""
+    by_year = {}
+    for entry in counts_by_year or []:
+      try:
+        by_year[int(entry['year'])] = int(entry.get('cited_by_count') or 0)
+      except (KeyError, TypeError, ValueError):
+        continue
+    if not by_year:
+      return None, None
+
+    end = max(by_year)
+    start = max(min(by_year), end - COUNTS_MAX_YEARS + 1)
+    counts = array('i', (by_year.get(year, 0) for year in range(start, end + 1)))
+    if sys.byteorder == 'big':
+      counts.byteswap()
+    return start, counts.tobytes()
+
+  @staticmethod
+  def unpack_counts(blob):
+    counts = array('i')
+    if blob:
+      counts.frombytes(blob)
+      if sys.byteorder == 'big':
+        counts.byteswap()
+    return counts.tolist()
+
+  @staticmethod
+  def load_options(fields):
+    """Loader options that read only the columns a projection needs; [] for everything."""
+    if fields is None:
+      return []
+    columns = set(BOOKKEEPING_COLUMNS) | (set(fields) & set(SERIALIZED_COLUMNS))
+    if 'abstract' in fields:
+      columns.add('abstract')
+    if 'counts_by_year' in fields:
+      columns.update(('counts_start_year', 'counts_by_year'))
+    return [db.load_only(*[getattr(Paper, column) for column in sorted(columns)])]
+
+  def get_citing_papers(self, limit=50, options=()):
+    return Paper.query.options(*options).join(
+      Citation, Citation.citing_paper_id == Paper.id
+    ).filter(
+      Citation.cited_paper_id == self.id
+    ).order_by(Paper.citation_count.desc()).limit(limit).all()
+
+  def get_referenced_papers(self, limit=50, options=()):
+    return Paper.query.options(*options).join(
+      Citation, Citation.cited_paper_id == Paper.id
+    ).filter(
+      Citation.citing_paper_id == self.id
+    ).order_by(Paper.citation_count.desc()).limit(limit).all()
+
+  @staticmethod
+  def load_authors(paper_ids):
+    """Author dicts for many papers in one query, ordered by author_position."""
+    from app.models.author import Author
+
+    paper_ids = list(set(paper_ids))
+    authors = {paper_id: [] for paper_id in paper_ids}
+    for start in range(0, len(paper_ids), 500):
+      rows = db.session.query(paper_authors.c.paper_id, Author).join(
+        Author, Author.id == paper_authors.c.author_id
+      ).filter(
+        paper_authors.c.paper_id.in_(paper_ids[start:start + 500])
+      ).order_by(
+        paper_authors.c.paper_id,
+        paper_authors.c.author_position.is_(None),
+        paper_authors.c.author_position
+      ).all()
+      for paper_id, author in rows:
+        authors[paper_id].append(author.to_dict())
+    return authors
+
+  @staticmethod
+  def serialize_many(papers, include_authors=True, include_abstract=False, fields=None):
+    """Serialize a list of papers with one authors query instead of one per paper."""
+    if fields is not None:
+      include_authors = 'authors' in fields
+    authors = Paper.load_authors([paper.id for paper in papers]) if include_authors else {}
+    return [
+      paper.to_dict(
+        include_authors=include_authors,
+        include_abstract=include_abstract,
+        authors=authors.get(paper.id),
+        fields=fields
+      )
+      for paper in papers
+    ]
   def get_citation_graph(self, depth=1):
 
-    nodes = [self.to_dict(include_authors=True, include_abstract=False)]
-    edges = []
+    citing = [citation.citing_paper for citation in self.cited_by.options(db.joinedload(Citation.citing_paper)).all()]
+    cited = [citation.cited_paper for citation in self.references.options(db.joinedload(Citation.cited_paper)).all()]
+
+    papers = [self]
     visited = {self.id}
+    for paper in citing + cited:
+      if paper.id not in visited:
+        papers.append(paper)
+        visited.add(paper.id)
 
-    for citation in self.cited_by.all():
-      citing_paper = citation.citing_paper
-      if citing_paper.id not in visited:
-        nodes.append(citing_paper.to_dict(include_authors=True, include_abstract=False))
-        visited.add(citing_paper.id)
+    nodes = Paper.serialize_many(papers, include_authors=True, include_abstract=False)
+    edges = []
+
+    for citing_paper in citing:
       edges.append({
         'source': citing_paper.id,
         'target': self.id,
         'type': 'cites'
       })
-    for citation in self.references.all():
-      cited_paper = citation.cited_paper
-      if cited_paper.id not in visited:
-        nodes.append(cited_paper.to_dict(include_authors=True, include_abstract=False))
-        visited.add(cited_paper.id)
+    for cited_paper in cited:
       edges.append({
         'source': self.id,
         'target': cited_paper.id,
@@ -124,23 +252,40 @@ class Collection(db.Model):
   saved_papers = db.relationship('SavedPaper', back_populates='collection', cascade='all, delete-orphan')
 
 
-  def to_dict(self):
+  def to_dict(self, paper_count=None):
+    if paper_count is None:
+      paper_count = Collection.paper_counts([self.id]).get(self.id, 0)
     return {
       'id': self.id,
       'name': self.name,
       'description': self.description,
-      'paper_count': len(self.saved_papers),
+      'paper_count': paper_count,
       'created_at': self.created_at.isoformat(),
       'updated_at': self.updated_at.isoformat()
     }
 
+  @staticmethod
+  def paper_counts(collection_ids):
+    """Saved-paper counts for many collections in one grouped COUNT query."""
+    collection_ids = list(set(collection_ids))
+    if not collection_ids:
+      return {}
+    rows = db.session.query(
+      SavedPaper.collection_id, db.func.count(SavedPaper.id)
+    ).filter(
+      SavedPaper.collection_id.in_(collection_ids)
+    ).group_by(SavedPaper.collection_id).all()
+    counts = {collection_id: 0 for collection_id in collection_ids}
+    counts.update(rows)
+    return counts
+
 class SavedPaper(db.Model):
   __tablename__ = 'saved_papers'
   
     
   id = db.Column(db.Integer, primary_key=True)
   paper_id = db.Column(db.String(50), db.ForeignKey('papers.id'), nullable=False)
-  collection_id = db.Column(db.Integer, db.ForeignKey('collections.id'), nullable=False)
+  collection_id = db.Column(db.Integer, db.ForeignKey('collections.id'), nullable=False, index=True)
   user_id = db.Column(db.String(100), nullable=False, index=True)
   notes = db.Column(db.Text, nullable=True)
   status = db.Column(db.String(20), default='to_read')
@@ -149,11 +294,11 @@ class SavedPaper(db.Model):
   paper = db.relationship('Paper')
   collection = db.relationship('Collection', back_populates='saved_papers')
 
-  def to_dict(self, include_authors=True):
+  def to_dict(self, include_authors=True, authors=None):
     import json
     paper_obj = self.paper
     if paper_obj:
-      paper_dict = paper_obj.to_dict(include_authors=include_authors, include_abstract=False)
+      paper_dict = paper_obj.to_dict(include_authors=include_authors, include_abstract=False, authors=authors)
     else:
       meta = {}
       try:
@@ -0,0 +1,140 @@
+from app import db
+from datetime import datetime
+
+
+class RelatedPaper(db.Model):
+    """One precomputed related-paper candidate with its co-citation and coupling counts.
+
+    Rows for a paper are written together by ``RelatedPaper.store``;
+    ``Paper.related_computed_at`` marks the set as current and is cleared
+    by ``RelatedPaper.invalidate`` when new citation edges could change it.
+    """
+    __tablename__ = 'related_papers'
+
+    paper_id = db.Column(
+        db.String(50),
+        db.ForeignKey('papers.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    related_paper_id = db.Column(
+        db.String(50),
+        db.ForeignKey('papers.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+
+    # Papers citing both, and references both cite.
+    co_citations = db.Column(db.Integer, nullable=False, default=0)
+    coupling = db.Column(db.Integer, nullable=False, default=0)
+
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<RelatedPaper: {self.related_paper_id} for {self.paper_id}>'
+
+    @staticmethod
+    def candidate_counts(paper_id):
+        """``{candidate_id: (co_citations, coupling, citation_count)}`` from the citations table.
+
+        Both counts come from one grouped query over two self-joins:
+        co-citation pairs share a citing paper, coupled pairs share a
+        reference.
+        """
+        from app.models.citation import Citation
+        from app.models.paper import Paper
+
+        first = db.aliased(Citation)
+        second = db.aliased(Citation)
+        pairs = db.union_all(
+            db.select(
+                second.cited_paper_id.label('candidate'),
+                db.literal(1, db.Integer).label('co_citation'),
+                db.literal(0, db.Integer).label('coupling')
+            ).select_from(first).join(
+                second, second.citing_paper_id == first.citing_paper_id
+            ).where(
+                first.cited_paper_id == paper_id,
+                second.cited_paper_id != paper_id
+            ),
+            db.select(
+                second.citing_paper_id.label('candidate'),
+                db.literal(0, db.Integer).label('co_citation'),
+                db.literal(1, db.Integer).label('coupling')
+            ).select_from(first).join(
+                second, second.cited_paper_id == first.cited_paper_id
+            ).where(
+                first.citing_paper_id == paper_id,
+                second.citing_paper_id != paper_id
+            )
+        ).subquery('pairs')
+
+        rows = db.session.execute(
+            db.select(
+                pairs.c.candidate,
+                db.func.sum(pairs.c.co_citation),
+                db.func.sum(pairs.c.coupling),
+                Paper.citation_count
+            ).join(
+                Paper, Paper.id == pairs.c.candidate
+            ).group_by(pairs.c.candidate, Paper.citation_count)
+        ).all()
+        return {
+            candidate: (int(co_citations), int(coupling), citation_count or 0)
+            for candidate, co_citations, coupling, citation_count in rows
+        }
+
+    @staticmethod
+    def store(paper_id, rows, computed_at):
+        """Replace a paper's related set with ``(related_id, co_citations, coupling)`` rows and mark it current."""
+        from app.models.paper import Paper
+
+        db.session.execute(RelatedPaper.__table__.delete().where(RelatedPaper.paper_id == paper_id))
+        if rows:
+            db.session.execute(RelatedPaper.__table__.insert(), [
+                {
+                    'paper_id': paper_id,
+                    'related_paper_id': related_id,
+                    'co_citations': co_citations,
+                    'coupling': coupling,
+                    'computed_at': computed_at
+                }
+                for related_id, co_citations, coupling in rows
+            ])
+        db.session.execute(
+            Paper.__table__.update()
+            .where(Paper.id == paper_id)
+            # Pin last_updated so its onupdate doesn't mark the paper as freshly fetched.
+            .values(related_computed_at=computed_at, last_updated=Paper.__table__.c.last_updated)
+        )
+
+    @staticmethod
+    def invalidate(edges):
+        """Mark stale every stored related set that new ``(citing_id, cited_id)`` edges can change.
+
+        An edge ``a -> b`` changes the sets of ``a`` and ``b``, of papers
+        ``a`` also cites (now co-cited with ``b``) and of papers also citing
+        ``b`` (now coupled with ``a``). Runs in the caller's transaction.
+        """
+        from app.models.citation import Citation
+        from app.models.paper import Paper
+
+        edges = list(dict.fromkeys(edges))
+        for start in range(0, len(edges), 500):
+            chunk = edges[start:start + 500]
+            citing_ids = {citing_id for citing_id, _ in chunk}
+            cited_ids = {cited_id for _, cited_id in chunk}
+            db.session.execute(
+                Paper.__table__.update()
+                .where(
+                    Paper.related_computed_at.isnot(None),
+                    db.or_(
+                        Paper.id.in_(citing_ids | cited_ids),
+                        Paper.id.in_(
+                            db.select(Citation.cited_paper_id).where(Citation.citing_paper_id.in_(citing_ids))
+                        ),
+                        Paper.id.in_(
+                            db.select(Citation.citing_paper_id).where(Citation.cited_paper_id.in_(cited_ids))
+                        )
+                    )
+                )
+                .values(related_computed_at=None, last_updated=Paper.__table__.c.last_updated)
+            )
@@ -1,19 +1,96 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from app import db
 from app.models.paper import Collection, SavedPaper, Paper
+from app.services.export import EXPORT_FORMATS, iter_export_entries, stream_export
+from app.services.openalex_service import OpenAlexService, WORK_ID_PATTERN, DOI_PATTERN
+from datetime import datetime
+import base64
+import binascii
 import json
 
 library_bp = Blueprint('library', __name__)
 
+MAX_PAGE_SIZE = 200
+
+# sort= values for /collections/<id>/papers; ties are broken by id.
+SAVED_PAPER_SORTS = {
+  'saved_at': SavedPaper.saved_at,
+  'status': db.func.coalesce(SavedPaper.status, ''),
+}
+
+def _encode_cursor(value, row_id):
+  if isinstance(value, datetime):
+    value = value.isoformat()
+  raw = json.dumps([value, row_id]).encode('utf-8')
+  return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def _decode_cursor(cursor, sort=None):
+  """Return ``(value, id)`` from a cursor; raises ValueError if it's malformed."""
+  try:
+    value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    if not isinstance(row_id, int):
+      raise TypeError(row_id)
+    if sort == 'saved_at':
+      value = datetime.fromisoformat(value)
+  except (binascii.Error, TypeError, ValueError) as e:
+    raise ValueError('Invalid cursor') from e
+  return value, row_id
+
+def _page_args():
+  """Parse limit/cursor/order. Pagination is opt-in: limit=None means everything."""
+  limit = request.args.get('limit', type=int)
+  if limit is None and request.args.get('cursor'):
+    limit = MAX_PAGE_SIZE
+  if limit is not None:
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+  order = request.args.get('order', 'asc').lower()
+  if order not in ('asc', 'desc'):
+    raise ValueError('order must be asc or desc')
+  return limit, request.args.get('cursor'), order
+
+def _keyset_page(query, sort_key, id_column, limit, after, order):
+  """Apply keyset pagination on ``(sort_key, id)``; returns ``(rows, has_more)``."""
+  if after is not None:
+    value, row_id = after
+    if order == 'desc':
+      query = query.filter(db.or_(sort_key < value, db.and_(sort_key == value, id_column < row_id)))
+    else:
+      query = query.filter(db.or_(sort_key > value, db.and_(sort_key == value, id_column > row_id)))
+
+  if order == 'desc':
+    query = query.order_by(sort_key.desc(), id_column.desc())
+  else:
+    query = query.order_by(sort_key, id_column)
+
+  if limit is None:
+    return query.all(), False
+  rows = query.limit(limit + 1).all()
+  return rows[:limit], len(rows) > limit
+
 @library_bp.route('/collections', methods=['GET'])
 def get_collections():
   user_id = request.args.get('user_id', 'anonymous')
-  collections = Collection.query.filter_by(user_id=user_id).all()
 
-  return jsonify({
+  try:
+    limit, cursor, order = _page_args()
+    after = _decode_cursor(cursor) if cursor else None
+  except ValueError as e:
+    return jsonify({'error': str(e)}), 400
+
+  collections, has_more = _keyset_page(
+    Collection.query.filter_by(user_id=user_id),
+    Collection.id, Collection.id, limit, after, order
+  )
+  counts = Collection.paper_counts([c.id for c in collections])
+
+  response = {
     'success': True,
-    'collections': [c.to_dict() for c in collections]
-  }), 200
+    'collections': [c.to_dict(paper_count=counts.get(c.id, 0)) for c in collections]
+  }
+  if limit is not None:
+    response['next_cursor'] = _encode_cursor(collections[-1].id, collections[-1].id) if has_more else None
+
+  return jsonify(response), 200
 
 @library_bp.route('/collections', methods=['POST'])
 def create_collection():
@@ -32,7 +109,7 @@ def create_collection():
     db.session.commit()
     return jsonify({
       'success': True,
-      'collection': collection.to_dict()
+      'collection': collection.to_dict(paper_count=0)
     }), 201
   except Exception as e:
     print('CREATE_COLLECTION_ERROR:', e, file=sys.stderr)
@@ -115,6 +192,151 @@ def save_paper():
       print('SAVE_PAPER_ERROR:', e, file=sys.stderr)
       return jsonify({'error': str(e)}), 500
 
+def _bulk_item(raw):
+  """Normalize one bulk-save item (an id string or a dict) to a dict, or None if unusable."""
+  item = {'paper_id': raw} if isinstance(raw, str) else raw
+  if not isinstance(item, dict) or not isinstance(item.get('paper_id'), str) or not item['paper_id'].strip():
+    return None
+  item = dict(item)
+  paper_id = item['paper_id'].strip()
+  if paper_id.startswith('http') and not DOI_PATTERN.match(paper_id):
+    paper_id = paper_id.split('/')[-1]
+  item['paper_id'] = paper_id.upper() if WORK_ID_PATTERN.match(paper_id) else paper_id
+  return item
+
+@library_bp.route('/collections/<int:collection_id>/papers:bulk', methods=['POST'])
+def bulk_save_papers(collection_id):
+  """Save many papers to a collection in one transaction.
+
+  Body: ``{"user_id": ..., "papers": [id | {"paper_id", "notes", "status", ...metadata}]}``.
+  Already-saved papers are found with one query, unknown papers are resolved
+  with one batched OpenAlex lookup, and every new SavedPaper is committed
+  together. Each input item gets a result: saved, already_saved, duplicate,
+  not_found or invalid.
+  """
+  import sys
+  data = request.get_json(silent=True) or {}
+  user_id = data.get('user_id', 'anonymous')
+  raw_items = data.get('papers')
+
+  if not isinstance(raw_items, list) or not raw_items:
+    return jsonify({'error': 'Request body must include a non-empty "papers" array'}), 400
+
+  max_papers = current_app.config['LIBRARY_BULK_MAX_PAPERS']
+  if len(raw_items) > max_papers:
+    return jsonify({'error': f'Maximum {max_papers} papers per bulk request'}), 400
+
+  collection = Collection.query.filter_by(id=collection_id, user_id=user_id).first()
+  if not collection:
+    return jsonify({'error': 'Collection not found'}), 404
+
+  items = [_bulk_item(raw) for raw in raw_items]
+  wanted = list(dict.fromkeys(item['paper_id'] for item in items if item))
+
+  already_saved = set()
+  for start in range(0, len(wanted), 500):
+    already_saved.update(paper_id for (paper_id,) in db.session.query(SavedPaper.paper_id).filter(
+      SavedPaper.collection_id == collection_id,
+      SavedPaper.user_id == user_id,
+      SavedPaper.paper_id.in_(wanted[start:start + 500])
+    ))
+
+  to_save = [paper_id for paper_id in wanted if paper_id not in already_saved]
+  papers = {}
+  for start in range(0, len(to_save), 500):
+    papers.update((paper.id, paper) for paper in Paper.query.filter(Paper.id.in_(to_save[start:start + 500])))
+
+  unresolved = [paper_id for paper_id in to_save if paper_id not in papers]
+  if unresolved:
+    try:
+      resolved = OpenAlexService().get_papers_by_ids(unresolved)
+      papers.update((paper_id, paper) for paper_id, paper in resolved.items() if paper is not None)
+    except Exception as fetch_err:
+      print('OPENALEX_BULK_FETCH_ERROR:', fetch_err, file=sys.stderr)
+
+  # DOIs and other non-W ids resolve to a work id that may already be saved.
+  remapped = list({paper.id for paper_id, paper in papers.items() if paper.id != paper_id})
+  if remapped:
+    already_saved.update(paper_id for (paper_id,) in db.session.query(SavedPaper.paper_id).filter(
+      SavedPaper.collection_id == collection_id,
+      SavedPaper.user_id == user_id,
+      SavedPaper.paper_id.in_(remapped)
+    ))
+
+  try:
+    results = []
+    seen = set()
+    for raw, item in zip(raw_items, items):
+      if item is None:
+        results.append({'paper_id': raw if isinstance(raw, str) else None, 'status': 'invalid'})
+        continue
+
+      paper_id = item['paper_id']
+      if paper_id in seen:
+        results.append({'paper_id': paper_id, 'status': 'duplicate'})
+        continue
+      seen.add(paper_id)
+
+      if paper_id in already_saved:
+        results.append({'paper_id': paper_id, 'status': 'already_saved'})
+        continue
+
+      paper = papers.get(paper_id)
+      if paper is not None and paper.id != paper_id:
+        if paper.id in already_saved:
+          results.append({'paper_id': paper_id, 'status': 'already_saved'})
+          continue
+        if paper.id in seen:
+          results.append({'paper_id': paper_id, 'status': 'duplicate'})
+          continue
+        seen.add(paper.id)
+
+      if paper is None and item.get('title'):
+        # Same fallback as save_paper: keep the frontend-provided metadata.
+        paper = Paper(
+          id=paper_id,
+          title=item['title'],
+          publication_year=item.get('publication_year'),
+          venue=item.get('venue'),
+          doi=item.get('doi'),
+          citation_count=item.get('citation_count')
+        )
+        db.session.add(paper)
+      if paper is None:
+        results.append({'paper_id': paper_id, 'status': 'not_found'})
+        continue
+
+      saved_paper = SavedPaper(
+        paper_id=paper.id,
+        collection_id=collection_id,
+        user_id=user_id,
+        notes=item.get('notes', ''),
+        status=item.get('status', 'to_read')
+      )
+      db.session.add(saved_paper)
+      results.append({'paper_id': paper_id, 'status': 'saved', 'saved_paper': saved_paper})
+
+    db.session.flush()
+    for result in results:
+      if 'saved_paper' in result:
+        result['saved_paper_id'] = result.pop('saved_paper').id
+    db.session.commit()
+  except Exception as e:
+    db.session.rollback()
+    print('BULK_SAVE_PAPERS_ERROR:', e, file=sys.stderr)
+    return jsonify({'error': 'Bulk save failed', 'message': str(e)}), 500
+
+  summary = {}
+  for result in results:
+    summary[result['status']] = summary.get(result['status'], 0) + 1
+
+  return jsonify({
+    'success': True,
+    'collection': collection.to_dict(),
+    'results': results,
+    'summary': summary
+  }), 200
+
 @library_bp.route('/saved-papers/<int:saved_paper_id>', methods=['PUT'])
 def update_saved_paper(saved_paper_id):
   user_id = request.args.get('user_id', 'anonymous')
@@ -150,7 +372,7 @@ def delete_saved_paper(saved_paper_id):
 
   return jsonify({'success': True}), 200
 
-def _get_paper_metadata(saved_paper):
+def _get_paper_metadata(saved_paper, authors=None):
   
   paper = saved_paper.paper
   metadata = {
@@ -167,8 +389,10 @@ def _get_paper_metadata(saved_paper):
     metadata['publication_year'] = paper.publication_year
     metadata['venue'] = paper.venue
     metadata['doi'] = paper.doi
-    if hasattr(paper, 'authors') and paper.authors:
-      metadata['authors'] = ' and '.join([a.display_name for a in paper.authors.all()])
+    if authors is None:
+      authors = [a.to_dict() for a in paper.authors.all()]
+    if authors:
+      metadata['authors'] = ' and '.join([a['display_name'] for a in authors])
   
   if not metadata['title'] or metadata['title'] == 'Unknown':
     try:
@@ -213,15 +437,33 @@ def get_collection_papers(collection_id):
   if not collection:
     return jsonify({'error': 'Collection not found'}), 404
 
-  saved_papers = SavedPaper.query.filter_by(
-    collection_id=collection_id,
-    user_id=user_id
-  ).all()
+  sort = request.args.get('sort', 'saved_at')
+  if sort not in SAVED_PAPER_SORTS:
+    return jsonify({
+      'error': 'Unsupported sort',
+      'supported_sorts': list(SAVED_PAPER_SORTS)
+    }), 400
+
+  try:
+    limit, cursor, order = _page_args()
+    after = _decode_cursor(cursor, sort) if cursor else None
+  except ValueError as e:
+    return jsonify({'error': str(e)}), 400
+
+  sort_key = SAVED_PAPER_SORTS[sort]
+  saved_papers, has_more = _keyset_page(
+    SavedPaper.query.options(db.joinedload(SavedPaper.paper)).filter_by(
+      collection_id=collection_id,
+      user_id=user_id
+    ),
+    sort_key, SavedPaper.id, limit, after, order
+  )
+  authors = Paper.load_authors([sp.paper_id for sp in saved_papers])
 
   enriched_papers = []
   for sp in saved_papers:
-    sp_dict = sp.to_dict()
-    metadata = _get_paper_metadata(sp)
+    sp_dict = sp.to_dict(authors=authors.get(sp.paper_id))
+    metadata = _get_paper_metadata(sp, authors=authors.get(sp.paper_id))
     
     if 'paper' in sp_dict:
       sp_dict['paper']['title'] = metadata['title']
@@ -240,41 +482,43 @@ def get_collection_papers(collection_id):
     
     enriched_papers.append(sp_dict)
 
-  return jsonify({
+  response = {
     'success': True,
     'collection': collection.to_dict(),
     'papers': enriched_papers
-  }), 200
+  }
+  if limit is not None:
+    response['sort'] = sort
+    response['order'] = order
+    response['next_cursor'] = None
+    if has_more:
+      last = saved_papers[-1]
+      value = last.saved_at if sort == 'saved_at' else (last.status or '')
+      response['next_cursor'] = _encode_cursor(value, last.id)
+
+  return jsonify(response), 200
 
 @library_bp.route('/collections/<int:collection_id>/export', methods=['GET'])
 def export_collection(collection_id):
   user_id = request.args.get('user_id', 'anonymous')
-  format_type = request.args.get('format', 'bibtex')
+  format_type = request.args.get('format', 'bibtex').lower()
 
   collection = Collection.query.filter_by(id=collection_id, user_id=user_id).first()
 
   if not collection:
     return jsonify({'error': 'Collection not found'}), 404
 
-  saved_papers = SavedPaper.query.filter_by(
-    collection_id=collection_id,
-    user_id=user_id
-  ).all()
-
-  if format_type == 'bibtex':
-    bibtex_entries = []
-    for sp in saved_papers:
-      metadata = _get_paper_metadata(sp)
-      
-      entry = f"""@article{{{metadata['id']},
-    title = {{{metadata['title']}}},
-    author = {{{metadata['authors']}}},
-    year = {{{metadata['publication_year']}}},
-    journal = {{{metadata['venue']}}},
-    doi = {{{metadata['doi']}}}
-}}"""
-      bibtex_entries.append(entry)
-    
-    return '\n\n'.join(bibtex_entries), 200, {'Content-Type': 'text/plain'}
-  
-  return jsonify({'error': 'Unsupported format'}), 400
\ No newline at end of file
+  if format_type not in EXPORT_FORMATS:
+    return jsonify({
+      'error': 'Unsupported format',
+      'supported_formats': list(EXPORT_FORMATS)
+    }), 400
+
+  content_type, extension = EXPORT_FORMATS[format_type]
+  body = stream_export(iter_export_entries(collection_id, user_id), format_type)
+
+  return Response(
+    stream_with_context(body),
+    content_type=content_type,
+    headers={'Content-Disposition': f'attachment; filename="collection-{collection_id}.{extension}"'}
+  )
@@ -1,18 +1,34 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.services import OpenAlexService
+from app.services.projection import PAPER_FIELDS, NODE_FIELDS, GRAPH_NODE_FIELDS, parse_fields, project
+from app.services.scoring import SORT_KEYS, score_graph_nodes
+from app.services.graph_layout import annotate_nodes, layout_graph, parse_layout_args
+from app.services.related import METHODS as RELATED_METHODS, ORDERS as RELATED_ORDERS, related_papers
 from app.models import Paper, Citation
 
 papers_bp = Blueprint('papers', __name__)
 
+def _invalid_fields(error, allowed=PAPER_FIELDS):
+  return jsonify({
+    'error': str(error),
+    'allowed_fields': list(allowed)
+  }), 400
+
+
 @papers_bp.route('/<paper_id>', methods=['GET'])
 def get_paper_details(paper_id):
 
   include_abstract = request.args.get('include_abstract', 'true').lower() == 'true'
   force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
 
+  try:
+    fields = parse_fields(request.args.get('fields'))
+  except ValueError as e:
+    return _invalid_fields(e)
+
   try:
     service = OpenAlexService()
-    paper = service.get_paper_details(paper_id, force_refresh=force_refresh)
+    paper = service.get_paper_details(paper_id, force_refresh=force_refresh, fields=fields)
 
     if not paper:
       return jsonify({
@@ -21,7 +37,7 @@ def get_paper_details(paper_id):
       }), 404
     return jsonify({
       'success': True,
-      'paper': paper.to_dict(include_authors=True, include_abstract=include_abstract)
+      'paper': paper.to_dict(include_authors=True, include_abstract=include_abstract, fields=fields)
     }), 200
   
   except Exception as e:
@@ -34,12 +50,22 @@ def get_paper_details(paper_id):
 def get_paper_citations(paper_id):
 
   include_references = request.args.get('include_references', 'true').lower() == 'true'
+  force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
+  partial = request.args.get('partial', 'false').lower() == 'true'
+
+  try:
+    fields = parse_fields(request.args.get('fields'))
+  except ValueError as e:
+    return _invalid_fields(e)
 
   try:
     service = OpenAlexService()
     citation_data = service.get_paper_citations(
       paper_id, 
-      fetch_cited_papers=include_references
+      fetch_cited_papers=include_references,
+      force_refresh=force_refresh,
+      partial_timeout=current_app.config['OPENALEX_PARTIAL_TIMEOUT'] if partial else None,
+      fields=fields
     )
 
     if not citation_data:
@@ -72,29 +98,85 @@ def get_citation_graph(paper_id):
   except ValueError:
     depth = 1
 
+  force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
+  partial = request.args.get('partial', 'false').lower() == 'true'
+
+  try:
+    node_fields = parse_fields(request.args.get('fields'), allowed=GRAPH_NODE_FIELDS, required=('id', 'type'))
+  except ValueError as e:
+    return _invalid_fields(e, allowed=GRAPH_NODE_FIELDS)
+
+  sort = request.args.get('sort')
+  if sort is not None and sort not in SORT_KEYS:
+    return jsonify({
+      'error': 'Invalid sort',
+      'allowed_sorts': list(SORT_KEYS)
+    }), 400
+  include_scores = request.args.get('scores', 'false').lower() == 'true'
+
+  try:
+    layout, metrics, width, height = parse_layout_args(request.args)
+  except ValueError as e:
+    return jsonify({'error': str(e)}), 400
+
+  def finish(graph_data):
+    # Layout and metrics need every node's year and citation count, so they run before projection.
+    annotations = None
+    if layout is not None or metrics:
+      computed = layout_graph(
+        graph_data, depth, layout=layout, metrics=metrics, width=width, height=height,
+        cache=current_app.extensions['graph_layout_cache']
+      )
+      annotations = computed['nodes']
+      if layout is not None:
+        graph_data['layout'] = computed['layout']
+      if metrics:
+        graph_data['metrics'] = computed['metrics']
+
+    nodes = annotate_nodes(project(graph_data['nodes'], node_fields), annotations)
+    graph_data['nodes'] = score_graph_nodes(nodes, sort, include_scores)
+
   try:
     service = OpenAlexService()
-    paper = service.get_paper_details(paper_id)
 
-    if not paper:
+    if depth > 1:
+      graph_data = service.get_citation_network(paper_id, depth=depth)
+      if not graph_data:
+        return jsonify({
+          'error': 'Paper not found',
+          'paper_id': paper_id
+        }), 404
+      finish(graph_data)
       return jsonify({
-        'error': 'Paper not found',
-        'paper_id': paper_id
-      }), 404
-    
-    citation_data = service.get_paper_citations(paper_id, fetch_cited_papers=True)
+        'success': True,
+        'graph': graph_data,
+        'partial': graph_data['truncated'],
+        'missing': []
+      }), 200
+
+    # Graph nodes only need NODE_FIELDS, so skip abstracts and authorships end to end.
+    citation_data = service.get_paper_citations(
+      paper_id,
+      fetch_cited_papers=True,
+      force_refresh=force_refresh,
+      partial_timeout=current_app.config['OPENALEX_PARTIAL_TIMEOUT'] if partial else None,
+      fields=NODE_FIELDS
+    )
 
     if not citation_data:
       return jsonify({
-        'error': 'Failed to fetch citations',
+        'error': 'Paper not found',
         'paper_id': paper_id
-      }), 500
+      }), 404
     
     graph_data = citation_data.get('citation_graph')
+    finish(graph_data)
 
     return jsonify({
       'success': True,
-      'graph': graph_data
+      'graph': graph_data,
+      'partial': citation_data['partial'],
+      'missing': citation_data['missing']
     }), 200
 
   except Exception as e:
@@ -103,6 +185,55 @@ def get_citation_graph(paper_id):
       'message': str(e)
     }), 500
 
+@papers_bp.route('/<paper_id>/related', methods=['GET'])
+def get_related_papers(paper_id):
+
+  paper_id = paper_id.split('/')[-1]
+
+  method = request.args.get('method', 'combined')
+  if method not in RELATED_METHODS:
+    return jsonify({
+      'error': 'Invalid method',
+      'allowed_methods': list(RELATED_METHODS)
+    }), 400
+
+  order = request.args.get('order', 'score')
+  if order not in RELATED_ORDERS:
+    return jsonify({
+      'error': 'Invalid order',
+      'allowed_orders': list(RELATED_ORDERS)
+    }), 400
+
+  top_k = current_app.config['RELATED_PAPERS_TOP_K']
+  try:
+    limit = min(max(int(request.args.get('limit', 10)), 1), top_k)
+  except ValueError:
+    limit = 10
+
+  try:
+    fields = parse_fields(request.args.get('fields'))
+  except ValueError as e:
+    return _invalid_fields(e)
+
+  try:
+    related = related_papers(paper_id, method=method, order=order, limit=limit, fields=fields)
+
+    if related is None:
+      return jsonify({
+        'error': 'Paper not found',
+        'paper_id': paper_id
+      }), 404
+    return jsonify({
+      'success': True,
+      **related
+    }), 200
+
+  except Exception as e:
+    return jsonify({
+      'error': 'Failed to fetch related papers',
+      'message': str(e)
+    }), 500
+
 @papers_bp.route('/<paper_id>/expand', methods=['POST'])
 def expand_paper_node(paper_id):
 
@@ -113,17 +244,15 @@ def expand_paper_node(paper_id):
 
     service = OpenAlexService()
 
-    paper = service.get_paper_details(paper_id)
-    if not paper:
-      return jsonify({
-        'error': 'Paper not found',
-        'paper_id': paper_id
-      }), 404
-    
     citation_data = service.get_paper_citations(
       paper_id,
       fetch_cited_papers=fetch_references
     )
+    if not citation_data:
+      return jsonify({
+        'error': 'Paper not found',
+        'paper_id': paper_id
+      }), 404
 
     return jsonify({
       'success': True,
@@ -149,37 +278,47 @@ def get_multiple_papers():
   try:
     data = request.get_json()
 
-    if not data or 'papers_ids' not in data:
+    if not data or 'paper_ids' not in data:
       return jsonify({
-        'error': 'Request body must include "papers_ids" array'
+        'error': 'Request body must include "paper_ids" array'
       }), 400
     
     paper_ids = data.get('paper_ids', [])
     include_abstract = data.get('include_abstract', False)
+    force_refresh = bool(data.get('force_refresh', False))
 
-    if not isinstance(paper_ids, list) or len(paper_ids) == 0:
+    try:
+      fields = parse_fields(data.get('fields'))
+    except ValueError as e:
+      return _invalid_fields(e)
+
+    if not isinstance(paper_ids, list) or len(paper_ids) == 0 or not all(isinstance(pid, str) for pid in paper_ids):
       return jsonify({
-        'error': 'paper_ids must be a non-empty array'
+        'error': 'paper_ids must be a non-empty array of strings'
       }), 400
     
-    if len(paper_ids) > 50:
+    max_ids = current_app.config['PAPERS_BATCH_MAX_IDS']
+    if len(paper_ids) > max_ids:
       return jsonify({
-        'error': 'Maximum 50 papers per batch request'
+        'error': f'Maximum {max_ids} papers per batch request'
       }), 400
 
     
     service = OpenAlexService()
-    papers = []
+    resolved = service.get_papers_by_ids(paper_ids, force_refresh=force_refresh, fields=fields)
+    found = []
     not_found = []
 
     for paper_id in paper_ids:
-      paper = service.get_paper_details(paper_id)
+      paper = resolved.get(paper_id)
       if paper:
-        papers.append(paper.to_dict(include_authors=True, include_abstract=include_abstract))
+        found.append(paper)
       
       else:
         not_found.append(paper_id)
 
+    papers = Paper.serialize_many(found, include_authors=True, include_abstract=include_abstract, fields=fields)
+
     return jsonify({
       'success': True,
       'papers': papers,
@@ -1,5 +1,8 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify, current_app
 from app.services import OpenAlexService
+from app.services.projection import PAPER_FIELDS, parse_fields
+from app.services.scoring import SORT_KEYS, score_papers
 
 search_bp = Blueprint('search', __name__)
 
@@ -14,6 +17,28 @@ def search_papers():
       'example': '/api/search?q=machine+learning'
     }), 400
   
+  source = request.args.get('source', 'remote').lower()
+  if source not in ('remote', 'local', 'hybrid'):
+    return jsonify({
+      'error': 'Invalid source. Use remote, local, or hybrid.'
+    }), 400
+
+  try:
+    fields = parse_fields(request.args.get('fields'))
+  except ValueError as e:
+    return jsonify({
+      'error': str(e),
+      'allowed_fields': list(PAPER_FIELDS)
+    }), 400
+
+  sort = request.args.get('sort')
+  if sort is not None and sort not in SORT_KEYS:
+    return jsonify({
+      'error': 'Invalid sort',
+      'allowed_sorts': list(SORT_KEYS)
+    }), 400
+  include_scores = request.args.get('scores', 'false').lower() == 'true'
+
   filters = {}
 
   try:
@@ -43,21 +68,49 @@ def search_papers():
       'error': 'Invalid pagination values. page and per_page must be integers.'
     }), 400
 
+  # Hybrid pages are cut from the local cache as of this time; later pages pass back meta.as_of.
+  options = {}
+  if source == 'hybrid' and request.args.get('as_of'):
+    try:
+      as_of = datetime.fromisoformat(request.args['as_of'])
+    except ValueError:
+      return jsonify({
+        'error': 'Invalid as_of. Use the meta.as_of value from the first page.'
+      }), 400
+    # cached_at is stored as naive UTC.
+    if as_of.tzinfo is not None:
+      as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+    options['as_of'] = as_of
+
   try:
 
     service = OpenAlexService()
-    results = service.search_papers(
+    if source == 'local':
+      search = service.search_local
+    elif source == 'hybrid':
+      search = service.search_hybrid
+    else:
+      search = service.search_papers
+
+    results = search(
       query=query,
       filters=filters if filters else None,
       page=page,
-      per_page=per_page
+      per_page=per_page,
+      fields=fields,
+      **options
     )
 
+    # Scores and sort= apply to the returned page.
+    papers = score_papers(results['results'], sort=sort, include_scores=include_scores)
+
     return jsonify({
       'success': True,
       'query': query,
+      'source': source,
       'filters': filters,
-      'results': results['results'],
+      'sort': sort,
+      'results': papers,
       'meta': results['meta']
     }), 200
 
@@ -87,46 +140,53 @@ def search_suggestions():
   
   try:
 
-    service = OpenAlexService()
+    index = current_app.extensions['suggestion_index']
+    index.ensure_loaded()
 
-    results = service.search_papers(
-      query=query,
-      page=1,
-      per_page=limit
-    )
+    suggestions = index.search(query, limit=limit)
+    seen = {suggestion['text'] for suggestion in suggestions}
+    source = 'local'
 
-    suggestions = []
-    seen = set()
-
-    for paper in  results['results']:
-      title = paper.get('title', '')
-      if title and title not in seen:
-        suggestions.append({
-          'type': 'paper',
-          'text': title,
-          'paper_id': paper.get('id')
-        })
-        seen.add(title)
-      
-      for author in paper.get('authors', []):
-        author_name = author.get('display_name', '')
-        if author_name and author_name not in seen:
-          suggestions.append({
-            'type': 'author',
-            'text': author_name,
-            'author_id': author.get('id')
-          })
-          seen.add(author_name)
+    if len(suggestions) < min(limit, current_app.config['SUGGESTIONS_MIN_LOCAL_MATCHES']):
+      source = 'hybrid' if suggestions else 'remote'
+      service = OpenAlexService()
 
+      results = service.search_papers(
+        query=query,
+        page=1,
+        per_page=limit
+      )
+
+      for paper in  results['results']:
         if len(suggestions) >= limit:
           break
-      
-      if len(suggestions) >= limit:
-        break
+
+        title = paper.get('title', '')
+        if title and title not in seen:
+          suggestions.append({
+            'type': 'paper',
+            'text': title,
+            'paper_id': paper.get('id')
+          })
+          seen.add(title)
+        
+        for author in paper.get('authors', []):
+          if len(suggestions) >= limit:
+            break
+
+          author_name = author.get('display_name', '')
+          if author_name and author_name not in seen:
+            suggestions.append({
+              'type': 'author',
+              'text': author_name,
+              'author_id': author.get('id')
+            })
+            seen.add(author_name)
     
     return jsonify({
       'success': True,
       'query': query,
+      'source': source,
       'suggestions': suggestions[:limit]
     }), 200
   
@@ -157,6 +217,32 @@ def get_available_filters():
                 'type': 'integer',
                 'description': 'Minimum number of citations',
                 'example': 10
+            },
+            'fields': {
+                'type': 'string',
+                'description': 'Comma-separated paper fields to return',
+                'allowed': list(PAPER_FIELDS),
+                'example': 'id,title,publication_year,citation_count'
+            },
+            'source': {
+                'type': 'string',
+                'description': 'remote (OpenAlex), local (cached papers, full-text ranked), or hybrid (local first, then remote)',
+                'default': 'remote'
+            },
+            'as_of': {
+                'type': 'string',
+                'description': 'source=hybrid only: meta.as_of from the first page, so later pages neither overlap nor skip',
+                'example': '2024-05-01T12:00:00'
+            },
+            'sort': {
+                'type': 'string',
+                'description': 'Reorder the returned page, highest first',
+                'allowed': list(SORT_KEYS)
+            },
+            'scores': {
+                'type': 'boolean',
+                'description': 'Add category, citation_velocity, recent_velocity, momentum, acceleration, age and relevance_score',
+                'default': False
             }
         },
         'pagination': {
@@ -175,6 +261,8 @@ def get_available_filters():
         'example_queries': [
             '/api/search?q=machine+learning&year_min=2020&per_page=10',
             '/api/search?q=climate+change&min_citations=100&year_max=2023',
-            '/api/search?q=quantum+computing&page=2'
+            '/api/search?q=quantum+computing&page=2',
+            '/api/search?q=graph+neural+networks&source=hybrid',
+            '/api/search?q=large+language+models&sort=recent_velocity&scores=true'
         ]
     }), 200
\ No newline at end of file
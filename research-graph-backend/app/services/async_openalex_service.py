@@ -0,0 +1,274 @@
+import asyncio
+import httpx
+from flask import current_app
+from app import db
+from app.models import Paper
+from app.services.fetch_plan import FetchPlan
+from app.services.graph_builder import CitationGraphBuilder, GRAPH_SELECT
+from app.services.openalex_service import OpenAlexService, WORK_ID_PATTERN, _refresh_search
+from app.services.rate_limiter import INTERACTIVE
+from app.services.search_cache import STALE
+
+
+class AsyncOpenAlexService:
+    """Asyncio variant of OpenAlexService for event-loop deployments.
+
+    Upstream calls go through the app's AsyncOpenAlexClient and the same
+    process-wide rate limiter, and independent calls run concurrently with
+    ``asyncio.wait``. Identical calls made through one instance share a single
+    upstream request, like the per-request FetchPlan on the sync side.
+
+    Database work reuses OpenAlexService's caching code on a worker thread
+    (``asyncio.to_thread``) inside its own app context. ORM objects can't
+    leave that thread, so methods that return a Paper on the sync service
+    return its dict here.
+    """
+
+    def __init__(self, app=None, priority=INTERACTIVE):
+        self.app = app or current_app._get_current_object()
+        self.client = self.app.extensions['openalex_async_client']
+        self.rate_limiter = self.app.extensions['openalex_rate_limiter']
+        self.search_cache = self.app.extensions['search_cache']
+        self.background_executor = self.app.extensions['background_executor']
+        self.priority = priority
+        self._calls = {}
+
+    async def _make_request(self, endpoint, params=None):
+        key = FetchPlan.key(endpoint, params)
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(endpoint, params))
+            self._calls[key] = task
+        return await asyncio.shield(task)
+
+    async def _request(self, endpoint, params=None):
+        if not await self.rate_limiter.acquire_async(priority=self.priority):
+            print(f"API rate limit wait exceeded for {endpoint}")
+            return None
+
+        try:
+            return await self.client.get(endpoint, params=params)
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"API request error: {e}")
+            return None
+
+    async def _fan_out(self, legs, timeout=None):
+        """Issue independent calls concurrently; same contract as OpenAlexService._fan_out."""
+        if not legs:
+            return {}, []
+
+        tasks = {
+            asyncio.ensure_future(self._make_request(endpoint, params)): name
+            for name, (endpoint, params) in legs.items()
+        }
+        done, not_done = await asyncio.wait(tasks, timeout=timeout)
+
+        responses = {tasks[task]: task.result() for task in done}
+        missing = sorted(tasks[task] for task in not_done)
+        if missing:
+            print(f"OpenAlex fan-out timed out waiting for: {', '.join(missing)}")
+        return responses, missing
+
+    async def _db(self, fn, *args):
+        """Run ``fn(sync_service, *args)`` on a worker thread with an app context."""
+        def run():
+            with self.app.app_context():
+                return fn(OpenAlexService(priority=self.priority), *args)
+        return await asyncio.to_thread(run)
+
+    def _sync(self, fn):
+        """Run a database-free ``fn(sync_service)`` inline, e.g. to build request params."""
+        with self.app.app_context():
+            return fn(OpenAlexService(priority=self.priority))
+
+    async def search_papers(self, query, filters=None, page=1, per_page=20, use_cache=True):
+        if not use_cache:
+            return await self._search_remote(query, filters, page, per_page) or _empty_search(page)
+
+        key = self.search_cache.key(query, filters, page, per_page)
+        payload, state = self.search_cache.get(key)
+        if state == STALE and self.search_cache.begin_refresh(key):
+            self.background_executor.submit(_refresh_search, self.app, key, query, filters, page, per_page)
+        if payload is not None:
+            payload['meta']['cache'] = state
+            return payload
+
+        result = await self._search_remote(query, filters, page, per_page)
+        if result is None:
+            return _empty_search(page)
+        self.search_cache.set(key, result)
+        result['meta']['cache'] = 'miss'
+        return result
+
+    async def _search_remote(self, query, filters=None, page=1, per_page=20):
+        params = self._sync(lambda service: service._search_params(query, filters, page, per_page))
+        data = await self._make_request('/works', params=params)
+        if not data:
+            return None
+        return await self._db(lambda service: service._search_result(query, data, page, per_page))
+
+    async def get_paper_details(self, paper_id, force_refresh=False):
+        if paper_id.startswith('http'):
+            paper_id = paper_id.split('/')[-1]
+
+        if not force_refresh:
+            cached = await self._db(_cached_paper_dict, paper_id)
+            if cached:
+                return cached
+
+        data = await self._make_request(f'/works/{paper_id}')
+        if not data:
+            return None
+        return await self._db(_cache_work_dict, data)
+
+    async def get_papers_by_ids(self, paper_ids, force_refresh=False):
+        """Async get_papers_by_ids; returns a dict of requested id -> paper dict or None."""
+        requested, work_ids, found = await self._db(_fresh_batch, paper_ids, force_refresh)
+
+        missing = [work_id for work_id in work_ids if work_id not in found]
+        legs = self._sync(lambda service: service._batch_legs(missing))
+        responses, _ = await self._fan_out(legs)
+        works = []
+        for data in responses.values():
+            works.extend((data or {}).get('results', []))
+        if works:
+            found.update(await self._db(_cache_works_dicts, works))
+
+        others = [work_id for work_id in requested.values() if not WORK_ID_PATTERN.match(work_id)]
+        resolved = await asyncio.gather(*[
+            self.get_paper_details(work_id, force_refresh=force_refresh) for work_id in others
+        ])
+        found.update(zip(others, resolved))
+
+        return {paper_id: found.get(work_id) for paper_id, work_id in requested.items()}
+
+    async def get_paper_citations(self, paper_id, fetch_cited_papers=True, force_refresh=False,
+                                  partial_timeout=None, fields=None):
+        if paper_id.startswith('http'):
+            paper_id = paper_id.split('/')[-1]
+
+        have_paper, local = await self._db(_local_citations, paper_id, fetch_cited_papers, force_refresh, fields)
+        if local is not None:
+            return local
+
+        legs = self._sync(
+            lambda service: service._citation_legs(paper_id, not have_paper, fetch_cited_papers, fields)
+        )
+        responses, missing = await self._fan_out(legs, timeout=partial_timeout)
+        return await self._db(
+            _citations_from_responses, paper_id, have_paper, responses, missing, fetch_cited_papers, fields
+        )
+
+    async def get_citation_network(self, paper_id, depth=2):
+        if paper_id.startswith('http'):
+            paper_id = paper_id.split('/')[-1]
+
+        graph = await self._db(_indexed_network, paper_id, depth)
+        if graph is not None:
+            return graph
+
+        builder = AsyncCitationGraphBuilder.from_config(self, depth, self.app.config)
+        return await builder.build(paper_id)
+
+    async def _cache_papers(self, works):
+        await self._db(_cache_works, works)
+
+    async def _cache_edges(self, edges):
+        await self._db(_cache_edges, edges)
+
+
+class AsyncCitationGraphBuilder(CitationGraphBuilder):
+    """CitationGraphBuilder whose upstream calls and cache writes are awaited."""
+
+    async def build(self, paper_id):
+        self._start()
+        root = await self.service._make_request(f'/works/{paper_id}', params={'select': GRAPH_SELECT})
+        self._upstream_calls += 1
+        if not root:
+            return None
+
+        frontier = self._plant(root)
+        await self.service._cache_papers([root])
+        for level in range(1, self.depth + 1):
+            fanout = self._fanout(level)
+            chunks = []
+            for chunk in self._chunks(frontier):
+                if self._out_of_budget():
+                    break
+                chunks.append(chunk)
+
+            # Every chunk of a level goes out at once; they are folded in frontier order.
+            results = await asyncio.gather(*[
+                self.service._fan_out(self._chunk_legs(chunk, fanout), timeout=self._remaining())
+                for chunk in chunks
+            ])
+            discovered = []
+            fetched = []
+            for chunk, (responses, missing) in zip(chunks, results):
+                chunk_fetched, found = self._absorb(chunk, level, fanout, responses, missing)
+                fetched.extend(chunk_fetched)
+                discovered.extend(found)
+            if fetched:
+                await self.service._cache_papers(fetched)
+
+            frontier = self._next_frontier(discovered)
+            if not frontier:
+                break
+
+        await self.service._cache_edges(sorted(self._edges))
+        return self._result()
+
+
+def _empty_search(page):
+    return {'results': [], 'meta': {'count': 0, 'page': page}}
+
+
+def _paper_dict(paper):
+    return paper.to_dict(include_authors=True, include_abstract=True) if paper else None
+
+
+def _cached_paper_dict(service, paper_id):
+    return _paper_dict(service._get_cached_paper(paper_id))
+
+
+def _cache_work_dict(service, work):
+    return _paper_dict(service._cache_paper(work, include_abstract=True))
+
+
+def _cache_works(service, works):
+    service._cache_papers(works)
+
+
+def _cache_edges(service, edges):
+    service._cache_edges(edges)
+
+
+def _indexed_network(service, paper_id, depth):
+    return service._indexed_network(paper_id, depth)
+
+
+def _cache_works_dicts(service, works):
+    papers = service._cache_papers(works, include_abstract=True)
+    return {
+        paper['id']: paper
+        for paper in Paper.serialize_many(papers, include_authors=True, include_abstract=True)
+    }
+
+
+def _fresh_batch(service, paper_ids, force_refresh):
+    requested, work_ids = service._batch_ids(paper_ids)
+    found = {} if force_refresh else service._fresh_papers(work_ids)
+    serialized = Paper.serialize_many(list(found.values()), include_authors=True, include_abstract=True)
+    return requested, work_ids, {paper['id']: paper for paper in serialized}
+
+
+def _local_citations(service, paper_id, fetch_cited_papers, force_refresh, fields):
+    paper = None if force_refresh else service._get_cached_paper(paper_id, fields)
+    if paper is not None and service._edges_fresh(paper):
+        return True, service._local_citations(paper, fetch_cited_papers, fields)
+    return paper is not None, None
+
+
+def _citations_from_responses(service, paper_id, have_paper, responses, missing, fetch_cited_papers, fields):
+    paper = db.session.get(Paper, paper_id, options=Paper.load_options(fields)) if have_paper else None
+    return service._citations_from_responses(paper, responses, missing, fetch_cited_papers, fields)
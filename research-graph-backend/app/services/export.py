@@ -0,0 +1,253 @@
+import json
+import re
+import unicodedata
+from app import db
+from app.models.paper import Paper, SavedPaper
+
+EXPORT_CHUNK = 500
+
+EXPORT_FORMATS = {
+    'bibtex': ('text/plain; charset=utf-8', 'bib'),
+    'ris': ('application/x-research-info-systems; charset=utf-8', 'ris'),
+    'csl-json': ('application/vnd.citationstyles.csl+json; charset=utf-8', 'json'),
+}
+
+KEY_STOPWORDS = frozenset([
+    'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'of', 'on', 'or', 'the', 'to', 'with',
+])
+
+# Backslash, tilde and caret have no backslash-escaped form, so they become text commands.
+BIBTEX_SPECIAL = re.compile(r'[\\{}&%$#_~^]')
+BIBTEX_COMMANDS = {'\\': r'\textbackslash{}', '~': r'\textasciitilde{}', '^': r'\textasciicircum{}'}
+
+
+def iter_export_entries(collection_id, user_id, chunk_size=EXPORT_CHUNK):
+    """Yield one metadata dict per saved paper in the collection, in save order.
+
+    Rows come from a single saved_papers/papers outer join streamed with
+    ``yield_per``, and authors are loaded in bulk once per chunk, so memory
+    stays flat however large the collection is.
+    """
+    rows = db.session.query(
+        SavedPaper.paper_id,
+        SavedPaper.notes,
+        Paper.id,
+        Paper.title,
+        Paper.publication_year,
+        Paper.venue,
+        Paper.doi,
+    ).outerjoin(
+        Paper, Paper.id == SavedPaper.paper_id
+    ).filter(
+        SavedPaper.collection_id == collection_id,
+        SavedPaper.user_id == user_id
+    ).order_by(
+        SavedPaper.id
+    ).execution_options(yield_per=chunk_size)
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield from _chunk_entries(chunk)
+            chunk = []
+    if chunk:
+        yield from _chunk_entries(chunk)
+
+
+def _chunk_entries(rows):
+    authors = Paper.load_authors([row.paper_id for row in rows if row.id is not None])
+    for row in rows:
+        yield _entry(row, authors.get(row.paper_id) or [])
+
+
+def _entry(row, authors):
+    entry = {
+        'id': row.paper_id,
+        'title': row.title,
+        'authors': [author['display_name'] for author in authors if author.get('display_name')],
+        'year': row.publication_year,
+        'venue': row.venue,
+        'doi': row.doi,
+    }
+
+    # Papers saved from frontend metadata keep it as JSON in notes.
+    if (not entry['title'] or entry['title'] == 'Unknown') and row.notes:
+        try:
+            notes = json.loads(row.notes)
+        except ValueError:
+            notes = None
+        if isinstance(notes, dict):
+            entry['title'] = notes.get('title') or entry['title']
+            entry['year'] = notes.get('publication_year') or entry['year']
+            entry['venue'] = notes.get('venue') or entry['venue']
+            entry['doi'] = notes.get('doi') or entry['doi']
+            names = [
+                author.get('display_name') if isinstance(author, dict) else author
+                for author in notes.get('authors') or []
+            ]
+            names = [name for name in names if isinstance(name, str) and name]
+            if names:
+                entry['authors'] = names
+
+    entry['title'] = entry['title'] or 'Unknown'
+    return entry
+
+
+class CitationKeys:
+    """Stable, readable citation keys: first author's family name + year + first title word.
+
+    Keys depend only on an entry's own metadata, so they are identical from
+    one export to the next; clashes within one export get ``a``, ``b``, ...
+    suffixes in save order.
+    """
+
+    def __init__(self):
+        self._used = set()
+        self._next_suffix = {}
+
+    def key(self, entry):
+        family = _split_name(entry['authors'][0])[0] if entry['authors'] else 'anon'
+        words = [word for word in re.findall(r'[a-z0-9]+', _ascii(entry['title'])) if word not in KEY_STOPWORDS]
+        base = '{}{}{}'.format(
+            re.sub(r'[^a-z0-9]', '', _ascii(family)) or 'anon',
+            entry['year'] or 'nd',
+            words[0] if words else ''
+        )
+
+        # Resume from the last suffix handed out for this base, so a thousand
+        # "smith2020graph" entries don't rescan the whole a, b, ... sequence.
+        key = base
+        suffix = self._next_suffix.get(base, 0)
+        while key in self._used:
+            key = base + _suffix(suffix)
+            suffix += 1
+        self._next_suffix[base] = suffix
+        self._used.add(key)
+        return key
+
+
+def format_bibtex(entry, key):
+    fields = [('title', entry['title'])]
+    if entry['authors']:
+        fields.append(('author', ' and '.join(_inverted_name(name) for name in entry['authors'])))
+    if entry['year']:
+        fields.append(('year', str(entry['year'])))
+    if entry['venue']:
+        fields.append(('journal', entry['venue']))
+    if entry['doi']:
+        fields.append(('doi', entry['doi']))
+
+    body = ',\n'.join(f'  {name} = {{{_bibtex_escape(value)}}}' for name, value in fields)
+    kind = 'article' if entry['venue'] else 'misc'
+    return f'@{kind}{{{key},\n{body}\n}}\n\n'
+
+
+def format_ris(entry, key):
+    lines = [('TY', 'JOUR' if entry['venue'] else 'GEN'), ('ID', key), ('TI', entry['title'])]
+    lines.extend(('AU', _inverted_name(name)) for name in entry['authors'])
+    if entry['year']:
+        lines.append(('PY', str(entry['year'])))
+    if entry['venue']:
+        lines.append(('JO', entry['venue']))
+    if entry['doi']:
+        lines.append(('DO', entry['doi']))
+        lines.append(('UR', f"https://doi.org/{entry['doi']}"))
+    lines.append(('ER', ''))
+    return ''.join(f'{tag}  - {_one_line(value)}\n' for tag, value in lines) + '\n'
+
+
+def format_csl(entry, key):
+    item = {
+        'id': key,
+        'type': 'article-journal' if entry['venue'] else 'article',
+        'title': entry['title'],
+    }
+    if entry['authors']:
+        item['author'] = [_csl_name(name) for name in entry['authors']]
+    if entry['year']:
+        item['issued'] = {'date-parts': [[int(entry['year'])]]} if str(entry['year']).isdigit() \
+            else {'literal': str(entry['year'])}
+    if entry['venue']:
+        item['container-title'] = entry['venue']
+    if entry['doi']:
+        item['DOI'] = entry['doi']
+    item['note'] = f"OpenAlex: {entry['id']}"
+    return json.dumps(item, ensure_ascii=False)
+
+
+def stream_export(entries, format_type):
+    """Yield the export body in pieces of roughly ``EXPORT_CHUNK`` entries."""
+    keys = CitationKeys()
+
+    if format_type == 'csl-json':
+        yield '['
+        first = True
+        buffer = []
+        for entry in entries:
+            buffer.append(('\n' if first else ',\n') + format_csl(entry, keys.key(entry)))
+            first = False
+            if len(buffer) >= EXPORT_CHUNK:
+                yield ''.join(buffer)
+                buffer = []
+        buffer.append('\n]\n')
+        yield ''.join(buffer)
+        return
+
+    formatter = format_bibtex if format_type == 'bibtex' else format_ris
+    buffer = []
+    for entry in entries:
+        buffer.append(formatter(entry, keys.key(entry)))
+        if len(buffer) >= EXPORT_CHUNK:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _ascii(text):
+    return unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def _suffix(index):
+    # a, b, ..., z, aa, ab, ...
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('a') + remainder) + letters
+    return letters
+
+
+def _split_name(name):
+    """Return ``(family, given)`` for a display name such as ``Jane Q. Smith``."""
+    name = ' '.join(str(name).split())
+    if ',' in name:
+        family, _, given = name.partition(',')
+        return family.strip(), given.strip()
+    parts = name.rsplit(' ', 1)
+    if len(parts) == 1:
+        return parts[0], ''
+    return parts[1], parts[0]
+
+
+def _inverted_name(name):
+    family, given = _split_name(name)
+    return f'{family}, {given}' if given else family
+
+
+def _csl_name(name):
+    family, given = _split_name(name)
+    return {'family': family, 'given': given} if given else {'literal': family}
+
+
+def _bibtex_escape(value):
+    # One pass, so the braces of an inserted command aren't escaped again.
+    return BIBTEX_SPECIAL.sub(
+        lambda match: BIBTEX_COMMANDS.get(match.group(), '\\' + match.group()),
+        _one_line(value)
+    )
+
+
+def _one_line(value):
+    return ' '.join(str(value).split())
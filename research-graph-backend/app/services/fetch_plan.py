@@ -0,0 +1,66 @@
+import threading
+from flask import g, has_request_context
+from app.services.metrics import fetch_plan_stats
+
+
+class _PlannedCall:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class FetchPlan:
+    """Request-scoped memo of OpenAlex responses keyed by endpoint and params.
+
+    The first caller for a key issues the upstream call; identical calls made
+    later in the same Flask request, including from fan-out threads, wait for
+    and reuse its response.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.issued = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(endpoint, params=None):
+        return endpoint, tuple(sorted((name, str(value)) for name, value in (params or {}).items()))
+
+    def fetch(self, endpoint, params, loader):
+        key = self.key(endpoint, params)
+        with self._lock:
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = _PlannedCall()
+                self._calls[key] = call
+                self.issued += 1
+            else:
+                self.coalesced += 1
+
+        fetch_plan_stats.incr('issued' if owner else 'coalesced')
+
+        if owner:
+            try:
+                call.result = loader(endpoint, params)
+            finally:
+                call.done.set()
+        else:
+            call.done.wait()
+
+        return call.result
+
+    def header_value(self):
+        with self._lock:
+            return f'issued={self.issued}; coalesced={self.coalesced}'
+
+
+def get_fetch_plan():
+    """Return the current request's FetchPlan, or None outside a request."""
+    if not has_request_context():
+        return None
+    if 'openalex_fetch_plan' not in g:
+        g.openalex_fetch_plan = FetchPlan()
+    return g.openalex_fetch_plan
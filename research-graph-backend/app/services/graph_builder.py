@@ -0,0 +1,231 @@
+import time
+
+GRAPH_SELECT = ','.join([
+    'id',
+    'title',
+    'doi',
+    'publication_year',
+    'publication_date',
+    'primary_location',
+    'cited_by_count',
+    'counts_by_year',
+    'referenced_works',
+])
+
+
+def _short_id(openalex_id):
+    return (openalex_id or '').split('/')[-1]
+
+
+class CitationGraphBuilder:
+    """Breadth-first multi-hop citation graph built from batched OpenAlex calls.
+
+    Each level expands its frontier in chunks. One ``cites:W1|W2|...`` call
+    and one ``cited_by:W1|W2|...`` call cover a whole chunk, and edges are
+    recovered from each work's ``referenced_works``. Per-level fan-out caps,
+    node/edge budgets and a wall-clock budget keep depth 2-3 graphs bounded.
+    When a budget runs out the graph built so far is returned with
+    ``truncated`` set.
+    """
+
+    def __init__(self, service, depth, level_fanout=(50, 10, 5), max_frontier=50,
+                 max_nodes=500, max_edges=2000, time_budget=8, chunk_size=50):
+        self.service = service
+        self.depth = depth
+        self.level_fanout = level_fanout
+        self.max_frontier = max_frontier
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+        self.time_budget = time_budget
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_config(cls, service, depth, config):
+        return cls(
+            service,
+            depth,
+            level_fanout=config['GRAPH_LEVEL_FANOUT'],
+            max_frontier=config['GRAPH_MAX_FRONTIER'],
+            max_nodes=config['GRAPH_MAX_NODES'],
+            max_edges=config['GRAPH_MAX_EDGES'],
+            time_budget=config['GRAPH_TIME_BUDGET'],
+            chunk_size=config['GRAPH_FRONTIER_CHUNK']
+        )
+
+    def build(self, paper_id):
+        self._start()
+        root = self.service._make_request(f'/works/{paper_id}', params={'select': GRAPH_SELECT})
+        self._upstream_calls += 1
+        if not root:
+            return None
+
+        frontier = self._plant(root)
+        self.service._cache_papers([root])
+        for level in range(1, self.depth + 1):
+            fanout = self._fanout(level)
+            discovered = []
+            for chunk in self._chunks(frontier):
+                if self._out_of_budget():
+                    break
+                legs = self._chunk_legs(chunk, fanout)
+                responses, missing = self.service._fan_out(legs, timeout=self._remaining())
+                fetched, found = self._absorb(chunk, level, fanout, responses, missing)
+                if fetched:
+                    self.service._cache_papers(fetched)
+                discovered.extend(found)
+
+            frontier = self._next_frontier(discovered)
+            if not frontier:
+                break
+
+        self.service._cache_edges(sorted(self._edges))
+        return self._result()
+
+    def _start(self):
+        self._started = time.monotonic()
+        self._truncated = False
+        self._upstream_calls = 0
+        self._nodes = {}
+        self._edges = set()
+        self._refs = {}
+        self._referrers = {}
+        self._levels = [1]
+
+    def _plant(self, root):
+        """Add the root work; the caller caches it and expands the returned frontier."""
+        self._root_id = _short_id(root.get('id'))
+        self._remember(root)
+        self._add_node(root, 'main', 0)
+        return [self._root_id]
+
+    def _fanout(self, level):
+        return self.level_fanout[min(level - 1, len(self.level_fanout) - 1)]
+
+    def _chunks(self, frontier):
+        for start in range(0, len(frontier), self.chunk_size):
+            yield frontier[start:start + self.chunk_size]
+
+    def _next_frontier(self, discovered):
+        self._levels.append(len(discovered))
+        if self._truncated or not discovered:
+            return []
+        discovered.sort(key=lambda node_id: self._nodes[node_id]['citation_count'] or 0, reverse=True)
+        return discovered[:self.max_frontier]
+
+    def _result(self):
+        return {
+            'nodes': list(self._nodes.values()),
+            'edges': [
+                {'source': source, 'target': target, 'type': 'cites'}
+                for source, target in sorted(self._edges)
+            ],
+            'center_node': self._root_id,
+            'depth': self.depth,
+            'nodes_per_level': self._levels,
+            'truncated': self._truncated,
+            'upstream_calls': self._upstream_calls,
+            'elapsed_seconds': round(time.monotonic() - self._started, 3)
+        }
+
+    def _chunk_legs(self, chunk, fanout):
+        id_filter = '|'.join(chunk)
+        per_page = min(200, fanout * len(chunk))
+        return {
+            'citing': ('/works', {
+                'filter': f'cites:{id_filter}',
+                'per_page': per_page,
+                'sort': 'cited_by_count:desc',
+                'select': GRAPH_SELECT
+            }),
+            'referenced': ('/works', {
+                'filter': f'cited_by:{id_filter}',
+                'per_page': per_page,
+                'sort': 'cited_by_count:desc',
+                'select': GRAPH_SELECT
+            }),
+        }
+
+    def _absorb(self, chunk, level, fanout, responses, missing):
+        """Fold one chunk's responses into the graph; returns ``(fetched works, new node ids)``."""
+        self._upstream_calls += len(responses) + len(missing)
+        if missing:
+            self._truncated = True
+
+        chunk_set = set(chunk)
+        per_source = {}
+        discovered = []
+        fetched = []
+
+        for leg, node_type in (('citing', 'citing'), ('referenced', 'referenced')):
+            for work in (responses.get(leg) or {}).get('results', []):
+                work_id = _short_id(work.get('id'))
+                if not work_id:
+                    continue
+                fetched.append(work)
+                self._remember(work)
+
+                if node_type == 'citing':
+                    sources = self._refs[work_id] & chunk_set
+                else:
+                    sources = self._referrers.get(work_id, set()) & chunk_set
+                if not sources:
+                    continue
+
+                if work_id not in self._nodes:
+                    # Attribute the new node to the first frontier member with room left.
+                    source = next((s for s in sorted(sources) if per_source.get((s, leg), 0) < fanout), None)
+                    if source is None:
+                        continue
+                    if len(self._nodes) >= self.max_nodes:
+                        self._truncated = True
+                        continue
+                    per_source[(source, leg)] = per_source.get((source, leg), 0) + 1
+                    self._add_node(work, node_type, level)
+                    discovered.append(work_id)
+
+                self._link(work_id)
+
+        return fetched, discovered
+
+    def _remember(self, work):
+        work_id = _short_id(work.get('id'))
+        refs = {_short_id(ref) for ref in work.get('referenced_works') or []}
+        self._refs[work_id] = refs
+        for ref in refs:
+            self._referrers.setdefault(ref, set()).add(work_id)
+
+    def _add_node(self, work, node_type, level):
+        work_id = _short_id(work.get('id'))
+        self._nodes[work_id] = {
+            'id': work_id,
+            'title': work.get('title') or 'Untitled',
+            'year': work.get('publication_year'),
+            'citation_count': work.get('cited_by_count', 0),
+            'type': node_type,
+            'level': level
+        }
+
+    def _link(self, work_id):
+        # Edges to and from every node already in the graph, not just the chunk.
+        for target in self._refs.get(work_id, ()):
+            if target in self._nodes:
+                self._add_edge(work_id, target)
+        for source in self._referrers.get(work_id, ()):
+            if source in self._nodes:
+                self._add_edge(source, work_id)
+
+    def _add_edge(self, source, target):
+        if (source, target) in self._edges or source == target:
+            return
+        if len(self._edges) >= self.max_edges:
+            self._truncated = True
+            return
+        self._edges.add((source, target))
+
+    def _remaining(self):
+        return max(0.0, self.time_budget - (time.monotonic() - self._started))
+
+    def _out_of_budget(self):
+        if self._remaining() <= 0 or len(self._nodes) >= self.max_nodes:
+            self._truncated = True
+        return self._truncated
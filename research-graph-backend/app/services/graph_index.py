@@ -0,0 +1,566 @@
+import json
+import os
+import shutil
+import threading
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+import numpy as np
+from app.services.metrics import Counters
+
+CURRENT_FILE = 'CURRENT'
+SNAPSHOT_ARRAYS = (
+    'ids',
+    'year',
+    'citation_count',
+    'complete_at',
+    'out_indptr',
+    'out_indices',
+    'in_indptr',
+    'in_indices',
+)
+EPOCH = datetime(1970, 1, 1)
+
+# Edges cached this long before a snapshot's build started are replayed onto it anyway.
+REPLAY_SLACK = 300
+
+
+def _timestamp(value):
+    return (value - EPOCH).total_seconds() if value else 0.0
+
+
+def _csr(sources, targets, n):
+    """CSR adjacency of the ``sources -> targets`` edges; each row's targets come out sorted."""
+    order = np.lexsort((targets, sources))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32)
+
+
+def _gather(indptr, indices, rows):
+    """``(row, neighbour)`` arrays covering every CSR entry of ``rows``."""
+    rows = rows[rows < len(indptr) - 1]
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    owners = np.repeat(rows, lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owners, indices[np.repeat(starts, lengths) + offsets].astype(np.int64)
+
+
+class CitationGraphIndex:
+    """In-process CSR copy of the ``citations`` table for k-hop queries without SQL.
+
+    Paper ids are interned to int32 node numbers. Forward (references) and
+    reverse (cited-by) adjacency are CSR arrays, with year, citation count
+    and ``edges_complete_at`` columns alongside. Snapshots are directories of
+    ``.npy`` files that are memory-mapped on load, so worker processes share
+    the same pages. Edges cached after the snapshot go into small per-node
+    overflow sets, which are folded into the CSR arrays once they pass
+    ``compact_threshold``.
+
+    Each process only sees its own writes until a newer snapshot is built
+    (``flask build-graph-index``); ``refresh`` maps it in and replays the
+    edges this process cached since. That replay log is trimmed to the
+    installed build on every compaction and refresh and holds at most
+    ``log_limit`` edges; older ones are left for the next snapshot.
+    """
+
+    def __init__(self, snapshot_dir=None, enabled=False, compact_threshold=50000, refresh_interval=60,
+                 log_limit=200000):
+        self.snapshot_dir = snapshot_dir
+        self.enabled = enabled
+        self.compact_threshold = compact_threshold
+        self.refresh_interval = refresh_interval
+        self.log_limit = log_limit
+        self._lock = threading.RLock()
+        self.counters = Counters()
+        self.loaded = False
+        self.snapshot_name = None
+        self.built_at = None
+        self._checked_at = 0.0
+        self._log = deque(maxlen=log_limit)
+        self._complete_log = {}
+        empty = np.zeros(0, dtype=np.int32)
+        indptr = np.zeros(1, dtype=np.int64)
+        self._install([], empty, empty, np.zeros(0), indptr, empty, indptr, empty)
+
+    @classmethod
+    def from_config(cls, config, default_dir):
+        return cls(
+            snapshot_dir=config['GRAPH_INDEX_DIR'] or default_dir,
+            enabled=config['GRAPH_INDEX_ENABLED'],
+            compact_threshold=config['GRAPH_INDEX_COMPACT_THRESHOLD'],
+            refresh_interval=config['GRAPH_INDEX_REFRESH_INTERVAL'],
+            log_limit=config['GRAPH_INDEX_LOG_LIMIT']
+        )
+
+    def ensure_loaded(self):
+        """Map the newest snapshot, or build one from the database on first use."""
+        if self.loaded:
+            self.refresh()
+            return
+        with self._lock:
+            if not self.loaded and not self.load():
+                self.rebuild()
+
+    def refresh(self):
+        if time.time() - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = time.time()
+        name = self._current_snapshot()
+        if name is not None and name != self.snapshot_name:
+            self.load()
+        else:
+            with self._lock:
+                self._trim_log()
+
+    def load(self):
+        """Memory-map the snapshot ``CURRENT`` points at; returns whether there was one."""
+        name = self._current_snapshot()
+        if name is None:
+            return False
+
+        path = os.path.join(self.snapshot_dir, name)
+        try:
+            arrays = {key: np.load(os.path.join(path, f'{key}.npy'), mmap_mode='r') for key in SNAPSHOT_ARRAYS}
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Graph index snapshot load error: {e}")
+            return False
+
+        blob = arrays.pop('ids').tobytes().decode('utf-8')
+        ids = blob.split('\n') if blob else []
+        with self._lock:
+            self._install(ids, **arrays)
+            self.snapshot_name = name
+            self.built_at = meta['built_at']
+            self._checked_at = time.time()
+            self._replay()
+            self.loaded = True
+        self.counters.incr('loads')
+        return True
+
+    def rebuild(self, save=True):
+        """Rebuild from the citations and papers tables, then snapshot and map the result."""
+        built_at = time.time()
+        ids, year, citation_count, complete_at, sources, targets = self._read_tables()
+        n = len(ids)
+        out_indptr, out_indices = _csr(sources, targets, n)
+        in_indptr, in_indices = _csr(targets, sources, n)
+
+        if save and self.snapshot_dir:
+            try:
+                self._write_snapshot(built_at, ids, year, citation_count, complete_at,
+                                     out_indptr, out_indices, in_indptr, in_indices)
+                if self.load():
+                    self.counters.incr('rebuilds')
+                    return
+            except OSError as e:
+                print(f"Graph index snapshot write error: {e}")
+
+        with self._lock:
+            self._install(ids, year, citation_count, complete_at, out_indptr, out_indices, in_indptr, in_indices)
+            self.snapshot_name = None
+            self.built_at = built_at
+            self._replay()
+            self.loaded = True
+        self.counters.incr('rebuilds')
+
+    def add_edges(self, edges, complete_ids=()):
+        """Record freshly cached ``(citing_id, cited_id)`` edges.
+
+        Before the first load they are only logged, and replayed onto
+        whatever gets loaded, so a build racing with cache writes misses none.
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            added = 0
+            for citing_id, cited_id in edges:
+                if citing_id == cited_id:
+                    continue
+                self._log.append((now, citing_id, cited_id))
+                if self.loaded:
+                    added += self._add_edge(self._intern(citing_id), self._intern(cited_id))
+            for paper_id in complete_ids:
+                # Re-inserted so the dict stays in stamp order for trimming.
+                self._complete_log.pop(paper_id, None)
+                self._complete_log[paper_id] = now
+                if len(self._complete_log) > self.log_limit:
+                    del self._complete_log[next(iter(self._complete_log))]
+                if self.loaded:
+                    self._complete_at[self._intern(paper_id)] = now
+            if self._extra_edges > self.compact_threshold:
+                self._compact()
+        self.counters.incr('edges_added', added)
+
+    def update_papers(self, rows):
+        """Refresh ``(paper_id, year, citation_count)`` attributes; no-op until the index is loaded."""
+        if not self.loaded:
+            return
+        with self._lock:
+            for paper_id, year, citation_count in rows:
+                node = self._intern(paper_id)
+                self._year[node] = year or 0
+                self._citation_count[node] = citation_count or 0
+
+    def network_edges(self, paper_id, max_depth):
+        """Edges touching every paper within ``max_depth`` undirected hops, like ``Citation.get_citation_network``."""
+        with self._lock:
+            root = self._index.get(paper_id)
+            if root is None:
+                return set()
+
+            size = len(self._ids)
+            visited = np.zeros(size, dtype=bool)
+            visited[root] = True
+            frontier = np.array([root], dtype=np.int64)
+            keys = []
+            for _ in range(max_depth + 1):
+                if not len(frontier):
+                    break
+                sources, targets = self._incident(frontier)
+                keys.append(sources * size + targets)
+                touched = np.unique(np.concatenate((sources, targets)))
+                frontier = touched[~visited[touched]]
+                visited[frontier] = True
+
+            keys = np.unique(np.concatenate(keys)) if keys else np.zeros(0, dtype=np.int64)
+            ids = self._ids
+            self.counters.incr('network_queries')
+            return {(ids[key // size], ids[key % size]) for key in keys.tolist()}
+
+    def neighbourhood(self, paper_id, depth, level_fanout=(50, 10, 5), max_frontier=50,
+                      max_nodes=500, max_edges=2000, fresh_after=0.0):
+        """A CitationGraphBuilder-shaped graph answered from the index, or None.
+
+        Every paper that gets expanded (levels below ``depth``) must have
+        complete edges cached after ``fresh_after``; otherwise the local
+        neighbourhood could be missing links and the caller should go to
+        OpenAlex. Each expanded paper contributes its ``fanout`` most cited
+        citing and referenced papers per level, as the builder does. Nodes
+        carry only ``id``, ``type`` and ``level``.
+        """
+        started = time.monotonic()
+        with self._lock:
+            root = self._index.get(paper_id)
+            if root is None or self._complete_at[root] < fresh_after:
+                self.counters.incr('graph_misses')
+                return None
+
+            nodes = {root: ('main', 0)}
+            levels = [1]
+            truncated = False
+            frontier = [root]
+            for level in range(1, depth + 1):
+                fanout = level_fanout[min(level - 1, len(level_fanout) - 1)]
+                discovered = []
+                for node in frontier:
+                    if self._complete_at[node] < fresh_after:
+                        self.counters.incr('graph_misses')
+                        return None
+                    for node_type, neighbours in (('citing', self._citing(node)), ('referenced', self._referenced(node))):
+                        ranked = neighbours[np.argsort(-self._citation_count[neighbours], kind='stable')]
+                        added = 0
+                        for neighbour in ranked.tolist():
+                            if added >= fanout:
+                                break
+                            if neighbour in nodes:
+                                continue
+                            if len(nodes) >= max_nodes:
+                                truncated = True
+                                break
+                            nodes[neighbour] = (node_type, level)
+                            discovered.append(neighbour)
+                            added += 1
+
+                levels.append(len(discovered))
+                if truncated or not discovered:
+                    break
+                discovered.sort(key=lambda node: self._citation_count[node], reverse=True)
+                frontier = discovered[:max_frontier]
+
+            edges, clipped = self._induced_edges(list(nodes), max_edges)
+            ids = self._ids
+
+        self.counters.incr('graph_hits')
+        return {
+            'nodes': [
+                {'id': ids[node], 'type': node_type, 'level': level}
+                for node, (node_type, level) in nodes.items()
+            ],
+            'edges': [{'source': source, 'target': target, 'type': 'cites'} for source, target in edges],
+            'center_node': paper_id,
+            'depth': depth,
+            'nodes_per_level': levels,
+            'truncated': truncated or clipped,
+            'upstream_calls': 0,
+            'elapsed_seconds': round(time.monotonic() - started, 3)
+        }
+
+    def attributes(self, paper_id):
+        """``(year, citation_count)`` for an indexed paper, or None."""
+        with self._lock:
+            node = self._index.get(paper_id)
+            if node is None:
+                return None
+            return int(self._year[node]) or None, int(self._citation_count[node])
+
+    def stats(self):
+        with self._lock:
+            csr_edges = len(self._out_indices)
+            return {
+                'enabled': self.enabled,
+                'loaded': self.loaded,
+                'snapshot': self.snapshot_name,
+                'built_at': datetime.utcfromtimestamp(self.built_at).isoformat() if self.built_at else None,
+                'nodes': len(self._ids),
+                'edges': csr_edges + self._extra_edges,
+                'pending_edges': self._extra_edges,
+                'logged_edges': len(self._log),
+                'csr_bytes': int(sum(a.nbytes for a in (
+                    self._out_indptr, self._out_indices, self._in_indptr, self._in_indices
+                ))),
+                **self.counters.snapshot()
+            }
+
+    def _install(self, ids, year, citation_count, complete_at, out_indptr, out_indices, in_indptr, in_indices):
+        self._ids = list(ids)
+        self._index = {paper_id: node for node, paper_id in enumerate(self._ids)}
+        # Attribute columns are small and change often, so they are copied out of the mapping.
+        self._year = np.array(year, dtype=np.int32)
+        self._citation_count = np.array(citation_count, dtype=np.int32)
+        self._complete_at = np.array(complete_at, dtype=np.float64)
+        self._out_indptr = out_indptr
+        self._out_indices = out_indices
+        self._in_indptr = in_indptr
+        self._in_indices = in_indices
+        self._extra_out = {}
+        self._extra_in = {}
+        self._extra_edges = 0
+
+    def _intern(self, paper_id):
+        node = self._index.get(paper_id)
+        if node is not None:
+            return node
+        node = len(self._ids)
+        self._ids.append(paper_id)
+        self._index[paper_id] = node
+        if node >= len(self._year):
+            grow = max(1024, len(self._year))
+            self._year = np.concatenate((self._year, np.zeros(grow, dtype=np.int32)))
+            self._citation_count = np.concatenate((self._citation_count, np.zeros(grow, dtype=np.int32)))
+            self._complete_at = np.concatenate((self._complete_at, np.zeros(grow)))
+        return node
+
+    def _add_edge(self, source, target):
+        if self._in_csr(source, target) or target in self._extra_out.get(source, ()):
+            return 0
+        self._extra_out.setdefault(source, set()).add(target)
+        self._extra_in.setdefault(target, set()).add(source)
+        self._extra_edges += 1
+        return 1
+
+    def _in_csr(self, source, target):
+        if source >= len(self._out_indptr) - 1:
+            return False
+        row = self._out_indices[self._out_indptr[source]:self._out_indptr[source + 1]]
+        position = np.searchsorted(row, target)
+        return position < len(row) and row[position] == target
+
+    def _referenced(self, node):
+        return self._targets(np.array([node], dtype=np.int64))
+
+    def _citing(self, node):
+        return self._sources(np.array([node], dtype=np.int64))
+
+    def _targets(self, rows):
+        """Papers referenced by ``rows``, one entry per edge."""
+        _, targets = _gather(self._out_indptr, self._out_indices, rows)
+        return self._with_extra(targets, self._extra_out, rows)
+
+    def _sources(self, rows):
+        """Papers citing ``rows``, one entry per edge."""
+        _, sources = _gather(self._in_indptr, self._in_indices, rows)
+        return self._with_extra(sources, self._extra_in, rows)
+
+    @staticmethod
+    def _with_extra(neighbours, extra, rows):
+        if not extra:
+            return neighbours
+        found = [neighbour for row in rows.tolist() for neighbour in extra.get(row, ())]
+        if not found:
+            return neighbours
+        return np.concatenate((neighbours, np.array(found, dtype=np.int64)))
+
+    def _incident(self, rows):
+        """``(citing, cited)`` arrays for every edge touching ``rows``, in either direction."""
+        out_owners, out_targets = _gather(self._out_indptr, self._out_indices, rows)
+        in_owners, in_sources = _gather(self._in_indptr, self._in_indices, rows)
+        sources = [out_owners, in_sources]
+        targets = [out_targets, in_owners]
+
+        if self._extra_edges:
+            extra_sources, extra_targets = array('q'), array('q')
+            for row in rows.tolist():
+                for target in self._extra_out.get(row, ()):
+                    extra_sources.append(row)
+                    extra_targets.append(target)
+                for source in self._extra_in.get(row, ()):
+                    extra_sources.append(source)
+                    extra_targets.append(row)
+            sources.append(np.frombuffer(extra_sources, dtype=np.int64))
+            targets.append(np.frombuffer(extra_targets, dtype=np.int64))
+
+        return np.concatenate(sources), np.concatenate(targets)
+
+    def _induced_edges(self, nodes, max_edges):
+        """Sorted ``(citing_id, cited_id)`` pairs between ``nodes``, capped at ``max_edges``."""
+        rows = np.array(nodes, dtype=np.int64)
+        member = np.zeros(len(self._ids), dtype=bool)
+        member[rows] = True
+        owners, targets = _gather(self._out_indptr, self._out_indices, rows)
+        keep = member[targets] & (owners != targets)
+        ids = self._ids
+        edges = {(ids[source], ids[target]) for source, target in zip(owners[keep].tolist(), targets[keep].tolist())}
+        for source in nodes:
+            for target in self._extra_out.get(source, ()):
+                if member[target]:
+                    edges.add((ids[source], ids[target]))
+        edges = sorted(edges)
+        return edges[:max_edges], len(edges) > max_edges
+
+    def _compact(self):
+        """Fold the overflow sets into fresh in-memory CSR arrays."""
+        n = len(self._ids)
+        csr_sources = np.repeat(np.arange(len(self._out_indptr) - 1), np.diff(self._out_indptr))
+        extra = [(source, target) for source, targets in self._extra_out.items() for target in targets]
+        extra = np.array(extra, dtype=np.int64).reshape(-1, 2)
+        sources = np.concatenate((csr_sources, extra[:, 0]))
+        targets = np.concatenate((np.asarray(self._out_indices, dtype=np.int64), extra[:, 1]))
+
+        self._out_indptr, self._out_indices = _csr(sources, targets, n)
+        self._in_indptr, self._in_indices = _csr(targets, sources, n)
+        self._extra_out = {}
+        self._extra_in = {}
+        self._extra_edges = 0
+        self._trim_log()
+        self.counters.incr('compactions')
+
+    def _trim_log(self):
+        """Drop logged writes the installed build already contains; both logs are in stamp order."""
+        cutoff = (self.built_at or 0) - REPLAY_SLACK
+        while self._log and self._log[0][0] < cutoff:
+            self._log.popleft()
+        while self._complete_log:
+            paper_id = next(iter(self._complete_log))
+            if self._complete_log[paper_id] >= cutoff:
+                break
+            del self._complete_log[paper_id]
+
+    def _replay(self):
+        """Re-apply edges this process cached since just before the installed build."""
+        self._trim_log()
+        for _, citing_id, cited_id in self._log:
+            self._add_edge(self._intern(citing_id), self._intern(cited_id))
+        for paper_id, stamp in self._complete_log.items():
+            node = self._intern(paper_id)
+            self._complete_at[node] = max(self._complete_at[node], stamp)
+
+    def _read_tables(self):
+        from app import db
+        from app.models import Paper, Citation
+
+        ids = []
+        index = {}
+        year = array('i')
+        citation_count = array('i')
+        complete_at = array('d')
+
+        def intern(paper_id):
+            node = index.get(paper_id)
+            if node is None:
+                node = index[paper_id] = len(ids)
+                ids.append(paper_id)
+                year.append(0)
+                citation_count.append(0)
+                complete_at.append(0.0)
+            return node
+
+        papers = db.session.query(
+            Paper.id, Paper.publication_year, Paper.citation_count, Paper.edges_complete_at
+        ).execution_options(yield_per=10000)
+        for paper_id, publication_year, cites, edges_complete_at in papers:
+            node = intern(paper_id)
+            year[node] = publication_year or 0
+            citation_count[node] = cites or 0
+            complete_at[node] = _timestamp(edges_complete_at)
+
+        sources, targets = array('i'), array('i')
+        citations = db.session.query(
+            Citation.citing_paper_id, Citation.cited_paper_id
+        ).execution_options(yield_per=10000)
+        for citing_id, cited_id in citations:
+            if citing_id != cited_id:
+                sources.append(intern(citing_id))
+                targets.append(intern(cited_id))
+
+        return (
+            ids,
+            np.frombuffer(year, dtype=np.int32),
+            np.frombuffer(citation_count, dtype=np.int32),
+            np.frombuffer(complete_at, dtype=np.float64),
+            np.frombuffer(sources, dtype=np.int32).astype(np.int64),
+            np.frombuffer(targets, dtype=np.int32).astype(np.int64),
+        )
+
+    def _current_snapshot(self):
+        if not self.snapshot_dir:
+            return None
+        try:
+            with open(os.path.join(self.snapshot_dir, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _write_snapshot(self, built_at, ids, year, citation_count, complete_at,
+                        out_indptr, out_indices, in_indptr, in_indices):
+        """Write a new snapshot directory, then repoint ``CURRENT`` at it atomically."""
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        name = f'snapshot-{int(built_at * 1000)}-{os.getpid()}'
+        staging = os.path.join(self.snapshot_dir, f'{name}.tmp')
+        os.makedirs(staging, exist_ok=True)
+
+        arrays = {
+            'ids': np.frombuffer('\n'.join(ids).encode('utf-8'), dtype=np.uint8),
+            'year': year,
+            'citation_count': citation_count,
+            'complete_at': complete_at,
+            'out_indptr': out_indptr,
+            'out_indices': out_indices,
+            'in_indptr': in_indptr,
+            'in_indices': in_indices,
+        }
+        for key, values in arrays.items():
+            np.save(os.path.join(staging, f'{key}.npy'), values)
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump({'built_at': built_at, 'nodes': len(ids), 'edges': int(len(out_indices))}, f)
+        os.replace(staging, os.path.join(self.snapshot_dir, name))
+
+        pointer = os.path.join(self.snapshot_dir, f'{CURRENT_FILE}.tmp')
+        with open(pointer, 'w') as f:
+            f.write(name)
+        os.replace(pointer, os.path.join(self.snapshot_dir, CURRENT_FILE))
+
+        # Processes still mapping an older snapshot keep their pages on POSIX;
+        # where the files are locked (Windows) they are left for the next build.
+        for entry in os.listdir(self.snapshot_dir):
+            if entry.startswith('snapshot-') and not entry.endswith('.tmp') and entry != name:
+                shutil.rmtree(os.path.join(self.snapshot_dir, entry), ignore_errors=True)
@@ -0,0 +1,322 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+import numpy as np
+from app.services.metrics import Counters, hit_ratio
+
+CHRONOLOGICAL = 'chronological'
+FORCE = 'force'
+LAYOUTS = (CHRONOLOGICAL, FORCE)
+
+# Same canvas padding as the frontend's calculateChronologicalPositions.
+PADDING_X = 80
+PADDING_Y = 60
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-8
+PAGERANK_MAX_ITERATIONS = 100
+
+FORCE_ITERATIONS = 60
+MAX_YEAR_BANDS = 10
+
+DEFAULT_WIDTH = 1200
+DEFAULT_HEIGHT = 800
+MIN_CANVAS = 2 * PADDING_X + 40
+MAX_CANVAS = 10000
+
+
+def parse_layout_args(args):
+    """Read layout=, metrics=, width= and height= from query args.
+
+    Returns ``(layout, metrics, width, height)``; raises ValueError on a bad value.
+    """
+    layout = args.get('layout')
+    if layout is not None and layout not in LAYOUTS:
+        raise ValueError(f"Invalid layout. Use {' or '.join(LAYOUTS)}.")
+    metrics = str(args.get('metrics', 'false')).lower() == 'true'
+    try:
+        width = int(args.get('width', DEFAULT_WIDTH))
+        height = int(args.get('height', DEFAULT_HEIGHT))
+    except ValueError:
+        raise ValueError('width and height must be integers')
+    width = min(max(width, MIN_CANVAS), MAX_CANVAS)
+    height = min(max(height, MIN_CANVAS), MAX_CANVAS)
+    return layout, metrics, width, height
+
+
+class GraphLayoutCache:
+    """LRU cache of computed layouts and metrics, keyed per graph request shape.
+
+    Each entry remembers a digest of the graph it was computed for, so a
+    graph that has since grown (new edges cached, a forced refresh) misses
+    instead of getting positions for the wrong node set.
+    """
+
+    def __init__(self, ttl=3600, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = Counters()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            ttl=config['GRAPH_LAYOUT_CACHE_TTL'],
+            max_entries=config['GRAPH_LAYOUT_CACHE_MAX_ENTRIES']
+        )
+
+    @staticmethod
+    def key(center_id, depth, layout, metrics, width, height):
+        return (center_id, depth, layout, bool(metrics), width, height)
+
+    def get(self, key, digest):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == digest and time.time() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.counters.incr('hits')
+                return entry[2]
+        self.counters.incr('misses')
+        return None
+
+    def set(self, key, digest, result):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (digest, time.time(), result)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters.incr('evictions')
+
+    def stats(self):
+        data = self.counters.snapshot()
+        with self._lock:
+            data['entries'] = len(self._entries)
+        data['max_entries'] = self.max_entries
+        data['hit_ratio'] = hit_ratio(data.get('hits', 0), data.get('misses', 0))
+        return data
+
+
+def graph_digest(nodes, edges):
+    digest = hashlib.sha1()
+    for node in nodes:
+        digest.update(f"{node['id']}:{node.get('year')}:{node.get('citation_count')};".encode('utf-8'))
+    for edge in edges:
+        digest.update(f"{edge['source']}>{edge['target']};".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def layout_graph(graph, depth, layout=None, metrics=False, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, cache=None, today=None):
+    """Positions and/or metrics for a graph payload, served from ``cache`` when possible.
+
+    Returns ``{'nodes': {id: extra node keys}, 'layout': ..., 'metrics': ...}``;
+    the route merges the node keys into its (possibly projected) nodes.
+    """
+    nodes, edges = graph['nodes'], graph['edges']
+    if not nodes:
+        return {'nodes': {}, 'layout': None, 'metrics': None}
+
+    key = digest = None
+    if cache is not None:
+        key = GraphLayoutCache.key(nodes[0]['id'], depth, layout, metrics, width, height)
+        digest = graph_digest(nodes, edges)
+        cached = cache.get(key, digest)
+        if cached is not None:
+            return cached
+
+    result = GraphArrays(nodes, edges, today=today).compute(layout, metrics, width, height)
+    if cache is not None:
+        cache.set(key, digest, result)
+    return result
+
+
+def annotate_nodes(nodes, annotations):
+    """Merge per-node layout/metric keys into node dicts (returns new dicts)."""
+    if not annotations:
+        return nodes
+    return [dict(node, **annotations.get(node['id'], {})) for node in nodes]
+
+
+class GraphArrays:
+    """A graph payload as index arrays: node attributes plus a (source, target) edge array.
+
+    The center node is index 0, as in every graph payload. Edges whose
+    endpoints aren't both nodes are dropped.
+    """
+
+    def __init__(self, nodes, edges, today=None):
+        self.ids = [node['id'] for node in nodes]
+        self.n = len(self.ids)
+        index = {node_id: i for i, node_id in enumerate(self.ids)}
+        current_year = (today or date.today()).year
+
+        self.year = np.array(
+            [node.get('year') if node.get('year') is not None else np.nan for node in nodes],
+            dtype=np.float64
+        )
+        self.year_or_now = np.where(np.isnan(self.year), current_year, self.year)
+        self.citations = np.array([node.get('citation_count') or 0 for node in nodes], dtype=np.float64)
+        self.current_year = current_year
+
+        pairs = [
+            (index[edge['source']], index[edge['target']])
+            for edge in edges
+            if edge['source'] in index and edge['target'] in index
+        ]
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        self.source = pairs[:, 0]
+        self.target = pairs[:, 1]
+
+    def compute(self, layout, metrics, width, height):
+        result = {'nodes': {node_id: {} for node_id in self.ids}, 'layout': None, 'metrics': None}
+
+        if layout is not None:
+            if layout == CHRONOLOGICAL:
+                x, y, extra = self.chronological(width, height)
+            else:
+                x, y, extra = self.force(width, height)
+            for i, node_id in enumerate(self.ids):
+                result['nodes'][node_id].update({'x': round(float(x[i]), 1), 'y': round(float(y[i]), 1)})
+            result['layout'] = dict(extra, type=layout, width=width, height=height)
+
+        if metrics:
+            in_degree, out_degree = self.degrees()
+            pagerank, iterations = self.pagerank()
+            influence = self.influence()
+            band, bands = self.year_bands()
+            for i, node_id in enumerate(self.ids):
+                result['nodes'][node_id].update({
+                    'in_degree': int(in_degree[i]),
+                    'out_degree': int(out_degree[i]),
+                    'pagerank': round(float(pagerank[i]), 6),
+                    'influence': round(float(influence[i]), 2),
+                    'year_band': int(band[i]) if band[i] >= 0 else None,
+                })
+            result['metrics'] = {
+                'year_bands': bands,
+                'pagerank_iterations': iterations,
+                'edge_count': int(len(self.source)),
+            }
+
+        return result
+
+    def degrees(self):
+        """In-degree counts citations received inside the graph; out-degree, references made."""
+        return (
+            np.bincount(self.target, minlength=self.n),
+            np.bincount(self.source, minlength=self.n),
+        )
+
+    def pagerank(self, damping=PAGERANK_DAMPING):
+        """PageRank over citing -> cited edges; returns ``(scores, iterations)``.
+
+        Nodes that cite nothing in the graph spread their rank uniformly.
+        """
+        n = self.n
+        out_degree = np.bincount(self.source, minlength=n).astype(np.float64)
+        dangling = out_degree == 0
+        rank = np.full(n, 1.0 / n)
+
+        iterations = 0
+        for iterations in range(1, PAGERANK_MAX_ITERATIONS + 1):
+            share = np.divide(rank, out_degree, out=np.zeros(n), where=~dangling)
+            flow = np.bincount(self.target, weights=share[self.source], minlength=n)
+            updated = (1.0 - damping) / n + damping * (flow + rank[dangling].sum() / n)
+            converged = np.abs(updated - rank).sum() < PAGERANK_TOLERANCE
+            rank = updated
+            if converged:
+                break
+        return rank, iterations
+
+    def influence(self):
+        """The frontend's calculateInfluenceScore, for every node at once."""
+        age = self.current_year - self.year_or_now
+        velocity = np.where(age > 0, self.citations / np.where(age > 0, age, 1), self.citations)
+        recency = np.where(age < 5, 20.0, np.where(age < 10, 10.0, 0.0))
+        return np.log(self.citations + 1) * 10 + np.log(velocity + 1) * 15 + recency
+
+    def year_bands(self):
+        """Bucket known years into at most MAX_YEAR_BANDS equal-width bands.
+
+        Returns ``(band index per node, -1 without a year; band summaries)``.
+        """
+        known = ~np.isnan(self.year)
+        if not known.any():
+            return np.full(self.n, -1), []
+
+        first, last = int(self.year[known].min()), int(self.year[known].max())
+        band_width = max(1, math.ceil((last - first + 1) / MAX_YEAR_BANDS))
+        band = np.full(self.n, -1)
+        band[known] = ((self.year[known] - first) // band_width).astype(np.int64)
+
+        counts = np.bincount(band[known], minlength=(last - first) // band_width + 1)
+        bands = [
+            {
+                'band': i,
+                'start_year': first + i * band_width,
+                'end_year': min(last, first + (i + 1) * band_width - 1),
+                'count': int(count),
+            }
+            for i, count in enumerate(counts)
+        ]
+        return band, bands
+
+    def chronological(self, width, height):
+        """The frontend's calculateChronologicalPositions: x by year, y by citation count."""
+        usable_width = width - PADDING_X * 2
+        usable_height = height - PADDING_Y * 2
+        year_min, year_max = self.year_or_now.min(), self.year_or_now.max()
+        cite_min, cite_max = self.citations.min(), self.citations.max()
+
+        x = PADDING_X + (self.year_or_now - year_min) / ((year_max - year_min) or 1) * usable_width
+        y = height - PADDING_Y - (self.citations - cite_min) / ((cite_max - cite_min) or 1) * usable_height
+        extra = {
+            'year_range': {'min': int(year_min), 'max': int(year_max)},
+            'citation_range': {'min': int(cite_min), 'max': int(cite_max)},
+        }
+        return x, y, extra
+
+    def force(self, width, height, iterations=FORCE_ITERATIONS):
+        """Fruchterman-Reingold layout, vectorized over all node pairs per step.
+
+        Starts from the chronological positions, so the result is deterministic
+        and keeps a rough time ordering; the center node is pinned mid-canvas.
+        """
+        x, y, _ = self.chronological(width, height)
+        pos = np.column_stack([x, y]).astype(np.float64)
+        n = self.n
+        if n == 1:
+            return np.array([width / 2]), np.array([height / 2]), {}
+
+        pos[0] = (width / 2, height / 2)
+        k = math.sqrt((width - PADDING_X * 2) * (height - PADDING_Y * 2) / n)
+        temperature = width / 10
+        cooling = temperature / (iterations + 1)
+        low = np.array([PADDING_X, PADDING_Y], dtype=np.float64)
+        high = np.array([width - PADDING_X, height - PADDING_Y], dtype=np.float64)
+
+        for _ in range(iterations):
+            delta = pos[:, None, :] - pos[None, :, :]
+            distance = np.maximum(np.sqrt((delta ** 2).sum(axis=2)), 0.01)
+            repulsion = (k * k) / distance ** 2
+            np.fill_diagonal(repulsion, 0.0)
+            displacement = (delta * repulsion[:, :, None]).sum(axis=1)
+
+            if len(self.source):
+                edge_delta = pos[self.source] - pos[self.target]
+                edge_length = np.maximum(np.sqrt((edge_delta ** 2).sum(axis=1)), 0.01)
+                pull = edge_delta * (edge_length / k)[:, None]
+                for axis in range(2):
+                    displacement[:, axis] -= np.bincount(self.source, weights=pull[:, axis], minlength=n)
+                    displacement[:, axis] += np.bincount(self.target, weights=pull[:, axis], minlength=n)
+
+            length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 0.01)
+            pos += displacement / length[:, None] * np.minimum(length, temperature)[:, None]
+            pos = np.clip(pos, low, high)
+            pos[0] = (width / 2, height / 2)
+            temperature = max(temperature - cooling, 1.0)
+
+        return pos[:, 0], pos[:, 1], {}
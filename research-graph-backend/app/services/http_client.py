@@ -0,0 +1,219 @@
+import asyncio
+import threading
+import weakref
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class OpenAlexClient:
+    """App-scoped HTTP client for the OpenAlex API.
+
+    One instance is created in ``create_app`` and shared by every request
+    thread, so connections to api.openalex.org stay alive between API calls
+    instead of paying a new TCP+TLS handshake each time. The session is only
+    used for GETs and its headers are never changed after construction, which
+    keeps sharing it across threads safe.
+    """
+
+    def __init__(self, base_url, email=None, pool_connections=4, pool_maxsize=20,
+                 max_retries=3, backoff_factor=0.5, timeout=10):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.session.headers.update({'Connection': 'keep-alive'})
+        if email:
+            self.session.headers.update({
+                'User-Agent': f'ResearchGraphApp/1.0 (mailto:{email})'
+            })
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._requests = 0
+        self._errors = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            base_url=config['OPENALEX_API_URL'],
+            email=config.get('OPENALEX_EMAIL'),
+            pool_connections=config.get('OPENALEX_POOL_CONNECTIONS', 4),
+            pool_maxsize=config.get('OPENALEX_POOL_MAXSIZE', 20),
+            max_retries=config.get('OPENALEX_MAX_RETRIES', 3),
+            backoff_factor=config.get('OPENALEX_BACKOFF_FACTOR', 0.5),
+            timeout=config.get('OPENALEX_TIMEOUT', 10)
+        )
+
+    def get(self, endpoint, params=None):
+        with self._lock:
+            self._in_flight += 1
+            self._requests += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        try:
+            response = self.session.get(f"{self.base_url}{endpoint}", params=params, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.exceptions.RequestException, ValueError):
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            data = {
+                'pool_maxsize': self.pool_maxsize,
+                'in_flight': self._in_flight,
+                'peak_in_flight': self._peak_in_flight,
+                'requests': self._requests,
+                'errors': self._errors,
+            }
+
+        hosts = []
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            hosts.append({
+                'host': pool.host,
+                'connections_opened': pool.num_connections,
+                'requests_served': pool.num_requests,
+                'idle_connections': idle,
+            })
+        data['hosts'] = hosts
+        data['utilization'] = round(data['in_flight'] / self.pool_maxsize, 4) if self.pool_maxsize else None
+        return data
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncOpenAlexClient:
+    """Asyncio counterpart of OpenAlexClient built on ``httpx.AsyncClient``.
+
+    An ``httpx.AsyncClient`` belongs to the event loop it first ran on, so one
+    pooled client is kept per running loop. Under an ASGI server that is a
+    single long-lived pool; async Flask views, which get a fresh loop per
+    call, get a fresh pool per call. Retries on 429/5xx follow the same
+    backoff as the sync client and honour ``Retry-After``.
+    """
+
+    def __init__(self, base_url, email=None, pool_maxsize=100, max_retries=3,
+                 backoff_factor=0.5, timeout=10):
+        self.base_url = base_url
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.headers = {'User-Agent': f'ResearchGraphApp/1.0 (mailto:{email})'} if email else {}
+
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._requests = 0
+        self._retries = 0
+        self._errors = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            base_url=config['OPENALEX_API_URL'],
+            email=config.get('OPENALEX_EMAIL'),
+            pool_maxsize=config.get('OPENALEX_ASYNC_POOL_MAXSIZE', 100),
+            max_retries=config.get('OPENALEX_MAX_RETRIES', 3),
+            backoff_factor=config.get('OPENALEX_BACKOFF_FACTOR', 0.5),
+            timeout=config.get('OPENALEX_TIMEOUT', 10)
+        )
+
+    def _client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=self.pool_maxsize,
+                max_keepalive_connections=self.pool_maxsize
+            )
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                transport=httpx.AsyncHTTPTransport(retries=self.max_retries, limits=limits)
+            )
+            self._clients[loop] = client
+        return client
+
+    async def get(self, endpoint, params=None):
+        client = self._client()
+        with self._lock:
+            self._in_flight += 1
+            self._requests += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                response = await client.get(endpoint, params=params)
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    with self._lock:
+                        self._retries += 1
+                    await asyncio.sleep(self._backoff(attempt, response))
+                    continue
+                response.raise_for_status()
+                return response.json()
+        except (httpx.HTTPError, ValueError):
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _backoff(self, attempt, response):
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * (2 ** attempt)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pool_maxsize': self.pool_maxsize,
+                'event_loops': len(self._clients),
+                'in_flight': self._in_flight,
+                'peak_in_flight': self._peak_in_flight,
+                'requests': self._requests,
+                'retries': self._retries,
+                'errors': self._errors,
+            }
+
+    async def aclose(self):
+        """Close the pool that belongs to the running loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
@@ -0,0 +1,177 @@
+import re
+import threading
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models import Paper
+from app.services.metrics import Counters
+
+FTS5 = 'fts5'
+TSVECTOR = 'tsvector'
+LIKE = 'like'
+
+# Title hits weigh ten times an abstract hit in the bm25() ranking.
+FTS5_WEIGHTS = (0.0, 10.0, 1.0)
+
+# Must match the indexed expression exactly so Postgres can use the GIN index.
+PG_DOCUMENT = "to_tsvector('english', coalesce(papers.title, '') || ' ' || coalesce(papers.abstract, ''))"
+
+
+# papers_fts_rows maps a paper to its FTS row, since deleting by the UNINDEXED
+# paper_id column would scan the whole FTS table on every write.
+FTS5_SCHEMA = (
+    'DROP TABLE IF EXISTS papers_fts',
+    'DROP TABLE IF EXISTS papers_fts_rows',
+    'CREATE VIRTUAL TABLE papers_fts USING fts5('
+    "paper_id UNINDEXED, title, abstract, tokenize = 'porter unicode61')",
+    'CREATE TABLE papers_fts_rows (paper_id VARCHAR(50) PRIMARY KEY, fts_rowid INTEGER NOT NULL)',
+    'INSERT INTO papers_fts (paper_id, title, abstract) '
+    "SELECT id, title, coalesce(abstract, '') FROM papers",
+    'INSERT INTO papers_fts_rows (paper_id, fts_rowid) SELECT paper_id, rowid FROM papers_fts',
+    'CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN '
+    "INSERT INTO papers_fts (paper_id, title, abstract) VALUES (new.id, new.title, coalesce(new.abstract, '')); "
+    'INSERT INTO papers_fts_rows (paper_id, fts_rowid) VALUES (new.id, last_insert_rowid()); '
+    'END',
+    'CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF title, abstract ON papers BEGIN '
+    "UPDATE papers_fts SET title = new.title, abstract = coalesce(new.abstract, '') "
+    'WHERE rowid = (SELECT fts_rowid FROM papers_fts_rows WHERE paper_id = new.id); '
+    'END',
+    'CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN '
+    'DELETE FROM papers_fts WHERE rowid = (SELECT fts_rowid FROM papers_fts_rows WHERE paper_id = old.id); '
+    'DELETE FROM papers_fts_rows WHERE paper_id = old.id; '
+    'END',
+)
+
+
+def _terms(query):
+    return re.findall(r'\w+', (query or '').casefold())
+
+
+def _fts5_match(query):
+    # Quote every term so user input can't inject FTS5 operators; terms are ANDed.
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in _terms(query))
+
+
+class LocalSearch:
+    """Ranked full-text search over the papers already cached in the database.
+
+    SQLite uses an FTS5 table (``papers_fts``) ranked with ``bm25()`` that
+    triggers on the papers table keep in step with every write path. Postgres
+    uses a GIN index over a ``tsvector`` expression ranked with ``ts_rank_cd``,
+    which needs no syncing and is built by a migration. Other dialects, a
+    SQLite build without FTS5, or a Postgres database without a valid index
+    fall back to a LIKE scan ordered by citation count.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self._lock = threading.Lock()
+        self.counters = Counters()
+
+    def ensure_schema(self):
+        if self.backend is not None:
+            return self.backend
+        with self._lock:
+            if self.backend is None:
+                self.backend = self._create_schema()
+        return self.backend
+
+    def search(self, query, filters=None, page=1, per_page=20, options=(), offset=None, cached_before=None):
+        """Return ``(papers, total)`` for one page of ranked local matches.
+
+        ``options`` are loader options for the returned papers, e.g. ``Paper.load_options``.
+        ``offset`` overrides the page's first row, and ``cached_before`` leaves out
+        papers cached at or after that time.
+        """
+        backend = self.ensure_schema()
+        if not _terms(query):
+            return [], 0
+
+        base, order = self._matches(backend, query, filters, cached_before)
+        total = base.count()
+        if offset is None:
+            offset = (page - 1) * per_page
+        papers = base.options(*options).order_by(*order).offset(offset).limit(per_page).all()
+
+        self.counters.incr('searches')
+        return papers, total
+
+    def matching_ids(self, query, paper_ids, filters=None, cached_before=None):
+        """Return the subset of ``paper_ids`` that ``search`` would match."""
+        backend = self.ensure_schema()
+        if not paper_ids or not _terms(query):
+            return set()
+
+        base, _ = self._matches(backend, query, filters, cached_before)
+        rows = base.with_entities(Paper.id).filter(Paper.id.in_(list(paper_ids))).all()
+        return {row.id for row in rows}
+
+    def stats(self):
+        data = self.counters.snapshot()
+        data['backend'] = self.backend
+        return data
+
+    def _create_schema(self):
+        dialect = db.engine.dialect.name
+        try:
+            if dialect == 'sqlite':
+                with db.engine.begin() as conn:
+                    installed = conn.execute(db.text(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'papers_fts_insert'"
+                    )).first()
+                    if not installed:
+                        # Rows written before the triggers existed can't be trusted, so rebuild once.
+                        for statement in FTS5_SCHEMA:
+                            conn.execute(db.text(statement))
+                return FTS5
+
+            if dialect == 'postgresql':
+                # Built CONCURRENTLY by a migration; a plain build here would block cache writes.
+                with db.engine.connect() as conn:
+                    # An interrupted concurrent build leaves the index behind, marked invalid.
+                    valid = conn.execute(db.text(
+                        'SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                        "WHERE c.relname = 'ix_papers_fulltext'"
+                    )).scalar()
+                if valid:
+                    return TSVECTOR
+                print("Local search index ix_papers_fulltext is missing (run flask db upgrade), falling back to LIKE")
+        except SQLAlchemyError as e:
+            print(f"Local search index setup failed, falling back to LIKE: {e}")
+
+        return LIKE
+
+    def _matches(self, backend, query, filters, cached_before):
+        """Return the query over matching papers and the order that ranks them."""
+        if backend == FTS5:
+            fts = db.table('papers_fts', db.column('paper_id'))
+            match = db.text('papers_fts MATCH :match').bindparams(match=_fts5_match(query))
+            base = db.session.query(Paper).join(fts, fts.c.paper_id == Paper.id).filter(match)
+            order = (db.func.bm25(db.literal_column('papers_fts'), *FTS5_WEIGHTS), Paper.citation_count.desc())
+        elif backend == TSVECTOR:
+            document = db.literal_column(PG_DOCUMENT)
+            tsquery = db.func.websearch_to_tsquery('english', query)
+            base = db.session.query(Paper).filter(document.op('@@')(tsquery))
+            order = (db.func.ts_rank_cd(document, tsquery).desc(), Paper.citation_count.desc())
+        else:
+            base = db.session.query(Paper)
+            for term in _terms(query):
+                base = base.filter(db.or_(
+                    db.func.lower(Paper.title).contains(term, autoescape=True),
+                    db.func.lower(Paper.abstract).contains(term, autoescape=True)
+                ))
+            order = (Paper.citation_count.desc(),)
+
+        if cached_before is not None:
+            base = base.filter(Paper.cached_at < cached_before)
+        return _apply_filters(base, filters), order
+
+
+def _apply_filters(query, filters):
+    filters = filters or {}
+    if filters.get('year_min'):
+        query = query.filter(Paper.publication_year >= filters['year_min'])
+    if filters.get('year_max'):
+        query = query.filter(Paper.publication_year <= filters['year_max'])
+    if filters.get('min_citations'):
+        query = query.filter(Paper.citation_count >= filters['min_citations'])
+    return query
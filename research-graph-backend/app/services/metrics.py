@@ -0,0 +1,77 @@
+import threading
+
+
+class Counters:
+    """Thread-safe named counters shared by every request in the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def get(self, name):
+        with self._lock:
+            return self._values.get(name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+def hit_ratio(hits, misses):
+    total = hits + misses
+    return round(hits / total, 4) if total else None
+
+
+class Histogram:
+    """Thread-safe cumulative histogram with fixed upper bounds."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def observe(self, value):
+        index = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            count, total, peak = self._count, self._sum, self._max
+
+        buckets = {}
+        running = 0
+        for bound, bucket_count in zip(self.bounds, counts):
+            running += bucket_count
+            buckets[f'le_{bound}'] = running
+        buckets['le_inf'] = count
+        return {
+            'count': count,
+            'sum': round(total, 6),
+            'mean': round(total / count, 6) if count else None,
+            'max': round(peak, 6),
+            'buckets': buckets,
+        }
+
+
+paper_cache_stats = Counters()
+fetch_plan_stats = Counters()
@@ -1,66 +1,193 @@
-import requests
+import re
 import time
+import requests
+from concurrent.futures import wait
 from datetime import datetime, timedelta
 from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
 from app import db
-from app.models import Paper, Author, Citation
+from app.models import Paper, Author, Citation, RelatedPaper, paper_authors, upsert_rows
+from app.services.fetch_plan import FetchPlan, get_fetch_plan
+from app.services.graph_builder import CitationGraphBuilder
+from app.services.metrics import paper_cache_stats
+from app.services.projection import NODE_FIELDS, openalex_select, project
+from app.services.rate_limiter import INTERACTIVE, BACKGROUND
+from app.services.search_cache import STALE
 
-
-class RateLimiter:
-    def __init__(self, max_calls, period):
-        self.max_calls = max_calls
-        self.period = period
-        self.calls = []
-    
-    def wait_if_needed(self):
-        now = time.time()
-        
-        self.calls = [call_time for call_time in self.calls if now - call_time < self.period]
-        
-        if len(self.calls) >= self.max_calls:
-            sleep_time = self.period - (now - self.calls[0])
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            self.calls = []
-        
-        self.calls.append(time.time())
+WORK_ID_PATTERN = re.compile(r'^[Ww]\d+$')
+# A DOI, bare or as a doi.org URL or doi: id. Ones containing the filter separators
+# "," and "|" are left to the per-id lookup.
+DOI_PATTERN = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:)?(10\.\d{4,9}/[^\s,|]+)$', re.IGNORECASE)
 
 
 class OpenAlexService:
     
-    def __init__(self):
-        self.base_url = current_app.config['OPENALEX_API_URL']
-        self.email = current_app.config.get('OPENALEX_EMAIL')
-        self.rate_limiter = RateLimiter(
-            current_app.config['API_RATE_LIMIT_CALLS'],
-            current_app.config['API_RATE_LIMIT_PERIOD']
-        )
-        self.session = requests.Session()
-        
-        if self.email:
-            self.session.headers.update({
-                'User-Agent': f'ResearchGraphApp/1.0 (mailto:{self.email})'
-            })
+    def __init__(self, priority=INTERACTIVE):
+        self.client = current_app.extensions['openalex_client']
+        self.rate_limiter = current_app.extensions['openalex_rate_limiter']
+        self.executor = current_app.extensions['openalex_executor']
+        self.single_flight = current_app.extensions['openalex_single_flight']
+        self.fetch_plan = get_fetch_plan()
+        self.search_cache = current_app.extensions['search_cache']
+        self.suggestion_index = current_app.extensions['suggestion_index']
+        self.local_search = current_app.extensions['local_search']
+        self.graph_index = current_app.extensions['graph_index']
+        self.background_executor = current_app.extensions['background_executor']
+        self.priority = priority
+        self.cache_timeout = current_app.config['CACHE_DEFAULT_TIMEOUT']
     
     def _make_request(self, endpoint, params=None):
-        self.rate_limiter.wait_if_needed()
-        
-        url = f"{self.base_url}{endpoint}"
+        if self.fetch_plan is not None:
+            return self.fetch_plan.fetch(endpoint, params, self._shared_request)
+        return self._shared_request(endpoint, params)
+
+    def _shared_request(self, endpoint, params=None):
+        # Concurrent identical calls from other requests wait for this one.
+        return self.single_flight.do(
+            FetchPlan.key(endpoint, params),
+            lambda: self._request(endpoint, params)
+        )
+
+    def _request(self, endpoint, params=None):
+        if not self.rate_limiter.acquire(priority=self.priority):
+            print(f"API rate limit wait exceeded for {endpoint}")
+            return None
         
         try:
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self.client.get(endpoint, params=params)
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"API request error: {e}")
             return None
     
-    def search_papers(self, query, filters=None, page=1, per_page=20):
+    def search_papers(self, query, filters=None, page=1, per_page=20, use_cache=True, fields=None):
+        if not use_cache:
+            return self._search_remote(query, filters, page, per_page, fields) or self._empty_search(page)
+
+        key = self.search_cache.key(query, filters, page, per_page, fields)
+        payload, state = self.search_cache.get(key)
+        if state == STALE and self.search_cache.begin_refresh(key):
+            self.background_executor.submit(
+                _refresh_search, current_app._get_current_object(), key, query, filters, page, per_page, fields
+            )
+        if payload is not None:
+            payload['meta']['cache'] = state
+            return payload
+
+        result = self._search_remote(query, filters, page, per_page, fields)
+        if result is None:
+            return self._empty_search(page)
+        self.search_cache.set(key, result)
+        result['meta']['cache'] = 'miss'
+        return result
+
+    def search_local(self, query, filters=None, page=1, per_page=20, fields=None):
+        papers, total = self.local_search.search(
+            query, filters, page, per_page, options=Paper.load_options(fields)
+        )
+        return {
+            'results': Paper.serialize_many(papers, include_authors=True, include_abstract=True, fields=fields),
+            'meta': {
+                'count': total,
+                'page': page,
+                'per_page': per_page,
+                'source': 'local',
+                'backend': self.local_search.backend
+            }
+        }
+
+    def search_hybrid(self, query, filters=None, page=1, per_page=20, remote_wait=None, fields=None, as_of=None):
+        """One page of local matches followed by remote results.
+
+        Pages are cut from a single ordering: the ``local_count`` local matches
+        first, then the remote results in OpenAlex order, so position
+        ``local_count + i`` is remote result ``i``. A remote result that is
+        also a local match is dropped rather than shown twice, so a page can
+        come back short but never overlaps another. Local matches are the
+        papers cached before ``as_of`` (defaults to now, echoed in ``meta``),
+        which keeps the ordering stable while remote pages fill the cache;
+        pass it back when fetching the next page.
+
+        Remote pages that haven't arrived within ``remote_wait`` are left out
+        and flagged with ``remote_pending``; the calls still complete and fill
+        the search cache for the next request.
+        """
+        if remote_wait is None:
+            remote_wait = current_app.config['SEARCH_HYBRID_REMOTE_WAIT']
+        if as_of is None:
+            as_of = datetime.utcnow()
+
+        start = (page - 1) * per_page
+        papers, local_count = self.local_search.search(
+            query, filters, per_page=per_page, options=Paper.load_options(fields),
+            offset=start, cached_before=as_of
+        )
+        results = Paper.serialize_many(papers, include_authors=True, include_abstract=True, fields=fields)
+
+        # Remote positions this page covers, fetched as the one or two remote pages holding them.
+        remote_start = max(0, start - local_count)
+        remote_take = per_page - len(results)
+        if remote_take:
+            first_page = remote_start // per_page + 1
+            remote_pages = range(first_page, (remote_start + remote_take - 1) // per_page + 2)
+        else:
+            # Only needed for remote_count.
+            first_page = 1
+            remote_pages = [1]
+        app = current_app._get_current_object()
+        futures = [
+            self.executor.submit(_remote_search, app, query, filters, remote_page, per_page, fields)
+            for remote_page in remote_pages
+        ]
+
+        done, _ = wait(futures, timeout=remote_wait)
+        remote_pending = len(done) < len(futures)
+        remote_count = 0
+        if not remote_pending:
+            remote = []
+            for future in futures:
+                payload = future.result()
+                remote_count = max(remote_count, payload['meta'].get('count', 0))
+                remote.extend(payload['results'])
+
+            if remote_take:
+                offset = remote_start - (first_page - 1) * per_page
+                window = remote[offset:offset + remote_take]
+                local_ids = self.local_search.matching_ids(
+                    query, [paper['id'] for paper in window], filters, cached_before=as_of
+                )
+                results.extend(paper for paper in window if paper['id'] not in local_ids)
+
+        return {
+            'results': results,
+            'meta': {
+                'count': local_count + remote_count,
+                'page': page,
+                'per_page': per_page,
+                'source': 'hybrid',
+                'local_count': local_count,
+                'remote_count': remote_count,
+                'remote_pending': remote_pending,
+                'as_of': as_of.isoformat()
+            }
+        }
+
+    def _empty_search(self, page):
+        return {'results': [], 'meta': {'count': 0, 'page': page}}
+
+    def _search_remote(self, query, filters=None, page=1, per_page=20, fields=None):
+        data = self._make_request('/works', params=self._search_params(query, filters, page, per_page, fields))
+        if not data:
+            return None
+        return self._search_result(query, data, page, per_page, fields)
+
+    def _search_params(self, query, filters=None, page=1, per_page=20, fields=None):
         params = {
             'search': query,
             'page': page,
             'per_page': min(per_page, current_app.config['MAX_PAGE_SIZE'])
         }
+        if fields is not None:
+            params['select'] = openalex_select(fields)
 
         filter_parts = []
         if filters:
@@ -73,26 +200,23 @@ class OpenAlexService:
 
         if filter_parts:
             params['filter'] = ','.join(filter_parts)
+        return params
 
-        data = self._make_request('/works', params=params)
-
-        if not data:
-            return {'results': [], 'meta': {'count': 0, 'page': page}}
-
+    def _search_result(self, query, data, page, per_page, fields=None):
         papers = []
-        for work in data.get('results', []):
-            paper = self._cache_paper(work, include_abstract=True)
-            if paper:
-                paper_dict = paper.to_dict(include_authors=True, include_abstract=True)
-                if (not paper_dict.get('authors')) and work.get('authorships'):
-                    paper_dict['authors'] = [
-                        {
-                            'display_name': a.get('author', {}).get('display_name', 'Unknown Author'),
-                            'orcid': a.get('author', {}).get('orcid'),
-                            'id': a.get('author', {}).get('id')
-                        }
-                        for a in work.get('authorships', [])
-                    ]
+        works = data.get('results', [])
+        cached = {
+            paper_dict['id']: paper_dict
+            for paper_dict in Paper.serialize_many(
+                self._cache_papers(works, include_abstract=_wants_abstract(fields)),
+                include_authors=True,
+                include_abstract=True,
+                fields=None if fields is None else fields | {'title'}
+            )
+        }
+        for work in works:
+            paper_dict = cached.get(self._work_id(work))
+            if paper_dict:
                 papers.append(paper_dict)
 
         def normalize(text):
@@ -110,7 +234,7 @@ class OpenAlexService:
             papers = [best_match] + [p for p in papers if p != best_match]
 
         return {
-            'results': papers,
+            'results': project(papers, fields),
             'meta': {
                 'count': data.get('meta', {}).get('count', 0),
                 'page': page,
@@ -118,32 +242,192 @@ class OpenAlexService:
             }
         }
     
-    def get_paper_details(self, paper_id, force_refresh=False):
+    def get_paper_details(self, paper_id, force_refresh=False, fields=None):
         if paper_id.startswith('http'):
             paper_id = paper_id.split('/')[-1]
 
-        data = self._make_request(f'/works/{paper_id}')
+        if not force_refresh:
+            paper = self._get_cached_paper(paper_id, fields)
+            if paper:
+                return paper
+
+        params = {'select': openalex_select(fields)} if fields is not None else None
+        data = self._make_request(f'/works/{paper_id}', params=params)
         if not data:
             return None
         
-        paper = self._cache_paper(data, include_abstract=True)
+        paper = self._cache_paper(data, include_abstract=_wants_abstract(fields))
         return paper
+
+    def get_papers_by_ids(self, paper_ids, force_refresh=False, fields=None):
+        """Resolve many ids at once; returns a dict of requested id -> Paper.
+
+        Fresh rows come from one ``IN`` query per 500 ids. The rest are fetched
+        with ``openalex:W1|W2|...`` and ``doi:...|...`` filters in chunks of
+        OPENALEX_BATCH_CHUNK and bulk-upserted in a single transaction. Other
+        ids (PMIDs etc.) fall back to get_paper_details.
+        """
+        requested, work_ids = self._batch_ids(paper_ids)
+        dois = list(dict.fromkeys(
+            work_id[4:] for work_id in requested.values() if work_id.startswith('doi:')
+        ))
+        found = {} if force_refresh else self._fresh_papers(work_ids, fields)
+        by_doi = {} if force_refresh else self._fresh_papers_by_doi(dois, fields)
+
+        missing = [work_id for work_id in work_ids if work_id not in found]
+        legs = self._batch_legs(missing, fields)
+        legs.update(self._batch_legs([doi for doi in dois if doi not in by_doi], fields, key='doi'))
+        works = []
+        if legs:
+            responses, _ = self._fan_out(legs)
+            for data in responses.values():
+                works.extend((data or {}).get('results', []))
+        for paper in self._cache_papers(works, include_abstract=_wants_abstract(fields)):
+            found[paper.id] = paper
+        for work in works:
+            if work.get('doi') and work.get('id'):
+                doi = work['doi'].replace('https://doi.org/', '').lower()
+                by_doi.setdefault(doi, found.get(work['id'].split('/')[-1]))
+
+        results = {}
+        for paper_id, work_id in requested.items():
+            if WORK_ID_PATTERN.match(work_id):
+                results[paper_id] = found.get(work_id)
+            elif work_id.startswith('doi:'):
+                results[paper_id] = by_doi.get(work_id[4:])
+            else:
+                results[paper_id] = self.get_paper_details(work_id, force_refresh=force_refresh, fields=fields)
+        return results
+
+    def _batch_ids(self, paper_ids):
+        """Map each requested id to a bare work id or ``doi:`` id; also return the distinct W-ids."""
+        requested = {}
+        for paper_id in paper_ids:
+            doi = DOI_PATTERN.match(paper_id)
+            if doi:
+                requested[paper_id] = f'doi:{doi.group(1).lower()}'
+                continue
+            work_id = paper_id.split('/')[-1] if paper_id.startswith('http') else paper_id
+            requested[paper_id] = work_id.upper() if WORK_ID_PATTERN.match(work_id) else work_id
+
+        work_ids = list(dict.fromkeys(
+            work_id for work_id in requested.values() if WORK_ID_PATTERN.match(work_id)
+        ))
+        return requested, work_ids
+
+    def _fresh_papers(self, work_ids, fields=None):
+        found = {}
+        options = Paper.load_options(fields)
+        for start in range(0, len(work_ids), 500):
+            for paper in Paper.query.options(*options).filter(Paper.id.in_(work_ids[start:start + 500])).all():
+                if self._is_fresh(paper):
+                    found[paper.id] = paper
+        paper_cache_stats.incr('hits', len(found))
+        paper_cache_stats.incr('misses', len(work_ids) - len(found))
+        return found
+
+    def _fresh_papers_by_doi(self, dois, fields=None):
+        found = {}
+        options = Paper.load_options(fields)
+        for start in range(0, len(dois), 500):
+            rows = db.session.query(Paper.doi, Paper).options(*options) \
+                .filter(Paper.doi.in_(dois[start:start + 500])).all()
+            for doi, paper in rows:
+                if self._is_fresh(paper):
+                    found[doi.lower()] = paper
+        paper_cache_stats.incr('hits', len(found))
+        paper_cache_stats.incr('misses', len(dois) - len(found))
+        return found
+
+    def _batch_legs(self, ids, fields=None, key='openalex'):
+        chunk_size = current_app.config['OPENALEX_BATCH_CHUNK']
+        legs = {}
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            params = {
+                'filter': f"{key}:{'|'.join(chunk)}",
+                'per_page': len(chunk)
+            }
+            if fields is not None:
+                params['select'] = openalex_select(fields)
+            legs[f'{key}:{start}'] = ('/works', params)
+        return legs
     
     
-    def get_paper_citations(self, paper_id, fetch_cited_papers=True):
+    def get_paper_citations(self, paper_id, fetch_cited_papers=True, force_refresh=False, partial_timeout=None, fields=None):
+        """Citing and referenced papers plus a one-hop graph.
+
+        ``fields`` projects the paper dicts in the payload. The projection is
+        pushed down to OpenAlex ``select=`` and to column-limited queries, and
+        always keeps what the graph nodes need.
+        """
         if paper_id.startswith('http'):
             paper_id = paper_id.split('/')[-1]
 
-        paper = self.get_paper_details(paper_id)
-        if not paper:
+        paper = None if force_refresh else self._get_cached_paper(paper_id, fields)
+
+        if paper is not None and self._edges_fresh(paper):
+            local = self._local_citations(paper, fetch_cited_papers, fields)
+            if local is not None:
+                return local
+
+        legs = self._citation_legs(paper_id, paper is None, fetch_cited_papers, fields)
+        responses, missing = self._fan_out(legs, timeout=partial_timeout)
+        return self._citations_from_responses(paper, responses, missing, fetch_cited_papers, fields)
+
+    def _local_citations(self, paper, fetch_cited_papers, fields=None):
+        """Answer from the cached neighbourhood, or None if it can't serve ``fields``.
+
+        Neighbours cached from a projected fetch (e.g. a depth-1 graph) have no
+        abstract or authorships, so requests for those go back to OpenAlex.
+        """
+        node_fields = _with_node_fields(fields)
+        options = Paper.load_options(node_fields)
+        citing = paper.get_citing_papers(limit=50, options=options)
+        cited = paper.get_referenced_papers(limit=50, options=options) if fetch_cited_papers else []
+        if _wants_full_record(fields) and any(neighbour.last_updated is None for neighbour in citing + cited):
             return None
-        
-        citing_papers = self._fetch_citing_papers(paper_id)
 
-        cited_papers = []
+        paper_cache_stats.incr('edge_hits')
+        citing_papers = Paper.serialize_many(citing, include_abstract=True, fields=node_fields)
+        cited_papers = Paper.serialize_many(cited, include_abstract=True, fields=node_fields)
+        return self._citation_payload(paper, citing_papers, cited_papers, missing=[], fields=fields)
+
+    def _citation_legs(self, paper_id, fetch_paper, fetch_cited_papers, fields=None):
+        select = openalex_select(_with_node_fields(fields))
+        legs = {'cited_by': ('/works', self._citing_params(paper_id, select=select))}
+        if fetch_paper:
+            legs['paper'] = (f'/works/{paper_id}', {'select': openalex_select(fields)} if fields is not None else None)
         if fetch_cited_papers:
-            cited_papers = self._fetch_referenced_papers(paper_id)
+            legs['references'] = ('/works', self._referenced_params(paper_id, select=select))
+        return legs
+
+    def _citations_from_responses(self, paper, responses, missing, fetch_cited_papers, fields=None):
+        if paper is None:
+            if not responses.get('paper'):
+                return None
+            paper = self._cache_paper(responses['paper'], include_abstract=_wants_abstract(fields))
+            if not paper:
+                return None
+
+        citing_papers = self._works_to_dicts(responses.get('cited_by'), _with_node_fields(fields))
+        cited_papers = self._works_to_dicts(responses.get('references'), _with_node_fields(fields))
+
+        complete = (
+            fetch_cited_papers
+            and not missing
+            and responses.get('cited_by') is not None
+            and responses.get('references') is not None
+        )
+        self._cache_edges(
+            [(citing['id'], paper.id) for citing in citing_papers]
+            + [(paper.id, ref['id']) for ref in cited_papers],
+            complete_ids=[paper.id] if complete else []
+        )
+
+        return self._citation_payload(paper, citing_papers, cited_papers, missing, fields)
 
+    def _citation_payload(self, paper, citing_papers, cited_papers, missing, fields=None):
         citation_graph = {
             'nodes': [],
             'edges': []
@@ -186,118 +470,451 @@ class OpenAlexService:
             })
         
         return {
-            'paper': paper.to_dict(include_authors=True, include_abstract=True),
-            'cited_by': citing_papers,
-            'references': cited_papers,
-            'citation_graph': citation_graph
+            'paper': paper.to_dict(include_authors=True, include_abstract=True, fields=fields),
+            'cited_by': project(citing_papers, fields),
+            'references': project(cited_papers, fields),
+            'citation_graph': citation_graph,
+            'partial': bool(missing),
+            'missing': missing
         }
-    
-    def _fetch_citing_papers(self, paper_id, limit=50):
+
+    def get_citation_network(self, paper_id, depth=2):
+        if paper_id.startswith('http'):
+            paper_id = paper_id.split('/')[-1]
+
+        graph = self._indexed_network(paper_id, depth)
+        if graph is not None:
+            return graph
+
+        builder = CitationGraphBuilder.from_config(self, depth, current_app.config)
+        return builder.build(paper_id)
+
+    def _indexed_network(self, paper_id, depth):
+        """The multi-hop graph from the in-process graph index, when every expanded paper's edges are fresh."""
+        if not self.graph_index.enabled:
+            return None
+
+        config = current_app.config
+        self.graph_index.ensure_loaded()
+        graph = self.graph_index.neighbourhood(
+            paper_id,
+            depth,
+            level_fanout=config['GRAPH_LEVEL_FANOUT'],
+            max_frontier=config['GRAPH_MAX_FRONTIER'],
+            max_nodes=config['GRAPH_MAX_NODES'],
+            max_edges=config['GRAPH_MAX_EDGES'],
+            fresh_after=time.time() - self.cache_timeout
+        )
+        if graph is None:
+            return None
+
+        # Titles aren't kept in the index; one column-limited query per 500 nodes fills them in.
+        node_ids = [node['id'] for node in graph['nodes']]
+        rows = {}
+        for start in range(0, len(node_ids), 500):
+            for row in db.session.query(
+                Paper.id, Paper.title, Paper.publication_year, Paper.citation_count
+            ).filter(Paper.id.in_(node_ids[start:start + 500])):
+                rows[row.id] = row
+
+        nodes = []
+        for node in graph['nodes']:
+            row = rows.get(node['id'])
+            if row is not None:
+                title, year, citation_count = row.title, row.publication_year, row.citation_count
+            else:
+                title = None
+                year, citation_count = self.graph_index.attributes(node['id']) or (None, 0)
+            nodes.append({
+                'id': node['id'],
+                'title': title or 'Untitled',
+                'year': year,
+                'citation_count': citation_count or 0,
+                'type': node['type'],
+                'level': node['level']
+            })
+        graph['nodes'] = nodes
+        return graph
+
+    def _edges_fresh(self, paper):
+        if paper.edges_complete_at is None:
+            return False
+        return (datetime.utcnow() - paper.edges_complete_at).total_seconds() < self.cache_timeout
+
+    def _cache_edges(self, edges, complete_ids=()):
+        """Write fetched citation edges in one conflict-ignoring insert.
+
+        ``complete_ids`` are papers whose whole fetched neighbourhood is in
+        ``edges``; they get ``edges_complete_at`` so later requests can be
+        answered from the local citations table. Stored related-paper sets
+        the edges can change are marked stale in the same transaction.
+        """
+        if not edges and not complete_ids:
+            return
+
+        try:
+            Citation.bulk_insert(edges)
+            if edges:
+                RelatedPaper.invalidate(edges)
+            if complete_ids:
+                db.session.execute(
+                    Paper.__table__.update()
+                    .where(Paper.id.in_(list(complete_ids)))
+                    # Pin last_updated so its onupdate doesn't mark the rows as freshly fetched.
+                    .values(edges_complete_at=datetime.utcnow(), last_updated=Paper.__table__.c.last_updated)
+                )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Citation cache write error: {e}")
+            return
+
+        self.graph_index.add_edges(edges, complete_ids)
+
+    def _fan_out(self, legs, timeout=None):
+        """Issue independent OpenAlex calls concurrently on the shared executor.
+
+        ``legs`` maps a name to ``(endpoint, params)``. Returns the responses by
+        name plus the names of legs that hadn't finished within ``timeout``
+        (``None`` waits for all of them). Only the HTTP calls run on the pool;
+        caching stays on the request thread and its database session.
+        """
+        futures = {
+            self.executor.submit(self._make_request, endpoint, params): name
+            for name, (endpoint, params) in legs.items()
+        }
+        done, not_done = wait(futures, timeout=timeout)
+
+        responses = {futures[future]: future.result() for future in done}
+        missing = sorted(futures[future] for future in not_done)
+        if missing:
+            print(f"OpenAlex fan-out timed out waiting for: {', '.join(missing)}")
+        return responses, missing
+
+    def _citing_params(self, paper_id, limit=50, select=None):
         params = {
             'filter': f'cites:{paper_id}',
             'per_page': limit,
             'sort': 'cited_by_count:desc'
         }
+        if select:
+            params['select'] = select
+        return params
 
-        data = self._make_request('/works', params=params)
-        if not data:
-            return []
-        
-        citing_papers = []
-        for work in data.get('results', []):
-            citing_paper = self._cache_paper(work, include_abstract=True)
-            if citing_paper:
-                citing_papers.append(citing_paper.to_dict(include_authors=True, include_abstract=True))
-
-        return citing_papers
-
-    def _fetch_referenced_papers(self, paper_id, limit=50):
+    def _referenced_params(self, paper_id, limit=50, select=None):
         params = {
             'filter': f'cited_by:{paper_id}',
             'per_page': limit
         }
+        if select:
+            params['select'] = select
+        return params
 
-        data = self._make_request('/works', params=params)
-
+    def _works_to_dicts(self, data, fields=None):
         if not data:
             return []
 
-        referenced_papers = []
-        for work in data.get('results', []):
-            cited_paper = self._cache_paper(work, include_abstract=True)
-            if cited_paper:
-                referenced_papers.append(cited_paper.to_dict(include_authors=True, include_abstract=True))
-        
-        return referenced_papers
+        return Paper.serialize_many(
+            self._cache_papers(data.get('results', []), include_abstract=_wants_abstract(fields)),
+            include_authors=True,
+            include_abstract=True,
+            fields=fields
+        )
+
+    def _fetch_citing_papers(self, paper_id, limit=50):
+        data = self._make_request('/works', params=self._citing_params(paper_id, limit))
+        return self._works_to_dicts(data)
+
+    def _fetch_referenced_papers(self, paper_id, limit=50):
+        data = self._make_request('/works', params=self._referenced_params(paper_id, limit))
+        return self._works_to_dicts(data)
     
+    def _get_cached_paper(self, paper_id, fields=None):
+        paper = db.session.get(Paper, paper_id, options=Paper.load_options(fields))
+        if paper is None:
+            paper_cache_stats.incr('misses')
+            return None
+        if not self._is_fresh(paper):
+            paper_cache_stats.incr('stale')
+            return None
+        paper_cache_stats.incr('hits')
+        return paper
+
+    def _is_fresh(self, paper):
+        # Rows saved from frontend metadata never came from OpenAlex.
+        if not paper.openalex_url:
+            return False
+        if paper.last_updated is None:
+            return False
+        return (datetime.utcnow() - paper.last_updated).total_seconds() < self.cache_timeout
+
+    def _work_id(self, work_data):
+        return (work_data.get('id') or '').split('/')[-1]
+
     def _cache_paper(self, work_data, include_abstract=False):
-        paper_id = work_data.get('id', '').split('/')[-1]
+        papers = self._cache_papers([work_data], include_abstract=include_abstract)
+        return papers[0] if papers else None
+
+    def _cache_papers(self, works, include_abstract=False):
+        rows = []
+        authorships = {}
+        seen = set()
+        for work_data in works:
+            row = self._paper_values(work_data, include_abstract=include_abstract)
+            if row and row['id'] not in seen:
+                seen.add(row['id'])
+                rows.append(row)
+                # Works fetched with a select= projection carry no authorships; keep their links.
+                if 'authorships' in work_data:
+                    authorships[row['id']] = work_data.get('authorships') or []
+
+        if not rows:
+            return []
+
+        # last_updated marks the last full-record fetch, which is what the TTL checks.
+        # Projected or abstract-less works refresh the columns they carry but not the stamp.
+        complete = include_abstract and len(authorships) == len(rows)
+        if not complete:
+            for row in rows:
+                row['last_updated'] = None
+
+        update_columns = [
+            column for column in rows[0]
+            if column not in ('id', 'cached_at') and (complete or column != 'last_updated')
+        ]
+        # Installs the papers_fts triggers before the first write.
+        self.local_search.ensure_schema()
+        try:
+            upsert_rows(Paper.__table__, rows, ['id'], update_columns=update_columns)
+            self._cache_authorships(authorships)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Paper cache write error: {e}")
+            return [Paper(**row) for row in rows]
+
+        paper_cache_stats.incr('writes', len(rows))
+        self._index_suggestions(rows, authorships)
+        self.graph_index.update_papers(
+            (row['id'], row['publication_year'], row['citation_count']) for row in rows
+        )
+
+        papers = Paper.query.filter(Paper.id.in_(seen)).populate_existing().all()
+        by_id = {paper.id: paper for paper in papers}
+        return [by_id[row['id']] for row in rows if row['id'] in by_id]
+
+    def _paper_values(self, work_data, include_abstract=False):
+        paper_id = self._work_id(work_data)
         if not paper_id:
             return None
 
-        paper = Paper(id=paper_id)
-        paper.title = work_data.get('title', 'Untitled')
-        paper.doi = work_data.get('doi', '').replace('https://doi.org/', '') if work_data.get('doi') else None
+        now = datetime.utcnow()
+        values = {
+            'id': paper_id,
+            'title': _clip(work_data.get('title') or 'Untitled', 500),
+            'doi': _clip(work_data['doi'].replace('https://doi.org/', ''), 100) if work_data.get('doi') else None,
+            'venue': None,
+            'pdf_url': None,
+            'citation_count': work_data.get('cited_by_count', 0),
+            'referenced_works_count': len(work_data.get('referenced_works') or []),
+            'openalex_url': work_data.get('id'),
+            'cached_at': now,
+            'last_updated': now,
+        }
 
-        
         pub_year = work_data.get('publication_year')
         if not pub_year and work_data.get('publication_date'):
             try:
                 pub_year = int(work_data['publication_date'][:4])
             except Exception:
                 pub_year = None
-        paper.publication_year = pub_year
-        paper.publication_date = work_data.get('publication_date')
+        values['publication_year'] = pub_year
+        values['publication_date'] = work_data.get('publication_date')
 
         if work_data.get('primary_location'):
             location = work_data['primary_location']
             if location.get('source'):
-                paper.venue = location['source'].get('display_name')
-            paper.pdf_url = location.get('pdf_url')
+                values['venue'] = _clip(location['source'].get('display_name'), 300)
+            pdf_url = location.get('pdf_url')
+            values['pdf_url'] = pdf_url if pdf_url and len(pdf_url) <= 300 else None
 
-        paper.citation_count = work_data.get('cited_by_count', 0)
-        paper.referenced_works_count = len(work_data.get('referenced_works', []))
-        paper.openalex_url = work_data.get('id')
+        values['counts_start_year'], values['counts_by_year'] = Paper.pack_counts(work_data.get('counts_by_year'))
 
         if include_abstract:
-            inverted_abstract = work_data.get('abstract_inverted_index')
-            if inverted_abstract:
-                paper.abstract = self._reconstruct_abstract(inverted_abstract)
+            values['abstract'] = self._reconstruct_abstract(work_data.get('abstract_inverted_index'))
 
-        paper.last_updated = datetime.utcnow()
-
-        return paper
+        return values
     
+    def _index_suggestions(self, rows, authorships):
+        scores = {row['id']: row['citation_count'] or 0 for row in rows}
+        authors = []
+        for paper_id, entries in authorships.items():
+            for authorship in entries:
+                author = authorship.get('author') or {}
+                author_id = (author.get('id') or '').split('/')[-1]
+                if author_id and author.get('display_name'):
+                    authors.append((author_id, author['display_name'], scores[paper_id]))
+
+        self.suggestion_index.add(
+            papers=[(row['id'], row['title'], scores[row['id']]) for row in rows],
+            authors=authors
+        )
+
+    def _cache_authorships(self, authorships):
+        """Bulk-write authors and paper-author links for ``{paper_id: authorships}``.
+
+        Authors shared by many works are deduplicated and upserted in one
+        executemany; each paper's links are replaced with one delete and one
+        insert so ``author_position`` always matches the latest payload.
+        """
+        if not authorships:
+            return
+
+        author_rows = {}
+        link_rows = []
+        for paper_id, entries in authorships.items():
+            linked = set()
+            for position, authorship in enumerate(entries):
+                row = self._cache_author(authorship.get('author') or {}, authorship)
+                if not row or row['id'] in linked:
+                    continue
+                linked.add(row['id'])
+                author_rows.setdefault(row['id'], row)
+                link_rows.append({
+                    'paper_id': paper_id,
+                    'author_id': row['id'],
+                    'author_position': position
+                })
+
+        if author_rows:
+            self._release_taken_orcids(author_rows)
+            upsert_rows(
+                Author.__table__,
+                list(author_rows.values()),
+                ['id'],
+                update_columns=[
+                    'display_name', 'orcid', 'last_known_institution',
+                    'institution_id', 'openalex_url', 'last_updated'
+                ]
+            )
+
+        paper_ids = list(authorships)
+        for start in range(0, len(paper_ids), 500):
+            db.session.execute(
+                paper_authors.delete().where(paper_authors.c.paper_id.in_(paper_ids[start:start + 500]))
+            )
+        if link_rows:
+            db.session.execute(paper_authors.insert(), link_rows)
+
+    def _release_taken_orcids(self, author_rows):
+        # authors.orcid is unique; OpenAlex occasionally reports one ORCID for two author ids.
+        claimed = {}
+        for row in author_rows.values():
+            if row['orcid']:
+                if row['orcid'] in claimed:
+                    row['orcid'] = None
+                else:
+                    claimed[row['orcid']] = row['id']
+
+        if not claimed:
+            return
+
+        taken = db.session.query(Author.orcid).filter(
+            Author.orcid.in_(list(claimed)),
+            Author.id.notin_(list(author_rows))
+        ).all()
+        for (orcid,) in taken:
+            author_rows[claimed[orcid]]['orcid'] = None
+
     def _cache_author(self, author_data, authorship_data=None):
-        author_id = author_data.get('id', '').split('/')[-1]
+        author_id = (author_data.get('id') or '').split('/')[-1]
         if not author_id:
             return None
-        
-        author = Author(id=author_id)
-        author.display_name = author_data.get('display_name', 'Unknown Author')
-        author.orcid = author_data.get('orcid', '').replace('https://orcid.org/', '') if author_data.get('orcid') else None
-        author_openalex_url = author_data.get('id')
 
-        if authorship_data and authorship_data.get('institutions'):
-            institutions = authorship_data['institutions']
-            if institutions:
-                first_inst = institutions[0]
-                author.last_known_institution = first_inst.get('display_name')
-                author.institution_id = first_inst.get('id', '').split('/')[-1]
-
-        author.last_updated = datetime.utcnow()
+        now = datetime.utcnow()
+        values = {
+            'id': _clip(author_id, 50),
+            'display_name': _clip(author_data.get('display_name') or 'Unknown Author', 200),
+            'orcid': _clip(author_data['orcid'].replace('https://orcid.org/', ''), 50) if author_data.get('orcid') else None,
+            'last_known_institution': None,
+            'institution_id': None,
+            'openalex_url': _clip(author_data.get('id'), 200),
+            'cached_at': now,
+            'last_updated': now,
+        }
 
-        return author
-    def _reconstruct_abstract(self, inverted_index):
+        if authorship_data and authorship_data.get('institutions'):
+            first_inst = authorship_data['institutions'][0]
+            values['last_known_institution'] = _clip(first_inst.get('display_name'), 300)
+            values['institution_id'] = _clip((first_inst.get('id') or '').split('/')[-1], 50) or None
+
+        return values
+
+    @staticmethod
+    def _reconstruct_abstract(inverted_index):
+        """Rebuild abstract text from OpenAlex's ``{word: [positions]}`` index in O(n).
+
+        Words are scattered into a list sized by the highest position. Gaps
+        are skipped, and when two words claim one position the first wins.
+        An index whose positions are far sparser than its token count falls
+        back to sorting, so a bogus position can't allocate a huge list; it
+        keeps the same first word per position.
+        """
         if not inverted_index:
             return None
-        
-        word_positions = []
+
+        tokens = sum(map(len, inverted_index.values()))
+        if not tokens:
+            return None
+        last = max(max(positions) for positions in inverted_index.values() if positions)
+
+        if last >= 4 * tokens + 64:
+            by_position = {}
+            for word, positions in inverted_index.items():
+                for pos in positions:
+                    by_position.setdefault(pos, word)
+            return ' '.join(by_position[pos] for pos in sorted(by_position))
+
+        words = [None] * (last + 1)
         for word, positions in inverted_index.items():
             for pos in positions:
-                word_positions.append((pos, word))
-        
-        word_positions.sort(key=lambda x: x[0])
-        abstract = ' '.join([word for _, word in word_positions])
-        
-        return abstract
\ No newline at end of file
+                if words[pos] is None:
+                    words[pos] = word
+        return ' '.join(word for word in words if word is not None)
+
+
+def _refresh_search(app, key, query, filters, page, per_page, fields=None):
+    with app.app_context():
+        service = OpenAlexService(priority=BACKGROUND)
+        try:
+            result = service._search_remote(query, filters, page, per_page, fields)
+            if result is not None:
+                service.search_cache.set(key, result)
+        except Exception as e:
+            print(f"Search cache refresh error: {e}")
+        finally:
+            service.search_cache.end_refresh(key)
+
+
+def _remote_search(app, query, filters, page, per_page, fields=None):
+    with app.app_context():
+        return OpenAlexService().search_papers(query, filters, page, per_page, fields=fields)
+
+
+def _wants_abstract(fields):
+    return fields is None or 'abstract' in fields
+
+
+def _wants_full_record(fields):
+    return fields is None or bool(fields & {'abstract', 'authors'})
+
+
+def _with_node_fields(fields):
+    # Graph nodes are built from these, so they are serialized even when not requested.
+    return None if fields is None else fields | NODE_FIELDS
+
+
+def _clip(value, length):
+    if value is None:
+        return None
+    return value[:length]
@@ -0,0 +1,70 @@
+from app.services.graph_builder import GRAPH_SELECT
+
+PAPER_FIELDS = (
+    'id',
+    'title',
+    'doi',
+    'publication_year',
+    'publication_date',
+    'venue',
+    'citation_count',
+    'referenced_works_count',
+    'openalex_url',
+    'pdf_url',
+    'abstract',
+    'authors',
+    'counts_by_year',
+)
+
+# What a graph node needs from each paper.
+NODE_FIELDS = frozenset(['id', 'title', 'publication_year', 'citation_count'])
+
+# Keys of the nodes returned by the graph endpoint.
+GRAPH_NODE_FIELDS = ('id', 'title', 'year', 'citation_count', 'type', 'level')
+
+# Fields whose OpenAlex source isn't already in GRAPH_SELECT.
+EXTRA_SELECT = {
+    'abstract': 'abstract_inverted_index',
+    'authors': 'authorships',
+}
+
+
+def parse_fields(raw, allowed=PAPER_FIELDS, required=('id',)):
+    """Parse a ``fields=`` value (comma string or list) into a frozenset, or None for everything.
+
+    ``required`` fields are always included. Raises ValueError naming any
+    field not in ``allowed``.
+    """
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        raw = raw.split(',')
+
+    fields = {str(field).strip() for field in raw if str(field).strip()}
+    if not fields:
+        return None
+
+    unknown = sorted(fields.difference(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return frozenset(fields.union(required))
+
+
+def openalex_select(fields):
+    """The OpenAlex ``select=`` value for a projection, or None for full works.
+
+    Every column the paper cache writes is always selected so a projected
+    fetch can't blank out cached data; only the abstract and authorships,
+    the bulk of a work's payload, are left out when they aren't wanted.
+    """
+    if fields is None:
+        return None
+    extras = [source for field, source in EXTRA_SELECT.items() if field in fields]
+    return ','.join([GRAPH_SELECT] + extras)
+
+
+def project(papers, fields):
+    """Trim serialized paper (or graph node) dicts to ``fields``."""
+    if fields is None:
+        return papers
+    return [{key: value for key, value in paper.items() if key in fields} for paper in papers]
@@ -0,0 +1,239 @@
+import asyncio
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from app.services.metrics import Counters, Histogram
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {
+    INTERACTIVE: 'interactive',
+    BACKGROUND: 'background',
+}
+
+WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5)
+
+# How long an async caller waits before re-checking while threads hold the queue.
+ASYNC_POLL_INTERVAL = 0.05
+
+
+class MemoryTokenBucket:
+    """Token bucket held in process memory, shared by every thread."""
+
+    name = 'memory'
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self):
+        """Take one token; return 0 on success or the seconds until one is due."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class SQLiteTokenBucket:
+    """Token bucket stored in a SQLite file so gunicorn workers on one box share it.
+
+    Each ``consume`` runs in a ``BEGIN IMMEDIATE`` transaction, which takes the
+    database write lock and makes the refill-and-take step atomic across
+    processes.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path, rate, capacity, key='openalex'):
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        self.key = key
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS token_buckets '
+            '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def consume(self):
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated FROM token_buckets WHERE key = ?', (self.key,)
+            ).fetchone()
+            if row is None:
+                tokens = float(self.capacity)
+            else:
+                tokens = min(self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                delay = 0.0
+            else:
+                delay = (1 - tokens) / self.rate
+
+            conn.execute(
+                'INSERT OR REPLACE INTO token_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                (self.key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        return delay
+
+
+class TokenBucketLimiter:
+    """Process-wide OpenAlex rate limiter.
+
+    Callers queue in (priority, arrival) order, so interactive requests go
+    ahead of background work and equal-priority callers are served first come,
+    first served. Waiting happens on a condition variable with no lock held,
+    ``try_acquire`` never waits at all, and ``acquire`` gives up after
+    ``timeout`` seconds instead of holding a worker thread indefinitely.
+    """
+
+    def __init__(self, bucket, default_timeout=None):
+        self.bucket = bucket
+        self.default_timeout = default_timeout
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self.counters = Counters()
+        self.wait_times = {
+            priority: Histogram(WAIT_BUCKETS) for priority in PRIORITY_NAMES
+        }
+
+    @classmethod
+    def from_config(cls, config, default_path):
+        rate = config['API_RATE_LIMIT_CALLS'] / config['API_RATE_LIMIT_PERIOD']
+        capacity = config.get('API_RATE_LIMIT_BURST') or config['API_RATE_LIMIT_CALLS']
+
+        if config.get('API_RATE_LIMIT_BACKEND', 'memory') == 'sqlite':
+            path = config.get('API_RATE_LIMIT_SQLITE_PATH') or default_path
+            bucket = SQLiteTokenBucket(path, rate, capacity)
+        else:
+            bucket = MemoryTokenBucket(rate, capacity)
+
+        return cls(bucket, default_timeout=config.get('API_RATE_LIMIT_MAX_WAIT'))
+
+    def try_acquire(self):
+        with self._cond:
+            # Queued callers keep their place; don't let a non-blocking caller jump ahead.
+            if self._queue:
+                return False
+            granted = self.bucket.consume() <= 0
+
+        self.counters.incr('granted' if granted else 'rejected')
+        return granted
+
+    def acquire(self, priority=INTERACTIVE, timeout=None):
+        if timeout is None:
+            timeout = self.default_timeout
+
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    delay = None
+                    if self._queue[0] == ticket:
+                        delay = self.bucket.consume()
+                        if delay <= 0:
+                            granted = True
+                            break
+
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            granted = False
+                            break
+                        delay = remaining if delay is None else min(delay, remaining)
+
+                    self._cond.wait(delay)
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+        self.wait_times[priority].observe(time.monotonic() - started)
+        self.counters.incr('granted' if granted else 'timed_out')
+        return granted
+
+    async def acquire_async(self, priority=INTERACTIVE, timeout=None):
+        """Event-loop version of ``acquire`` that sleeps with ``asyncio.sleep``.
+
+        Async callers share the same bucket but never block a thread. They
+        don't join the priority queue; while threads are queued they back off
+        and re-check, so blocking callers keep their place.
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+
+        while True:
+            with self._cond:
+                delay = ASYNC_POLL_INTERVAL if self._queue else self.bucket.consume()
+            if delay <= 0:
+                granted = True
+                break
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    granted = False
+                    break
+                delay = min(delay, remaining)
+
+            await asyncio.sleep(delay)
+
+        self.wait_times[priority].observe(time.monotonic() - started)
+        self.counters.incr('granted' if granted else 'timed_out')
+        return granted
+
+    def stats(self):
+        with self._cond:
+            queued = len(self._queue)
+
+        data = {
+            'backend': self.bucket.name,
+            'rate_per_second': self.bucket.rate,
+            'capacity': self.bucket.capacity,
+            'queued': queued,
+            'wait_seconds': {
+                PRIORITY_NAMES[priority]: histogram.snapshot()
+                for priority, histogram in self.wait_times.items()
+            },
+        }
+        data.update(self.counters.snapshot())
+        return data
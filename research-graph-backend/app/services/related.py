@@ -0,0 +1,107 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models import Paper, RelatedPaper
+
+# Ranking methods; combined adds the two counts.
+METHODS = ('combined', 'co_citation', 'coupling')
+
+# score: best first. reading: the same papers oldest first, a suggested reading order.
+ORDERS = ('score', 'reading')
+
+
+def _value(method, co_citations, coupling):
+    if method == 'co_citation':
+        return co_citations
+    if method == 'coupling':
+        return coupling
+    return co_citations + coupling
+
+
+def _column(method):
+    if method == 'co_citation':
+        return RelatedPaper.co_citations
+    if method == 'coupling':
+        return RelatedPaper.coupling
+    return RelatedPaper.co_citations + RelatedPaper.coupling
+
+
+def refresh_related(paper_id, top_k):
+    """Recompute and store a paper's related set: the top ``top_k`` candidates of every method.
+
+    Counts come from one grouped SQL query even when the graph index is
+    enabled: the stored set is shared by every worker, and a worker's index
+    misses edges other workers cached since its snapshot. Keeping each
+    method's own top ``top_k`` means any method can be served exactly from
+    the stored rows.
+    """
+    computed_at = datetime.utcnow()
+    counts = RelatedPaper.candidate_counts(paper_id)
+
+    keep = set()
+    for method in METHODS:
+        ranked = sorted(
+            counts,
+            key=lambda candidate: (-_value(method, *counts[candidate][:2]), -counts[candidate][2], candidate)
+        )
+        keep.update(ranked[:top_k])
+
+    try:
+        RelatedPaper.store(
+            paper_id,
+            [(candidate, counts[candidate][0], counts[candidate][1]) for candidate in sorted(keep)],
+            computed_at
+        )
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        print(f"Related papers write error: {e}")
+    return computed_at
+
+
+def related_papers(paper_id, method='combined', order='score', limit=10, fields=None):
+    """Related papers ranked by co-citation and bibliographic coupling over the cached citations.
+
+    Served from the precomputed ``related_papers`` rows, which are rebuilt
+    first if new edges have invalidated them. Returns None when the paper
+    isn't cached.
+    """
+    paper = db.session.get(Paper, paper_id)
+    if paper is None:
+        return None
+
+    computed_at = paper.related_computed_at
+    refreshed = computed_at is None
+    if refreshed:
+        computed_at = refresh_related(paper_id, current_app.config['RELATED_PAPERS_TOP_K'])
+
+    value = _column(method)
+    rows = db.session.query(Paper, RelatedPaper.co_citations, RelatedPaper.coupling).options(
+        *Paper.load_options(fields)
+    ).join(
+        RelatedPaper, RelatedPaper.related_paper_id == Paper.id
+    ).filter(
+        RelatedPaper.paper_id == paper_id,
+        value > 0
+    ).order_by(
+        value.desc(), Paper.citation_count.desc(), Paper.id
+    ).limit(limit).all()
+
+    if order == 'reading':
+        rows.sort(key=lambda row: (row[0].publication_year is None, row[0].publication_year or 0))
+
+    papers = Paper.serialize_many([row[0] for row in rows], include_authors=True, include_abstract=False, fields=fields)
+    related = [
+        dict(serialized, co_citations=co_citations, coupling=coupling, score=_value(method, co_citations, coupling))
+        for serialized, (_, co_citations, coupling) in zip(papers, rows)
+    ]
+
+    return {
+        'paper_id': paper_id,
+        'method': method,
+        'order': order,
+        'related': related,
+        'computed_at': computed_at.isoformat(),
+        'refreshed': refreshed
+    }
@@ -0,0 +1,296 @@
+import re
+from datetime import date
+import numpy as np
+from app import db
+from app.models import Paper
+
+FOUNDATIONAL = 'Foundational'
+TRENDING = 'Trending'
+EMERGING = 'Emerging'
+HIGHLY_CITED = 'Highly Cited'
+ESTABLISHED = 'Established'
+RECENT = 'Recent'
+
+# In the precedence order the rules are checked in.
+CATEGORIES = (FOUNDATIONAL, TRENDING, EMERGING, HIGHLY_CITED, ESTABLISHED, RECENT)
+
+MOMENTUM = ('unknown', 'stable', 'accelerating', 'declining')
+
+SCORE_FIELDS = (
+    'category',
+    'citation_velocity',
+    'recent_velocity',
+    'momentum',
+    'acceleration',
+    'age',
+    'relevance_score',
+)
+
+# sort= keys; every sort is descending, papers that can't be scored go last.
+SORT_KEYS = (
+    'relevance',
+    'recent_velocity',
+    'citation_velocity',
+    'acceleration',
+    'citation_count',
+    'publication_year',
+)
+
+DAYS_PER_YEAR = 365.25
+RECENT_YEARS = 2
+MOMENTUM_THRESHOLD = 20
+
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+class PaperScores:
+    """Citation velocity, momentum and category for a batch of papers, as arrays.
+
+    A NumPy port of the frontend's ``paperCategorization.js``: every rule runs
+    once over the whole batch instead of once per paper. The one deliberate
+    difference is momentum, which compares the newest stored year with the
+    calendar year two before it (counts are stored densely, zero years
+    included) rather than the first and third entries OpenAlex happened to
+    list.
+    """
+
+    def __init__(self, paper_ids, citation_count, publication_year, age,
+                 recent_citations, has_counts, latest_count, two_back_count, span):
+        self.paper_ids = list(paper_ids)
+        n = len(self.paper_ids)
+        self.citation_count = np.asarray(citation_count, dtype=np.float64).reshape(n)
+        self.publication_year = np.asarray(publication_year, dtype=np.float64).reshape(n)
+        self.age = np.asarray(age, dtype=np.float64).reshape(n)
+        self._compute(
+            np.asarray(recent_citations, dtype=np.float64).reshape(n),
+            np.asarray(has_counts, dtype=bool).reshape(n),
+            np.asarray(latest_count, dtype=np.float64).reshape(n),
+            np.asarray(two_back_count, dtype=np.float64).reshape(n),
+            np.asarray(span, dtype=np.int64).reshape(n),
+        )
+
+    @classmethod
+    def for_ids(cls, paper_ids, today=None):
+        """Score cached papers by id with one query per 500 ids; unknown ids score as unscorable."""
+        today = today or date.today()
+        paper_ids = list(dict.fromkeys(paper_ids))
+        rows = {}
+        for start in range(0, len(paper_ids), 500):
+            for row in db.session.query(
+                Paper.id,
+                Paper.citation_count,
+                Paper.publication_year,
+                Paper.publication_date,
+                Paper.counts_start_year,
+                Paper.counts_by_year,
+            ).filter(Paper.id.in_(paper_ids[start:start + 500])):
+                rows[row.id] = row
+
+        ordered = [rows.get(paper_id) for paper_id in paper_ids]
+        return cls.from_rows(paper_ids, ordered, today)
+
+    @classmethod
+    def from_rows(cls, paper_ids, rows, today):
+        n = len(paper_ids)
+        citation_count = np.zeros(n)
+        publication_year = np.full(n, np.nan)
+        published = []
+        starts = np.zeros(n, dtype=np.int64)
+        blobs = []
+
+        for i, row in enumerate(rows):
+            if row is None:
+                published.append('NaT')
+                blobs.append(b'')
+                continue
+            citation_count[i] = row.citation_count or 0
+            if row.publication_year:
+                publication_year[i] = row.publication_year
+            published.append(_published(row.publication_date, row.publication_year))
+            starts[i] = row.counts_start_year or 0
+            blobs.append(row.counts_by_year or b'')
+
+        published = np.array(published, dtype='datetime64[D]')
+        age = (np.datetime64(today, 'D') - published).astype(np.float64) / DAYS_PER_YEAR
+        age[np.isnat(published)] = np.nan
+
+        # All counts in one flat array; row i owns flat[offsets[i]:offsets[i] + spans[i]].
+        flat = np.frombuffer(b''.join(blobs), dtype='<i4').astype(np.int64)
+        spans = np.array([len(blob) // 4 for blob in blobs], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(spans)[:-1])) if n else np.zeros(0, dtype=np.int64)
+        prefix = np.concatenate(([0], np.cumsum(flat)))
+
+        window_start = np.clip(today.year - RECENT_YEARS - starts, 0, spans)
+        window_end = np.clip(today.year + 1 - starts, 0, spans)
+        recent = prefix[offsets + window_end] - prefix[offsets + window_start]
+
+        ends = offsets + spans
+        has_last = spans >= 1
+        has_two_back = spans >= 3
+        latest = np.where(has_last, flat[np.where(has_last, ends - 1, 0)] if len(flat) else 0, 0)
+        two_back = np.where(has_two_back, flat[np.where(has_two_back, ends - 3, 0)] if len(flat) else 0, 0)
+
+        return cls(paper_ids, citation_count, publication_year, age, recent, spans > 0, latest, two_back, spans)
+
+    def _compute(self, recent_citations, has_counts, latest_count, two_back_count, span):
+        age = self.age
+        citations = self.citation_count
+        valid = ~np.isnan(age) & (age >= 0)
+        old_enough = valid & (age >= 0.5)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            citation_velocity = np.where(old_enough, citations / age, np.nan)
+            recent_velocity = np.where(
+                old_enough,
+                np.where(has_counts, recent_citations / np.minimum(RECENT_YEARS, age), citation_velocity),
+                np.nan
+            )
+
+        has_momentum = old_enough & (span >= 3)
+        acceleration = np.where(has_momentum, (latest_count - two_back_count) / 2, 0.0)
+        accelerating = has_momentum & (acceleration > MOMENTUM_THRESHOLD)
+        declining = has_momentum & (acceleration < -MOMENTUM_THRESHOLD)
+        momentum = np.select([~has_momentum, accelerating, declining], [0, 2, 3], default=1)
+
+        # Like the JS ``recentVelocity || citationVelocity``: a zero recent velocity falls back too.
+        velocity = np.where(np.isnan(recent_velocity) | (recent_velocity == 0), citation_velocity, recent_velocity)
+        # Comparisons against NaN are False, which matches JS comparisons against null here.
+        rv = recent_velocity
+
+        foundational = (
+            (citations >= 5000)
+            | ((age >= 15) & (citations >= 1000))
+            | ((age >= 10) & (citations >= 2000) & (rv >= 50))
+            | ((age >= 5) & (citations >= 3000) & (rv >= 100))
+        )
+        trending = (
+            (age >= 1) & (age <= 5) & ~np.isnan(velocity) & ~declining
+            & (
+                (velocity >= 200)
+                | ((velocity >= 100) & (citations >= 200))
+                | ((velocity >= 50) & (citations >= 300) & accelerating)
+            )
+        )
+        emerging = (
+            (age >= 0.5) & (age <= 3) & accelerating
+            & (
+                ((citations >= 30) & (velocity >= 20))
+                | ((citations >= 80) & (velocity >= 30))
+                | ((citations >= 50) & (acceleration >= 15))
+            )
+        )
+        highly_cited = (
+            ((age > 5) & (age <= 15) & (citations >= 500))
+            | ((age > 15) & (citations >= 300) & (rv >= 20))
+            | ((age > 5) & (rv >= 50))
+            | ((citations >= 1000) & (citations < 5000))
+        )
+        established = (
+            (age >= 3) & (age <= 10) & ~accelerating
+            & (
+                ((citations >= 100) & (citations < 500))
+                | ((velocity >= 10) & (velocity < 50))
+            )
+        )
+        recent = age < 2.5
+
+        # Index into CATEGORIES, -1 for uncategorized.
+        category = np.select(
+            [foundational, trending, emerging, highly_cited, established, recent],
+            np.arange(len(CATEGORIES)),
+            default=-1
+        )
+
+        too_new = valid & (age < 0.5)
+        category = np.where(too_new, CATEGORIES.index(RECENT), category)
+        category = np.where(valid, category, -1)
+
+        relevance = np.where(valid & (age <= 2), 30.0, np.where(valid & (age <= 5), 15.0, 0.0))
+        relevance += np.log10(np.maximum(citations, 1)) * 20
+        relevance += np.minimum(np.nan_to_num(rv, nan=0.0), 100) * 0.3
+        relevance += np.where(accelerating, 20.0, np.where(declining, -15.0, 0.0))
+
+        self.valid = valid
+        self.category = category
+        self.citation_velocity = citation_velocity
+        self.recent_velocity = recent_velocity
+        self.momentum = momentum
+        self.acceleration = acceleration
+        self.relevance = np.round(relevance)
+
+    def to_dicts(self):
+        """One dict of SCORE_FIELDS per paper, rounded like the frontend rounds them."""
+        scores = {}
+        for i, paper_id in enumerate(self.paper_ids):
+            valid = bool(self.valid[i])
+            scores[paper_id] = {
+                'category': CATEGORIES[self.category[i]] if self.category[i] >= 0 else None,
+                'citation_velocity': _rounded(self.citation_velocity[i]),
+                'recent_velocity': _rounded(self.recent_velocity[i]),
+                'momentum': MOMENTUM[self.momentum[i]],
+                'acceleration': _rounded(self.acceleration[i]),
+                'age': _rounded(self.age[i]) if valid else None,
+                'relevance_score': int(self.relevance[i]),
+            }
+        return scores
+
+    def order(self, key):
+        """Indices that sort the batch by ``key``, descending and stable."""
+        if key == 'relevance':
+            values = np.where(self.valid, self.relevance, np.nan)
+        elif key in ('recent_velocity', 'citation_velocity', 'acceleration'):
+            values = np.where(self.valid, getattr(self, key), np.nan)
+        elif key == 'citation_count':
+            values = self.citation_count.copy()
+        elif key == 'publication_year':
+            values = self.publication_year.copy()
+        else:
+            raise ValueError(f'Unknown sort key: {key}')
+
+        values[np.isnan(values)] = -np.inf
+        return np.argsort(-values, kind='stable')
+
+
+def score_papers(papers, sort=None, include_scores=True, today=None, pinned=None):
+    """Return serialized paper (or graph node) dicts with SCORE_FIELDS added, reordered by ``sort``.
+
+    ``sort`` is one of SORT_KEYS or None to keep the order; ``pinned`` is an
+    id kept in first place, e.g. a graph's center node.
+    """
+    if not papers or (sort is None and not include_scores):
+        return papers
+
+    scores = PaperScores.for_ids([paper['id'] for paper in papers], today=today)
+
+    if include_scores:
+        by_id = scores.to_dicts()
+        papers = [dict(paper, **by_id[paper['id']]) for paper in papers]
+
+    if sort is not None:
+        rank = {paper_id: position for position, paper_id in enumerate(scores.paper_ids[i] for i in scores.order(sort))}
+        papers = sorted(papers, key=lambda paper: (paper['id'] != pinned, rank[paper['id']]))
+
+    return papers
+
+
+def score_graph_nodes(nodes, sort=None, include_scores=False, today=None):
+    """score_papers for graph nodes; the center node (always first) stays first."""
+    if not nodes:
+        return nodes
+    return score_papers(nodes, sort=sort, include_scores=include_scores, today=today, pinned=nodes[0]['id'])
+
+
+def _published(publication_date, publication_year):
+    if publication_date and DATE_PATTERN.match(publication_date):
+        try:
+            return str(np.datetime64(publication_date, 'D'))
+        except ValueError:
+            pass
+    if publication_year:
+        # Same mid-year default as the frontend for papers with only a year.
+        return f'{int(publication_year):04d}-06-30'
+    return 'NaT'
+
+
+def _rounded(value):
+    return None if np.isnan(value) else round(float(value), 1)
@@ -0,0 +1,186 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from app.services.metrics import Counters, hit_ratio
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+def normalize_query(query):
+    query = unicodedata.normalize('NFKC', query or '').casefold()
+    return re.sub(r'\s+', ' ', query).strip()
+
+
+class _DiskTier:
+    """Optional SQLite-backed second tier so cached searches survive restarts."""
+
+    def __init__(self, path, max_age):
+        self.path = path
+        self.max_age = max_age
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS search_cache '
+            '(key TEXT PRIMARY KEY, stored_at REAL NOT NULL, payload BLOB NOT NULL)'
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        return self._connection().execute(
+            'SELECT stored_at, payload FROM search_cache WHERE key = ?', (key,)
+        ).fetchone()
+
+    def set(self, key, stored_at, blob):
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO search_cache (key, stored_at, payload) VALUES (?, ?, ?)',
+            (key, stored_at, blob)
+        )
+        self._writes += 1
+        if self._writes % 500 == 0:
+            conn.execute('DELETE FROM search_cache WHERE stored_at < ?', (time.time() - self.max_age,))
+
+
+class SearchResultCache:
+    """LRU cache of serialized search pages with stale-while-revalidate.
+
+    Entries younger than ``ttl`` are fresh. Entries up to ``stale_ttl`` old are
+    still served, but the caller is told to refresh them in the background.
+    Payloads are stored as zlib-compressed JSON, and the in-memory tier is
+    bounded by both entry count and total bytes.
+    """
+
+    def __init__(self, ttl=3600, stale_ttl=86400, max_entries=1000, max_bytes=32 * 1024 * 1024, disk_path=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.counters = Counters()
+        self.disk = _DiskTier(disk_path, stale_ttl) if disk_path else None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            ttl=config['SEARCH_CACHE_TTL'],
+            stale_ttl=config['SEARCH_CACHE_STALE_TTL'],
+            max_entries=config['SEARCH_CACHE_MAX_ENTRIES'],
+            max_bytes=config['SEARCH_CACHE_MAX_BYTES'],
+            disk_path=config.get('SEARCH_CACHE_DISK_PATH')
+        )
+
+    @staticmethod
+    def key(query, filters=None, page=1, per_page=20, fields=None):
+        return json.dumps(
+            [normalize_query(query), sorted((filters or {}).items()), page, per_page,
+             sorted(fields) if fields is not None else None],
+            separators=(',', ':')
+        )
+
+    def get(self, key):
+        """Return ``(payload, state)``; state is FRESH, STALE or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None and self.disk is not None:
+            entry = self._get_from_disk(key)
+
+        if entry is None:
+            self.counters.incr('misses')
+            return None, None
+
+        stored_at, blob = entry
+        age = time.time() - stored_at
+        if age >= self.stale_ttl:
+            self.counters.incr('misses')
+            return None, None
+
+        state = FRESH if age < self.ttl else STALE
+        self.counters.incr('hits' if state == FRESH else 'stale_hits')
+        return json.loads(zlib.decompress(blob)), state
+
+    def set(self, key, payload):
+        blob = zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        stored_at = time.time()
+        self._store(key, stored_at, blob)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, stored_at, blob)
+            except sqlite3.Error as e:
+                print(f"Search cache disk write error: {e}")
+
+    def begin_refresh(self, key):
+        """Claim a background refresh for ``key``; False if one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+        self.counters.incr('refreshes')
+        return True
+
+    def end_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def stats(self):
+        counters = self.counters.snapshot()
+        with self._lock:
+            entries, size = len(self._entries), self._bytes
+        counters.update({
+            'entries': entries,
+            'memory_bytes': size,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'disk_tier': self.disk is not None,
+            'hit_ratio': hit_ratio(
+                counters.get('hits', 0) + counters.get('stale_hits', 0),
+                counters.get('misses', 0)
+            ),
+        })
+        return counters
+
+    def _get_from_disk(self, key):
+        try:
+            entry = self.disk.get(key)
+        except sqlite3.Error as e:
+            print(f"Search cache disk read error: {e}")
+            return None
+        if entry is not None:
+            self.counters.incr('disk_hits')
+            self._store(key, entry[0], entry[1])
+        return entry
+
+    def _store(self, key, stored_at, blob):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[key] = (stored_at, blob)
+            self._bytes += len(blob)
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.counters.incr('evictions')
@@ -0,0 +1,161 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from app.services.metrics import Counters
+
+# Cross-worker locks are striped so the lock directory stays a fixed size.
+LOCK_STRIPES = 1024
+SWEEP_EVERY = 256
+
+
+class _Flight:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Process-wide coalescing of identical in-flight OpenAlex calls.
+
+    The first thread to ask for a key becomes the leader and makes the call;
+    threads asking for the same key while it runs wait for it and share its
+    result, or its exception. Nothing is remembered once the call finishes,
+    so this only merges calls that actually overlap; the FetchPlan and the
+    paper cache handle reuse after that.
+
+    With ``lock_dir`` set, leaders in different worker processes also
+    coordinate. A leader holds a striped file lock while it fetches and
+    leaves the result in ``lock_dir``. A leader that had to wait for the lock
+    reuses a result written after it started waiting instead of fetching
+    again.
+    """
+
+    def __init__(self, lock_dir=None, lock_timeout=10):
+        self.lock_dir = lock_dir
+        self.lock_timeout = lock_timeout
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._writes = 0
+        self.counters = Counters()
+
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config, default_dir):
+        lock_dir = None
+        if config.get('SINGLE_FLIGHT_BACKEND', 'memory') == 'file':
+            lock_dir = config.get('SINGLE_FLIGHT_LOCK_DIR') or default_dir
+        return cls(lock_dir=lock_dir, lock_timeout=config.get('SINGLE_FLIGHT_LOCK_TIMEOUT', 10))
+
+    def do(self, key, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not leader:
+            self.counters.incr('coalesced')
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        self.counters.incr('leaders')
+        try:
+            flight.result = self._lead(key, fn)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self):
+        data = self.counters.snapshot()
+        with self._lock:
+            data['in_flight'] = len(self._flights)
+        data['cross_worker'] = self.lock_dir is not None
+        return data
+
+    def _lead(self, key, fn):
+        if self.lock_dir is None:
+            return fn()
+
+        from filelock import FileLock, Timeout
+
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        stripe = int(digest[:8], 16) % LOCK_STRIPES
+        lock = FileLock(os.path.join(self.lock_dir, f'{stripe}.lock'))
+        result_path = os.path.join(self.lock_dir, f'{digest}.json')
+
+        started = time.time()
+        contended = False
+        try:
+            lock.acquire(timeout=0)
+        except Timeout:
+            contended = True
+            try:
+                lock.acquire(timeout=self.lock_timeout)
+            except Timeout:
+                self.counters.incr('lock_timeouts')
+                return fn()
+
+        try:
+            if contended:
+                shared = self._read_result(result_path, since=started)
+                if shared is not None:
+                    self.counters.incr('coalesced_cross_worker')
+                    return shared
+
+            result = fn()
+            if result is not None:
+                self._write_result(result_path, result)
+            return result
+        finally:
+            lock.release()
+
+    def _read_result(self, path, since):
+        try:
+            with open(path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get('stored_at', 0) < since:
+            return None
+        return stored.get('result')
+
+    def _write_result(self, path, result):
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'stored_at': time.time(), 'result': result}, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Single-flight result write error: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            sweep = self._writes % SWEEP_EVERY == 0
+        if sweep:
+            self._sweep()
+
+    def _sweep(self):
+        # A result only matters to workers that were already waiting on the lock.
+        cutoff = time.time() - self.lock_timeout
+        for path in glob.glob(os.path.join(self.lock_dir, '*.json')):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
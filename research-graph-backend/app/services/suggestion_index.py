@@ -0,0 +1,289 @@
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from itertools import compress
+
+PAPER = 'paper'
+AUTHOR = 'author'
+
+KEY_LENGTH = 64
+MAX_WORD_STARTS = 6
+
+# Sorts after every character a key can continue with, so ``key + KEY_END`` bounds a prefix range.
+KEY_END = '\U0010ffff'
+
+
+def normalize_text(text):
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    return re.sub(r'[^\w]+', ' ', text).strip()
+
+
+def _index_keys(text):
+    """The whole normalized string plus the suffixes starting at its first few words."""
+    normalized = normalize_text(text)
+    if not normalized:
+        return []
+    keys = [normalized[:KEY_LENGTH]]
+    for match in list(re.finditer(r' (?=\w)', normalized))[:MAX_WORD_STARTS - 1]:
+        keys.append(normalized[match.end():match.end() + KEY_LENGTH])
+    return keys
+
+
+class SuggestionIndex:
+    """In-memory prefix index over cached paper titles and author names.
+
+    Keys live in a sorted array and are matched with ``bisect``. Candidates
+    are ranked by citation count; an author is ranked by their most cited
+    cached paper. New entries collect in a small sorted pending list that
+    searches bisect as well. Once it outgrows ``merge_threshold`` (or one
+    ``merge_ratio``-th of the index, whichever is larger) it is merged into
+    the sorted array by slicing it around each pending key's ``bisect``
+    slot, never re-sorting the whole index. The merge runs on ``executor``
+    when one is given, outside the lock, so searches keep using the old
+    arrays until the merged ones are swapped in. Keys of renamed
+    entries are skipped at search time and only purged once they make up a
+    quarter of the array.
+
+    The sorted array is split into blocks of ``block_size`` keys, each with
+    the best score in it. A search visits the blocks of its prefix range in
+    best-score-first order and stops once no remaining block can beat the
+    current top ``limit``. Large prefix ranges are never cut off by position.
+    """
+
+    def __init__(self, block_size=64, merge_threshold=256, merge_ratio=256, executor=None):
+        self.block_size = block_size
+        self.merge_threshold = merge_threshold
+        self.merge_ratio = merge_ratio
+        self.executor = executor
+        self._keys = []
+        self._entries = []
+        # Each key's score when it was merged, for recomputing block maxima without dict lookups.
+        self._key_scores = []
+        self._block_max = []
+        self._pending = []
+        self._merging = []
+        self._merge_running = False
+        self._boosted = set()
+        self._boosted_since = None
+        self._dead = 0
+        self._indexed = set()
+        self._scores = {}
+        self._texts = {}
+        self._lock = threading.RLock()
+        self.loaded = False
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        with self._lock:
+            if not self.loaded:
+                self._load_from_db()
+                self.loaded = True
+
+    def add(self, papers=(), authors=()):
+        """Index ``(id, text, citation_count)`` tuples; no-op until the index is loaded."""
+        if not self.loaded:
+            return
+        with self._lock:
+            for kind, rows in ((PAPER, papers), (AUTHOR, authors)):
+                for entry_id, text, score in rows:
+                    self._add_entry(kind, entry_id, text, score, pending=True)
+            threshold = max(self.merge_threshold, len(self._keys) // self.merge_ratio)
+            if self._merge_running or (len(self._pending) <= threshold and len(self._boosted) <= threshold):
+                return
+            self._merge_running = True
+
+        if self.executor is None:
+            self._run_merge()
+        else:
+            self.executor.submit(self._run_merge)
+
+    def search(self, prefix, limit=5):
+        key = normalize_text(prefix)
+        if not key:
+            return []
+
+        candidates = {}
+        with self._lock:
+            # Pending keys aren't in the blocks yet, and boosted entries' scores outgrew their block's.
+            for pending in (self._merging, self._pending):
+                first = bisect_left(pending, (key,))
+                last = bisect_left(pending, (key + KEY_END,))
+                for pending_key, entry in pending[first:last]:
+                    if (pending_key, entry) in self._indexed:
+                        candidates[entry] = self._scores.get(entry, 0)
+            for entry in self._boosted:
+                if any(entry_key.startswith(key) for entry_key in _index_keys(self._texts[entry])):
+                    candidates[entry] = self._scores.get(entry, 0)
+
+            start = bisect_left(self._keys, key)
+            end = bisect_left(self._keys, key + KEY_END)
+            if start < end:
+                blocks = [
+                    (-self._block_max[block], block)
+                    for block in range(start // self.block_size, (end - 1) // self.block_size + 1)
+                ]
+                heapq.heapify(blocks)
+                while blocks:
+                    best, block = heapq.heappop(blocks)
+                    if len(candidates) >= limit and -best <= heapq.nlargest(limit, candidates.values())[-1]:
+                        break
+                    first = max(start, block * self.block_size)
+                    last = min(end, (block + 1) * self.block_size)
+                    for index in range(first, last):
+                        entry = self._entries[index]
+                        if (self._keys[index], entry) in self._indexed:
+                            candidates[entry] = self._scores.get(entry, 0)
+
+            ranked = sorted(candidates, key=lambda entry: (-candidates[entry], self._texts[entry]))
+
+            return [
+                {'type': kind, 'text': self._texts[(kind, entry_id)], f'{kind}_id': entry_id}
+                for kind, entry_id in ranked[:limit]
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self.loaded,
+                'keys': len(self._keys) + len(self._pending),
+                'entries': len(self._texts),
+                'pending': len(self._pending),
+                'merging': len(self._merging),
+            }
+
+    def _add_entry(self, kind, entry_id, text, score, pending):
+        entry = (kind, entry_id)
+        previous = self._scores.get(entry)
+        self._scores[entry] = max(previous or 0, score or 0)
+        if pending and previous is not None and self._scores[entry] > previous:
+            self._boosted.add(entry)
+            if self._boosted_since is not None:
+                self._boosted_since.add(entry)
+
+        old_text = self._texts.get(entry)
+        if old_text == text:
+            return
+        if old_text is not None:
+            # Keys of the old text stay in the arrays, but no longer match.
+            for key in _index_keys(old_text):
+                if (key, entry) in self._indexed:
+                    self._indexed.discard((key, entry))
+                    self._dead += 1
+        self._texts[entry] = text
+        for key in _index_keys(text):
+            if (key, entry) in self._indexed:
+                continue
+            self._indexed.add((key, entry))
+            if pending:
+                insort(self._pending, (key, entry))
+            else:
+                self._keys.append(key)
+                self._entries.append(entry)
+
+    def _merge_pending(self):
+        """Merge the pending keys now, unless a merge is already running."""
+        with self._lock:
+            if self._merge_running:
+                return
+            self._merge_running = True
+        self._run_merge()
+
+    def _run_merge(self):
+        with self._lock:
+            batch = self._pending
+            self._pending = []
+            self._merging = batch
+            boosted = self._boosted
+            self._boosted_since = set()
+            keys, entries, key_scores = self._keys, self._entries, self._key_scores
+            batch_scores = [self._scores.get(entry) or 0 for _, entry in batch]
+            dead = self._dead
+            purge = dead > len(keys) // 4
+
+        try:
+            if purge:
+                live = [pair in self._indexed for pair in zip(keys, entries)]
+                keys, entries, key_scores = (list(compress(array, live)) for array in (keys, entries, key_scores))
+            # The batch is sorted, so each pending key goes in after the previous one's slot
+            # and the arrays are copied across in slices rather than key by key.
+            merged_keys, merged_entries, merged_scores = [], [], []
+            copied = 0
+            for (key, entry), score in zip(batch, batch_scores):
+                position = bisect_right(keys, key, copied)
+                merged_keys += keys[copied:position]
+                merged_entries += entries[copied:position]
+                merged_scores += key_scores[copied:position]
+                merged_keys.append(key)
+                merged_entries.append(entry)
+                merged_scores.append(score)
+                copied = position
+            merged_keys += keys[copied:]
+            merged_entries += entries[copied:]
+            merged_scores += key_scores[copied:]
+
+            # Scores raised since their keys were stored; the entries stay boosted until the swap.
+            for entry in boosted:
+                score = self._scores.get(entry) or 0
+                for key in _index_keys(self._texts.get(entry)):
+                    position = bisect_left(merged_keys, key)
+                    while position < len(merged_keys) and merged_keys[position] == key:
+                        if merged_entries[position] == entry:
+                            merged_scores[position] = max(merged_scores[position], score)
+                        position += 1
+            block_max = self._block_maxima(merged_scores)
+        except Exception as e:
+            print(f"Suggestion index merge failed: {e}")
+            with self._lock:
+                self._pending = list(heapq.merge(batch, self._pending))
+                self._merging = []
+                self._boosted |= self._boosted_since
+                self._boosted_since = None
+                self._merge_running = False
+            return
+
+        with self._lock:
+            self._keys, self._entries, self._key_scores = merged_keys, merged_entries, merged_scores
+            self._block_max = block_max
+            # Only scores raised during the merge can still be above their block's maximum.
+            self._boosted = self._boosted_since
+            self._boosted_since = None
+            self._merging = []
+            if purge:
+                self._dead -= dead
+            self._merge_running = False
+
+    def _rebuild_blocks(self):
+        self._key_scores = [self._scores.get(entry) or 0 for entry in self._entries]
+        self._block_max = self._block_maxima(self._key_scores)
+        self._boosted = set()
+
+    def _block_maxima(self, key_scores):
+        return [
+            max(key_scores[start:start + self.block_size])
+            for start in range(0, len(key_scores), self.block_size)
+        ]
+
+    def _load_from_db(self):
+        from app import db
+        from app.models import Paper, Author, paper_authors
+
+        for paper_id, title, citation_count in db.session.query(Paper.id, Paper.title, Paper.citation_count):
+            self._add_entry(PAPER, paper_id, title, citation_count, pending=False)
+
+        author_rows = db.session.query(
+            Author.id, Author.display_name, db.func.max(Paper.citation_count)
+        ).join(
+            paper_authors, paper_authors.c.author_id == Author.id
+        ).join(
+            Paper, Paper.id == paper_authors.c.paper_id
+        ).group_by(Author.id, Author.display_name)
+        for author_id, name, citation_count in author_rows:
+            self._add_entry(AUTHOR, author_id, name, citation_count, pending=False)
+
+        pairs = sorted(zip(self._keys, self._entries))
+        self._keys = [key for key, _ in pairs]
+        self._entries = [entry for _, entry in pairs]
+        self._rebuild_blocks()
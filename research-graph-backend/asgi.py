@@ -0,0 +1,10 @@
+"""ASGI entry point for high-concurrency deployments.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+``run.py`` remains the WSGI entry point for gunicorn and ``flask run``.
+"""
+from run import app
+from app.asgi import create_asgi_app
+
+application = create_asgi_app(app)
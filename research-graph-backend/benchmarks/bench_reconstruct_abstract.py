@@ -0,0 +1,72 @@
+"""Micro-benchmark for OpenAlexService._reconstruct_abstract.
+
+Compares the position-array reconstruction with the previous sort-based one
+on synthetic inverted indexes shaped like OpenAlex abstracts.
+
+    python benchmarks/bench_reconstruct_abstract.py [--words 250] [--abstracts 150]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.openalex_service import OpenAlexService
+
+
+def sort_based(inverted_index):
+    if not inverted_index:
+        return None
+
+    word_positions = []
+    for word, positions in inverted_index.items():
+        for pos in positions:
+            word_positions.append((pos, word))
+
+    word_positions.sort(key=lambda x: x[0])
+    return ' '.join([word for _, word in word_positions])
+
+
+def make_index(rng, length, vocabulary):
+    index = {}
+    for pos in range(length):
+        index.setdefault(rng.choice(vocabulary), []).append(pos)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=250, help='tokens per abstract')
+    parser.add_argument('--abstracts', type=int, default=150, help='abstracts per run (one graph request)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = [f'word{i}' for i in range(max(10, args.words // 2))]
+    indexes = [make_index(rng, args.words, vocabulary) for _ in range(args.abstracts)]
+
+    for index in indexes:
+        assert OpenAlexService._reconstruct_abstract(index) == sort_based(index)
+
+    implementations = [
+        ('sort-based', sort_based),
+        ('position array', OpenAlexService._reconstruct_abstract),
+    ]
+    results = {}
+    for name, fn in implementations:
+        timings = timeit.repeat(
+            lambda: [fn(index) for index in indexes],
+            repeat=args.repeat,
+            number=args.number
+        )
+        results[name] = min(timings) / args.number
+        print(f'{name:>15}: {results[name] * 1000:8.3f} ms per {args.abstracts} abstracts')
+
+    print(f'{"speedup":>15}: {results["sort-based"] / results["position array"]:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,9 +7,51 @@ class Config:
     SQLALCHEMY_ECHO = False
     OPENALEX_API_URL = 'https://api.openalex.org'
     OPENALEX_EMAIL = os.environ.get('OPENALEX_EMAIL')
+    OPENALEX_TIMEOUT = 10
+    OPENALEX_POOL_CONNECTIONS = 4
+    OPENALEX_POOL_MAXSIZE = int(os.environ.get('OPENALEX_POOL_MAXSIZE', 20))
+    OPENALEX_ASYNC_POOL_MAXSIZE = int(os.environ.get('OPENALEX_ASYNC_POOL_MAXSIZE', 100))
+    OPENALEX_MAX_RETRIES = 3
+    OPENALEX_BACKOFF_FACTOR = 0.5
+    OPENALEX_FANOUT_WORKERS = 8
+    OPENALEX_PARTIAL_TIMEOUT = 5
+    OPENALEX_BATCH_CHUNK = 50
+    OPENALEX_DEBUG_HEADERS = os.environ.get('OPENALEX_DEBUG_HEADERS', 'false').lower() == 'true'
     API_RATE_LIMIT_CALLS = 10
     API_RATE_LIMIT_PERIOD = 1
+    API_RATE_LIMIT_BURST = None
+    API_RATE_LIMIT_MAX_WAIT = 10
+    API_RATE_LIMIT_BACKEND = os.environ.get('API_RATE_LIMIT_BACKEND', 'memory')
+    API_RATE_LIMIT_SQLITE_PATH = os.environ.get('API_RATE_LIMIT_SQLITE_PATH')
+    SINGLE_FLIGHT_BACKEND = os.environ.get('SINGLE_FLIGHT_BACKEND', 'memory')
+    SINGLE_FLIGHT_LOCK_DIR = os.environ.get('SINGLE_FLIGHT_LOCK_DIR')
+    SINGLE_FLIGHT_LOCK_TIMEOUT = 10
     CACHE_DEFAULT_TIMEOUT = timedelta(days=30).total_seconds()
+    GRAPH_LEVEL_FANOUT = (50, 10, 5)
+    GRAPH_MAX_FRONTIER = 50
+    GRAPH_MAX_NODES = 500
+    GRAPH_MAX_EDGES = 2000
+    GRAPH_TIME_BUDGET = 8
+    GRAPH_FRONTIER_CHUNK = 50
+    GRAPH_LAYOUT_CACHE_TTL = 3600
+    GRAPH_LAYOUT_CACHE_MAX_ENTRIES = 256
+    GRAPH_INDEX_ENABLED = os.environ.get('GRAPH_INDEX_ENABLED', 'false').lower() == 'true'
+    GRAPH_INDEX_DIR = os.environ.get('GRAPH_INDEX_DIR')
+    GRAPH_INDEX_COMPACT_THRESHOLD = 50000
+    GRAPH_INDEX_REFRESH_INTERVAL = 60
+    # Edges each process keeps for replaying onto the next snapshot.
+    GRAPH_INDEX_LOG_LIMIT = 200000
+    RELATED_PAPERS_TOP_K = 50
+    PAPERS_BATCH_MAX_IDS = int(os.environ.get('PAPERS_BATCH_MAX_IDS', 200))
+    LIBRARY_BULK_MAX_PAPERS = int(os.environ.get('LIBRARY_BULK_MAX_PAPERS', 500))
+    SEARCH_CACHE_TTL = 3600
+    SEARCH_CACHE_STALE_TTL = timedelta(days=1).total_seconds()
+    SEARCH_CACHE_MAX_ENTRIES = 1000
+    SEARCH_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    SEARCH_CACHE_DISK_PATH = os.environ.get('SEARCH_CACHE_DISK_PATH')
+    SUGGESTIONS_MIN_LOCAL_MATCHES = 3
+    SEARCH_HYBRID_REMOTE_WAIT = 1.5
+    BACKGROUND_WORKERS = 2
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
 
@@ -17,6 +59,7 @@ class Config:
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_ECHO = True
+    OPENALEX_DEBUG_HEADERS = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///C:/PaperLink/research-graph-backend/research_graph.db'
 
 
@@ -1,11 +1,11 @@
 import os
-from sqlalchemy import create_engine
-from app import create_app, db
+from flask_migrate import upgrade
+from app import create_app
 
 os.environ['FLASK_ENV'] = 'production'
 
 app = create_app('production')
 
 with app.app_context():
-    db.create_all()
-    print("Database tables created successfully")
\ No newline at end of file
+    upgrade()
+    print("Database migrated to the latest revision")
\ No newline at end of file
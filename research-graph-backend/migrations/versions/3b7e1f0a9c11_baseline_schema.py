@@ -0,0 +1,127 @@
+"""Baseline schema: papers, authors, citations, collections and saved papers
+
+Revision ID: 3b7e1f0a9c11
+Revises:
+Create Date: 2026-10-18 18:30:00.000000
+
+Databases created earlier with ``db.create_all()`` already have these
+tables, so each one is only created when it is missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e1f0a9c11'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'papers' not in existing:
+        op.create_table(
+            'papers',
+            sa.Column('id', sa.String(length=50), nullable=False),
+            sa.Column('title', sa.String(length=500), nullable=False),
+            sa.Column('abstract', sa.Text(), nullable=True),
+            sa.Column('doi', sa.String(length=100), nullable=True),
+            sa.Column('publication_year', sa.Integer(), nullable=True),
+            sa.Column('publication_date', sa.String(length=20), nullable=True),
+            sa.Column('venue', sa.String(length=300), nullable=True),
+            sa.Column('venue_issn', sa.String(length=20), nullable=True),
+            sa.Column('citation_count', sa.Integer(), nullable=True),
+            sa.Column('referenced_works_count', sa.Integer(), nullable=True),
+            sa.Column('openalex_url', sa.String(length=200), nullable=True),
+            sa.Column('pdf_url', sa.String(length=300), nullable=True),
+            sa.Column('cached_at', sa.DateTime(), nullable=False),
+            sa.Column('last_updated', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_papers_title', 'papers', ['title'])
+        op.create_index('ix_papers_doi', 'papers', ['doi'])
+        op.create_index('ix_papers_publication_year', 'papers', ['publication_year'])
+        op.create_index('ix_papers_citation_count', 'papers', ['citation_count'])
+
+    if 'authors' not in existing:
+        op.create_table(
+            'authors',
+            sa.Column('id', sa.String(length=50), nullable=False),
+            sa.Column('display_name', sa.String(length=200), nullable=False),
+            sa.Column('orcid', sa.String(length=50), nullable=True),
+            sa.Column('last_known_institution', sa.String(length=300), nullable=True),
+            sa.Column('institution_id', sa.String(length=50), nullable=True),
+            sa.Column('works_count', sa.Integer(), nullable=True),
+            sa.Column('cited_by_count', sa.Integer(), nullable=True),
+            sa.Column('h_index', sa.Integer(), nullable=True),
+            sa.Column('openalex_url', sa.String(length=200), nullable=True),
+            sa.Column('cached_at', sa.DateTime(), nullable=False),
+            sa.Column('last_updated', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_authors_display_name', 'authors', ['display_name'])
+        op.create_index('ix_authors_orcid', 'authors', ['orcid'], unique=True)
+
+    if 'paper_authors' not in existing:
+        op.create_table(
+            'paper_authors',
+            sa.Column('paper_id', sa.String(length=50), nullable=False),
+            sa.Column('author_id', sa.String(length=50), nullable=False),
+            sa.Column('author_position', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['author_id'], ['authors.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('paper_id', 'author_id')
+        )
+
+    if 'citations' not in existing:
+        op.create_table(
+            'citations',
+            sa.Column('citing_paper_id', sa.String(length=50), nullable=False),
+            sa.Column('cited_paper_id', sa.String(length=50), nullable=False),
+            sa.Column('cached_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['cited_paper_id'], ['papers.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['citing_paper_id'], ['papers.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('citing_paper_id', 'cited_paper_id')
+        )
+        op.create_index('ix_citations_citing_paper_id', 'citations', ['citing_paper_id'])
+        op.create_index('ix_citations_cited_paper_id', 'citations', ['cited_paper_id'])
+
+    if 'collections' not in existing:
+        op.create_table(
+            'collections',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=200), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('user_id', sa.String(length=100), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_collections_user_id', 'collections', ['user_id'])
+
+    if 'saved_papers' not in existing:
+        op.create_table(
+            'saved_papers',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('paper_id', sa.String(length=50), nullable=False),
+            sa.Column('collection_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.String(length=100), nullable=False),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('saved_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['collection_id'], ['collections.id']),
+            sa.ForeignKeyConstraint(['paper_id'], ['papers.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_saved_papers_user_id', 'saved_papers', ['user_id'])
+
+
+def downgrade():
+    op.drop_table('saved_papers')
+    op.drop_table('collections')
+    op.drop_table('citations')
+    op.drop_table('paper_authors')
+    op.drop_table('authors')
+    op.drop_table('papers')
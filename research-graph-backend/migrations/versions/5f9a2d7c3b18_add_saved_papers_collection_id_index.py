@@ -0,0 +1,26 @@
+"""Index saved_papers.collection_id
+
+Revision ID: 5f9a2d7c3b18
+Revises: 8d2c4a61e5f0
+Create Date: 2026-10-18 18:32:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f9a2d7c3b18'
+down_revision = '8d2c4a61e5f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('saved_papers')}
+    if 'ix_saved_papers_collection_id' not in indexes:
+        op.create_index('ix_saved_papers_collection_id', 'saved_papers', ['collection_id'])
+
+
+def downgrade():
+    op.drop_index('ix_saved_papers_collection_id', table_name='saved_papers')
@@ -0,0 +1,27 @@
+"""Add papers.edges_complete_at
+
+Revision ID: 8d2c4a61e5f0
+Revises: 3b7e1f0a9c11
+Create Date: 2026-10-18 18:31:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2c4a61e5f0'
+down_revision = '3b7e1f0a9c11'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('papers')}
+    if 'edges_complete_at' not in columns:
+        op.add_column('papers', sa.Column('edges_complete_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('papers') as batch_op:
+        batch_op.drop_column('edges_complete_at')
@@ -0,0 +1,30 @@
+"""Add papers.counts_start_year and papers.counts_by_year
+
+Revision ID: a41c6e9d2b70
+Revises: 5f9a2d7c3b18
+Create Date: 2026-10-18 18:33:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c6e9d2b70'
+down_revision = '5f9a2d7c3b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('papers')}
+    if 'counts_start_year' not in columns:
+        op.add_column('papers', sa.Column('counts_start_year', sa.Integer(), nullable=True))
+    if 'counts_by_year' not in columns:
+        op.add_column('papers', sa.Column('counts_by_year', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('papers') as batch_op:
+        batch_op.drop_column('counts_by_year')
+        batch_op.drop_column('counts_start_year')
@@ -0,0 +1,43 @@
+"""Add related_papers and papers.related_computed_at
+
+Revision ID: c7e83b15d4a2
+Revises: a41c6e9d2b70
+Create Date: 2026-10-18 18:34:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e83b15d4a2'
+down_revision = 'a41c6e9d2b70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {column['name'] for column in inspector.get_columns('papers')}
+    if 'related_computed_at' not in columns:
+        op.add_column('papers', sa.Column('related_computed_at', sa.DateTime(), nullable=True))
+
+    if 'related_papers' not in inspector.get_table_names():
+        op.create_table(
+            'related_papers',
+            sa.Column('paper_id', sa.String(length=50), nullable=False),
+            sa.Column('related_paper_id', sa.String(length=50), nullable=False),
+            sa.Column('co_citations', sa.Integer(), nullable=False),
+            sa.Column('coupling', sa.Integer(), nullable=False),
+            sa.Column('computed_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['paper_id'], ['papers.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['related_paper_id'], ['papers.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('paper_id', 'related_paper_id')
+        )
+
+
+def downgrade():
+    op.drop_table('related_papers')
+    with op.batch_alter_table('papers') as batch_op:
+        batch_op.drop_column('related_computed_at')
@@ -0,0 +1,46 @@
+"""Add the Postgres full-text index on papers
+
+Revision ID: e2b94f6a1c37
+Revises: c7e83b15d4a2
+Create Date: 2026-10-18 18:35:00.000000
+
+Built CONCURRENTLY so cache writes to papers keep going during the build.
+The expression must match PG_DOCUMENT in app/services/local_search.py.
+SQLite's FTS5 table is created by LocalSearch at runtime.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b94f6a1c37'
+down_revision = 'c7e83b15d4a2'
+branch_labels = None
+depends_on = None
+
+DOCUMENT = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(abstract, ''))"
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    valid = bind.execute(sa.text(
+        'SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+        "WHERE c.relname = 'ix_papers_fulltext'"
+    )).scalar()
+    with op.get_context().autocommit_block():
+        if valid is False:
+            # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep.
+            op.drop_index('ix_papers_fulltext', table_name='papers', postgresql_concurrently=True)
+        op.create_index(
+            'ix_papers_fulltext', 'papers', [sa.text(DOCUMENT)],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_papers_fulltext', table_name='papers', postgresql_concurrently=True, if_exists=True)
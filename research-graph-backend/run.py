@@ -1,4 +1,5 @@
 import os
+from flask_migrate import stamp, upgrade
 from app import create_app, db
 from app.models import Paper, Author, Citation
 
@@ -22,17 +23,33 @@ def make_shell_context():
 
 @app.cli.command()
 def init_db():
-    db.create_all()
+    # Same path as deploys (flask db upgrade), so the database is stamped with its revision.
+    upgrade()
     print("Database initialized successfully!")
     print(f"Database location: {app.config['SQLALCHEMY_DATABASE_URI']}")
 
 
+@app.cli.command()
+def build_graph_index():
+    from app.services.graph_index import CitationGraphIndex
+
+    index = CitationGraphIndex.from_config(
+        app.config,
+        default_dir=os.path.join(app.instance_path, 'graph_index')
+    )
+    index.rebuild()
+    stats = index.stats()
+    print(f"Graph index built: {stats['nodes']} papers, {stats['edges']} citations")
+    print(f"Snapshot: {os.path.join(index.snapshot_dir, stats['snapshot'] or '')}")
+
+
 @app.cli.command()
 def reset_db():
     response = input("This will delete ALL data. Continue? (yes/no): ")
     if response.lower() == 'yes':
         db.drop_all()
         db.create_all()
+        stamp()
         print("Database reset successfully!")
     else:
         print("Database reset cancelled.")
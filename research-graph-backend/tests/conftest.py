@@ -0,0 +1,93 @@
+import re
+import pytest
+from app import create_app, db
+from app.services.http_client import OpenAlexClient
+
+WORK_COUNT = 40
+
+
+def _references(index):
+    return [(index * 7 + step) % WORK_COUNT for step in (1, 3, 5) if (index * 7 + step) % WORK_COUNT != index]
+
+
+def make_work(index, select=None):
+    work = {
+        'id': f'https://openalex.org/W{index}',
+        'title': f'Paper {index}',
+        'doi': f'https://doi.org/10.1000/{index}',
+        'publication_year': 2000 + index % 20,
+        'publication_date': f'{2000 + index % 20}-03-01',
+        'primary_location': {'source': {'display_name': 'Journal'}, 'pdf_url': None},
+        'cited_by_count': index * 10,
+        'counts_by_year': [{'year': 2024, 'cited_by_count': index}],
+        'referenced_works': [f'https://openalex.org/W{ref}' for ref in _references(index)],
+        'abstract_inverted_index': {'An': [0], 'abstract': [1]},
+        'authorships': [{
+            'author': {'id': f'https://openalex.org/A{index}', 'display_name': f'Author {index}', 'orcid': None},
+            'institutions': [],
+        }],
+    }
+    if select:
+        work = {key: value for key, value in work.items() if key in select.split(',')}
+    return work
+
+
+class FakeOpenAlex:
+    """Answers the OpenAlex calls the service makes from a small synthetic citation graph."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, endpoint, params=None):
+        params = dict(params or {})
+        self.calls.append((endpoint, params))
+        select = params.get('select')
+
+        match = re.match(r'^/works/W(\d+)$', endpoint)
+        if match:
+            index = int(match.group(1))
+            return make_work(index, select) if index < WORK_COUNT else None
+
+        if endpoint != '/works':
+            return None
+        results = []
+        if params.get('search'):
+            terms = params['search'].lower().split()
+            results = [i for i in range(WORK_COUNT) if all(term in f'paper {i}' for term in terms)]
+        for part in params.get('filter', '').split(','):
+            name, _, value = part.partition(':')
+            ids = [int(item.split('/')[-1].lstrip('Ww')) for item in value.split('|') if item]
+            if name == 'cites':
+                results = [i for i in range(WORK_COUNT) if set(ids) & set(_references(i))]
+            elif name == 'cited_by':
+                results = sorted({ref for i in ids for ref in _references(i)})
+            elif name in ('openalex', 'doi'):
+                results = [i for i in ids if i < WORK_COUNT]
+        page = int(params.get('page', 1))
+        per_page = int(params.get('per_page', 25))
+        return {
+            'meta': {'count': len(results)},
+            'results': [make_work(i, select) for i in results[(page - 1) * per_page:page * per_page]],
+        }
+
+
+@pytest.fixture
+def openalex(monkeypatch):
+    fake = FakeOpenAlex()
+    monkeypatch.setattr(OpenAlexClient, 'get', lambda self, endpoint, params=None: fake.get(endpoint, params))
+    return fake
+
+
+@pytest.fixture
+def app(openalex):
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,16 @@
+import time
+from app.services.graph_index import REPLAY_SLACK, CitationGraphIndex
+
+
+def test_replay_log_is_capped_and_trimmed_to_the_installed_build():
+    index = CitationGraphIndex(enabled=True, log_limit=100)
+
+    index.add_edges([(f'W{i}', f'W{i + 1}') for i in range(1000)], complete_ids=[f'W{i}' for i in range(1000)])
+
+    assert len(index._log) == 100
+    assert len(index._complete_log) == 100
+    assert index._log[-1][1:] == ('W999', 'W1000')
+
+    index.built_at = time.time() + REPLAY_SLACK + 1
+    index._trim_log()
+    assert not index._log and not index._complete_log
@@ -0,0 +1,30 @@
+def test_bulk_save_resolves_dois_in_one_batch(client, openalex):
+    collection = client.post('/api/library/collections', json={'name': 'Reading'}).get_json()['collection']
+
+    response = client.post(f"/api/library/collections/{collection['id']}/papers:bulk", json={
+        'papers': ['10.1000/3', 'https://doi.org/10.1000/4', 'doi:10.1000/5', 'W6', '10.1000/999']
+    })
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == ['saved', 'saved', 'saved', 'saved', 'not_found']
+    assert [endpoint for endpoint, _ in openalex.calls] == ['/works', '/works']
+    assert sorted(params['filter'] for _, params in openalex.calls) == [
+        'doi:10.1000/3|10.1000/4|10.1000/5|10.1000/999',
+        'openalex:W6'
+    ]
+
+    saved = client.get(f"/api/library/collections/{collection['id']}/papers").get_json()['papers']
+    assert sorted(paper['paper_id'] for paper in saved) == ['W3', 'W4', 'W5', 'W6']
+
+
+def test_bibtex_escapes_backslash_tilde_and_caret():
+    from app.services.export import format_bibtex
+
+    entry = {'title': r'A\B ~ x^2 {50%}', 'authors': [], 'year': None, 'venue': None, 'doi': None}
+
+    assert format_bibtex(entry, 'key') == (
+        '@misc{key,\n'
+        '  title = {A\\textbackslash{}B \\textasciitilde{} x\\textasciicircum{}2 \\{50\\%\\}}\n'
+        '}\n\n'
+    )
@@ -0,0 +1,58 @@
+def test_projected_graph_fetch_does_not_make_details_fresh(client, openalex):
+    # A depth-1 graph caches the paper from a select= projection: no abstract, not fresh.
+    assert client.get('/api/papers/W5/graph?depth=1').status_code == 200
+
+    openalex.calls.clear()
+    response = client.get('/api/papers/W5')
+
+    assert response.status_code == 200
+    paper = response.get_json()['paper']
+    assert any(endpoint == '/works/W5' for endpoint, _ in openalex.calls)
+    assert paper['abstract'] == 'An abstract'
+    assert paper['authors']
+
+
+def test_citations_after_projected_graph_fetch_have_full_records(client, openalex):
+    # The depth-1 graph marks W5's edges complete, but its neighbours were fetched without abstracts.
+    assert client.get('/api/papers/W5').status_code == 200
+    assert client.get('/api/papers/W5/graph?depth=1').status_code == 200
+
+    response = client.get('/api/papers/W5/citations')
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    neighbours = data['cited_by'] + data['references']
+    assert neighbours
+    assert all(paper['abstract'] == 'An abstract' and paper['authors'] for paper in neighbours)
+
+    # Now the cached neighbourhood can answer on its own.
+    openalex.calls.clear()
+    local = client.get('/api/papers/W5/citations').get_json()['data']
+    assert openalex.calls == []
+    assert sorted(paper['id'] for paper in local['cited_by'] + local['references']) == \
+        sorted(paper['id'] for paper in neighbours)
+    assert all(paper['abstract'] and paper['authors'] for paper in local['cited_by'] + local['references'])
+
+
+def test_related_papers_do_not_make_details_fresh(client, openalex):
+    assert client.get('/api/papers/W5/graph?depth=1').status_code == 200
+    # Computing, then invalidating, the related set both write to W5's row.
+    assert client.get('/api/papers/W5/related').status_code == 200
+    assert client.get('/api/papers/W12/graph?depth=1').status_code == 200
+
+    openalex.calls.clear()
+    paper = client.get('/api/papers/W5').get_json()['paper']
+
+    assert any(endpoint == '/works/W5' for endpoint, _ in openalex.calls)
+    assert paper['abstract'] == 'An abstract'
+
+
+def test_sparse_abstract_fallback_matches_dense_reconstruction():
+    from app.services.openalex_service import OpenAlexService
+
+    index = {'graphs': [0, 3], 'citation': [1], 'cite': [1], '': [2]}
+    # Shifting every position far past the token count takes the sorting fallback.
+    sparse = {word: [pos + 10000 for pos in positions] for word, positions in index.items()}
+
+    assert OpenAlexService._reconstruct_abstract(index) == 'graphs citation  graphs'
+    assert OpenAlexService._reconstruct_abstract(sparse) == 'graphs citation  graphs'
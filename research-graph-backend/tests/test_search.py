@@ -0,0 +1,40 @@
+def _search(client, **params):
+    response = client.get('/api/search', query_string={'q': 'paper', **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_hybrid_pages_follow_one_ordering(client):
+    # W3 and W7 are cached locally; the remote search returns every paper in id order.
+    for paper_id in ('W3', 'W7'):
+        assert client.get(f'/api/papers/{paper_id}').status_code == 200
+
+    first = _search(client, source='hybrid', per_page=5)
+    as_of = first['meta']['as_of']
+    second = _search(client, source='hybrid', per_page=5, page=2, as_of=as_of)
+    third = _search(client, source='hybrid', per_page=5, page=3, as_of=as_of)
+
+    assert first['meta']['local_count'] == second['meta']['local_count'] == 2
+    assert [paper['id'] for paper in first['results']] == ['W7', 'W3', 'W0', 'W1', 'W2']
+    # Remote positions 3-7; W3 and W7 were already shown as local matches.
+    assert [paper['id'] for paper in second['results']] == ['W4', 'W5', 'W6']
+    assert [paper['id'] for paper in third['results']] == ['W8', 'W9', 'W10', 'W11', 'W12']
+    assert first['meta']['count'] == 42
+
+
+def test_hybrid_rejects_bad_as_of(client):
+    response = client.get('/api/search', query_string={'q': 'paper', 'source': 'hybrid', 'as_of': 'yesterday'})
+    assert response.status_code == 400
+
+
+def test_papers_saved_outside_the_cache_path_are_searchable(client):
+    assert _search(client, q='widgets', source='local')['results'] == []
+
+    collection = client.post('/api/library/collections', json={'name': 'Reading'}).get_json()['collection']
+    response = client.post(f"/api/library/collections/{collection['id']}/papers:bulk", json={
+        'papers': [{'paper_id': 'manual-1', 'title': 'Quantum widgets'}]
+    })
+    assert response.get_json()['summary'] == {'saved': 1}
+
+    results = _search(client, q='widgets', source='local')['results']
+    assert [paper['id'] for paper in results] == ['manual-1']
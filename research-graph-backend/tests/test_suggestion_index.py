@@ -0,0 +1,65 @@
+from app.services.suggestion_index import PAPER, SuggestionIndex
+
+
+def _loaded_index(papers, **kwargs):
+    index = SuggestionIndex(**kwargs)
+    for paper_id, title, citations in papers:
+        index._add_entry(PAPER, paper_id, title, citations, pending=False)
+    index._keys, index._entries = map(list, zip(*sorted(zip(index._keys, index._entries))))
+    index._rebuild_blocks()
+    index.loaded = True
+    return index
+
+
+def test_top_cited_match_wins_in_a_large_prefix_range():
+    papers = [(f'W{i}', f'deep a{i:05d}', i) for i in range(3000)]
+    papers.append(('W9999', 'deep zzz learning', 1000000))
+    index = _loaded_index(papers)
+
+    results = index.search('deep', limit=3)
+
+    assert [result['paper_id'] for result in results] == ['W9999', 'W2999', 'W2998']
+
+
+def test_pending_and_raised_scores_are_ranked():
+    index = _loaded_index([(f'W{i}', f'graph {i}', i) for i in range(500)])
+
+    index.add(papers=[('W10', 'graph 10', 5000), ('W700', 'graph new', 4000)])
+
+    assert [result['paper_id'] for result in index.search('graph', limit=2)] == ['W10', 'W700']
+
+
+def test_renamed_entry_stops_matching_its_old_text():
+    index = _loaded_index([('W1', 'old title', 10), ('W2', 'other paper', 5)])
+
+    index.add(papers=[('W1', 'new title', 10)])
+
+    assert index.search('old') == []
+    assert [result['paper_id'] for result in index.search('new')] == ['W1']
+    index._merge_pending()
+    assert index.search('old') == []
+    assert [result['paper_id'] for result in index.search('title')] == ['W1']
+
+
+class _DeferredExecutor:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+
+def test_merge_runs_on_the_executor_and_keeps_the_arrays_sorted():
+    executor = _DeferredExecutor()
+    index = _loaded_index([(f'W{i}', f'graph {i:04d}', i) for i in range(1000)], merge_threshold=8, executor=executor)
+
+    index.add(papers=[('W5', 'graph 0005', 9000)] + [(f'N{i}', f'graph new {i}', 2000 + i) for i in range(5)])
+
+    assert len(executor.jobs) == 1
+    assert index.search('graph', limit=2)[0]['paper_id'] == 'W5'
+    fn, args = executor.jobs.pop()
+    fn(*args)
+
+    assert index._pending == [] and index._boosted == set()
+    assert index._keys == sorted(index._keys)
+    assert [result['paper_id'] for result in index.search('graph', limit=3)] == ['W5', 'N4', 'N3']